@@ -1,14 +1,35 @@
-from django.contrib import admin
-from .models import BorrowRequest
+from django.contrib import admin, messages
+from django.db import transaction
+
+from . import counters, events, services
+from .models import BorrowRequest, UserRequestCounters
+
+
+class OverdueFilter(admin.SimpleListFilter):
+    title = 'overdue'
+    parameter_name = 'overdue'
+    
+    def lookups(self, request, model_admin):
+        return (('yes', 'Yes'), ('no', 'No'))
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return queryset.overdue()
+        if self.value() == 'no':
+            return queryset.exclude(pk__in=queryset.overdue().values('pk'))
+        return queryset
 
 
 @admin.register(BorrowRequest)
 class BorrowRequestAdmin(admin.ModelAdmin):
     list_display = ('tool', 'borrower', 'status', 'duration', 'return_date', 'created_at', 'is_overdue')
-    list_filter = ('status', 'created_at', 'return_date')
+    list_filter = ('status', OverdueFilter, 'created_at', 'return_date')
+    list_select_related = ('tool__owner', 'borrower')
     search_fields = ('tool__name', 'borrower__username', 'borrower__email')
-    list_editable = ('status',)
-    readonly_fields = ('created_at', 'updated_at', 'is_overdue')
+    readonly_fields = ('created_at', 'updated_at', 'is_overdue', 'last_reminded_on')
+    # Status only changes through the state machine (apps.requests.services),
+    # which keeps tool availability, counters and events in step
+    actions = ('approve_selected', 'reject_selected', 'mark_selected_returned')
     
     fieldsets = (
         ('Request Information', {
@@ -18,7 +39,7 @@ class BorrowRequestAdmin(admin.ModelAdmin):
             'fields': ('status', 'return_date')
         }),
         ('Notifications', {
-            'fields': ('owner_notified', 'borrower_notified')
+            'fields': ('owner_notified', 'borrower_notified', 'last_reminded_on')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at', 'is_overdue'),
@@ -26,7 +47,64 @@ class BorrowRequestAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_overdue()
+    
+    def get_readonly_fields(self, request, obj=None):
+        if obj is not None:
+            # Each of these feeds UserRequestCounters
+            return self.readonly_fields + ('tool', 'borrower', 'status', 'owner_notified', 'borrower_notified')
+        return self.readonly_fields
+    
+    def get_changeform_initial_data(self, request):
+        return {'status': 'pending', **super().get_changeform_initial_data(request)}
+    
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.status = 'pending'
+        super().save_model(request, obj, form, change)
+        if not change:
+            counters.request_created(obj)
+            events.request_changed(obj, 'request.created')
+    
+    def _transition(self, request, queryset, transition, verb):
+        done = skipped = 0
+        for pk, owner_id in queryset.values_list('pk', 'tool__owner_id'):
+            try:
+                transition(pk, owner_id)
+            except services.TransitionError:
+                skipped += 1
+            else:
+                done += 1
+        self.message_user(request, f'{verb} {done} request(s).', messages.SUCCESS)
+        if skipped:
+            self.message_user(
+                request, f'Skipped {skipped} request(s) not in a state that allows it, or whose tool is lent out.',
+                messages.WARNING,
+            )
+    
+    @admin.action(description='Approve selected pending requests')
+    def approve_selected(self, request, queryset):
+        self._transition(request, queryset, services.approve, 'Approved')
+    
+    @admin.action(description='Reject selected pending requests')
+    def reject_selected(self, request, queryset):
+        self._transition(request, queryset, services.reject, 'Rejected')
+    
+    @admin.action(description='Mark selected approved requests returned')
+    def mark_selected_returned(self, request, queryset):
+        self._transition(request, queryset, services.mark_returned, 'Marked returned')
+    
     def is_overdue(self, obj):
         return obj.is_overdue
     is_overdue.boolean = True
-    is_overdue.short_description = 'Overdue'
\ No newline at end of file
+    is_overdue.short_description = 'Overdue'
+    is_overdue.admin_order_field = 'overdue'
+
+
+@admin.register(UserRequestCounters)
+class UserRequestCountersAdmin(admin.ModelAdmin):
+    list_display = ('user', 'total_borrowed', 'total_lent', 'incoming_pending', 'unread_requests', 'unread_decisions', 'updated_at')
+    search_fields = ('user__username', 'user__email')
+    readonly_fields = ('user',) + UserRequestCounters.COUNTER_FIELDS + ('updated_at',)
@@ -3,4 +3,10 @@ from django.apps import AppConfig
 
 class RequestsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.requests'
\ No newline at end of file
+    name = 'apps.requests'
+
+    def ready(self):
+        # Connect the signal receivers that keep counters and caches current,
+        # and the SQLite connection tuning
+        from toolshare import db, stats  # noqa: F401
+        from . import counters  # noqa: F401
@@ -0,0 +1,61 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+
+from toolshare.async_api import async_api_view, render_json
+from toolshare.stats import aglobal_counts
+from . import counters, events
+from .views import STREAM_KEEPALIVE_SECONDS, request_stats_payload, sse_message, stream_user
+
+
+def _close_connection():
+    connection.close()
+
+
+@async_api_view()
+async def notifications(request):
+    # Primary only; see views.notifications
+    user_counters = await counters.aget_counters(request.user.pk)
+    return render_json(events.notification_payload(user_counters))
+
+
+@async_api_view()
+async def request_stats(request):
+    user_counters = await counters.aget_counters(request.user.pk)
+    return render_json(request_stats_payload(user_counters, await aglobal_counts()))
+
+
+async def notification_stream(request):
+    """Async twin of views.notification_stream; idle streams hold no thread"""
+    # require_GET can't wrap coroutines before Django 5.0
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    user = await sync_to_async(stream_user)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    
+    broker = events.get_broker()
+    subscription = broker.subscribe(user.pk, events.AsyncSubscription())
+    snapshot = events.notification_payload(await counters.aget_counters(user.pk))
+    # Release the connection held by the ORM's worker thread, not the loop's
+    await sync_to_async(_close_connection)()
+    
+    async def stream():
+        try:
+            yield sse_message({'type': 'snapshot', 'notifications': snapshot})
+            while True:
+                try:
+                    event = await subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                yield sse_message(event)
+        finally:
+            broker.unsubscribe(user.pk, subscription)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,151 @@
+"""
+Maintenance of UserRequestCounters.
+
+Each transition applies F() deltas to the affected users' counter rows, so
+callers should run it inside the same transaction as the BorrowRequest write.
+A missing row is rebuilt from scratch on first touch.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import Count, F, Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from apps.tools.models import Tool
+from .models import BorrowRequest, UserRequestCounters
+
+
+def compute_counters(user_id):
+    """Recount a user's counters from BorrowRequest (two aggregate queries)"""
+    counts = BorrowRequest.objects.filter(borrower_id=user_id).aggregate(
+        total_borrowed=Count('pk'),
+        outgoing_pending=Count('pk', filter=Q(status='pending')),
+        outgoing_approved=Count('pk', filter=Q(status='approved')),
+        unread_decisions=Count(
+            'pk', filter=Q(status__in=['approved', 'rejected'], borrower_notified=False)
+        ),
+    )
+    counts.update(BorrowRequest.objects.filter(tool__owner_id=user_id).aggregate(
+        total_lent=Count('pk'),
+        incoming_pending=Count('pk', filter=Q(status='pending')),
+        unread_requests=Count('pk', filter=Q(status='pending', owner_notified=False)),
+    ))
+    return counts
+
+
+def rebuild_counters(user_id):
+    counters, _ = UserRequestCounters.objects.update_or_create(
+        user_id=user_id, defaults=compute_counters(user_id)
+    )
+    return counters
+
+
+def get_counters(user_id):
+    """Single primary-key lookup, falling back to a rebuild for new users"""
+    try:
+        return UserRequestCounters.objects.get(pk=user_id)
+    except UserRequestCounters.DoesNotExist:
+        return rebuild_counters(user_id)
+
+
+async def aget_counters(user_id):
+    try:
+        return await UserRequestCounters.objects.aget(pk=user_id)
+    except UserRequestCounters.DoesNotExist:
+        return await sync_to_async(rebuild_counters)(user_id)
+
+
+def apply_deltas(user_id, rebuild_missing=True, **deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = UserRequestCounters.objects.filter(pk=user_id).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated and rebuild_missing:
+        # No row yet: the recount already reflects the write being recorded
+        rebuild_counters(user_id)
+
+
+def apply_many(deltas_by_user):
+    """
+    apply_deltas for many users at once: one UPDATE per distinct set of
+    deltas rather than one per user.
+    """
+    groups = {}
+    for user_id, deltas in deltas_by_user.items():
+        key = tuple(sorted((field, delta) for field, delta in deltas.items() if delta))
+        if key:
+            groups.setdefault(key, []).append(user_id)
+    for key, user_ids in groups.items():
+        updated = UserRequestCounters.objects.filter(pk__in=user_ids).update(
+            **{field: F(field) + delta for field, delta in key}
+        )
+        if updated < len(user_ids):
+            existing = set(UserRequestCounters.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+            for user_id in set(user_ids) - existing:
+                rebuild_counters(user_id)
+
+
+def request_created(borrow_request):
+    apply_deltas(borrow_request.borrower_id, total_borrowed=1, outgoing_pending=1)
+    apply_deltas(
+        borrow_request.tool.owner_id,
+        total_lent=1,
+        incoming_pending=1,
+        unread_requests=0 if borrow_request.owner_notified else 1,
+    )
+
+
+def request_decided(borrow_request, owner_was_notified):
+    """A pending request was approved or rejected"""
+    apply_deltas(
+        borrow_request.borrower_id,
+        outgoing_pending=-1,
+        outgoing_approved=1 if borrow_request.status == 'approved' else 0,
+        unread_decisions=0 if borrow_request.borrower_notified else 1,
+    )
+    apply_deltas(
+        borrow_request.tool.owner_id,
+        incoming_pending=-1,
+        unread_requests=0 if owner_was_notified else -1,
+    )
+
+
+def request_returned(borrow_request, borrower_was_notified):
+    """An approved request was marked returned"""
+    apply_deltas(
+        borrow_request.borrower_id,
+        outgoing_approved=-1,
+        unread_decisions=0 if borrower_was_notified else -1,
+    )
+
+
+def notifications_read(user):
+    updated = UserRequestCounters.objects.filter(pk=user.pk).update(
+        unread_decisions=0, unread_requests=0
+    )
+    if not updated:
+        rebuild_counters(user.pk)
+
+
+@receiver(post_delete, sender=BorrowRequest)
+def request_deleted(sender, instance, **kwargs):
+    # Only adjust existing rows: during a cascade the users may be going away too
+    pending = instance.status == 'pending'
+    apply_deltas(
+        instance.borrower_id,
+        rebuild_missing=False,
+        total_borrowed=-1,
+        outgoing_pending=-1 if pending else 0,
+        outgoing_approved=-1 if instance.status == 'approved' else 0,
+        unread_decisions=-1 if instance.status in ('approved', 'rejected') and not instance.borrower_notified else 0,
+    )
+    owner_id = Tool.objects.filter(pk=instance.tool_id).values_list('owner_id', flat=True).first()
+    if owner_id is not None:
+        apply_deltas(
+            owner_id,
+            rebuild_missing=False,
+            total_lent=-1,
+            incoming_pending=-1 if pending else 0,
+            unread_requests=-1 if pending and not instance.owner_notified else 0,
+        )
@@ -0,0 +1,150 @@
+"""
+In-process pub/sub for borrow request notifications.
+
+Writers publish after their transaction commits; each open notification
+stream holds a subscription queue for its user. The broker class is
+pluggable through settings.REQUEST_EVENT_BROKER so a multi-process
+deployment can swap the local broker for one backed by a shared bus.
+"""
+import asyncio
+import queue
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+from .counters import get_counters
+
+
+class LocalBroker:
+    """Fan-out to subscriber queues within this process"""
+    max_queued_events = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, user_id, subscription=None):
+        """Register a queue-like object (anything with put_nowait) for user_id"""
+        if subscription is None:
+            subscription = queue.Queue(maxsize=self.max_queued_events)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, user_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait(event)
+            except (queue.Full, asyncio.QueueFull):
+                # A stalled client only ever needs the latest counts
+                pass
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+class AsyncSubscription:
+    """Subscription for coroutine consumers; safe to publish to from any thread"""
+
+    def __init__(self, maxsize=LocalBroker.max_queued_events):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def put_nowait(self, event):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'REQUEST_EVENT_BROKER', 'apps.requests.events.LocalBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def notification_payload(user_counters):
+    return {
+        'new_approvals': user_counters.unread_decisions,
+        'new_requests': user_counters.unread_requests,
+        'total_notifications': user_counters.unread_decisions + user_counters.unread_requests,
+    }
+
+
+def _publish_counts(event_type, user_ids, extra):
+    broker = get_broker()
+    for user_id in user_ids:
+        if not broker.subscriber_count(user_id):
+            continue
+        user_counters = get_counters(user_id)
+        broker.publish(user_id, {
+            'type': event_type,
+            **extra,
+            'notifications': notification_payload(user_counters),
+        })
+
+
+def request_changed(borrow_request, event_type):
+    """Notify the borrower and the tool owner once the change is committed"""
+    user_ids = {borrow_request.borrower_id, borrow_request.tool.owner_id}
+    extra = {'request_id': borrow_request.pk, 'status': borrow_request.status}
+    transaction.on_commit(lambda: _publish_counts(event_type, user_ids, extra))
+
+
+def requests_changed(owner_id, changes):
+    """
+    One event per affected user for a batch of (request_id, borrower_id, status)
+    changes on owner_id's tools, instead of one per request.
+    """
+    per_user = {owner_id: []}
+    for request_id, borrower_id, status in changes:
+        change = {'request_id': request_id, 'status': status}
+        per_user[owner_id].append(change)
+        per_user.setdefault(borrower_id, []).append(change)
+
+    def publish():
+        for user_id, user_changes in per_user.items():
+            _publish_counts('requests.changed', [user_id], {'requests': user_changes})
+    transaction.on_commit(publish)
+
+
+def loan_overdue(borrow_request):
+    """Tell the borrower and the owner a loan is overdue"""
+    user_ids = {borrow_request.borrower_id, borrow_request.tool.owner_id}
+    extra = {'request_id': borrow_request.pk, 'return_date': borrow_request.return_date.isoformat()}
+    transaction.on_commit(lambda: _publish_counts('request.overdue', user_ids, extra))
+
+
+def notifications_read(user):
+    transaction.on_commit(lambda: _publish_counts('notifications.read', [user.pk], {}))
@@ -0,0 +1,280 @@
+import http.client
+import json
+import re
+import statistics
+import time
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+from apps.users.authentication import _token_cache
+
+# name, method, path (formatted with the fixture ids), JSON body
+READ_ENDPOINTS = [
+    ('tool_list', 'GET', '/api/tools/', None),
+    ('tool_search', 'GET', '/api/tools/search/?q=drill', None),
+    # tool_list takes no filters; category/condition filtering lives on search
+    ('tool_search_filtered', 'GET', '/api/tools/search/?category=Power+Tools&condition=Good', None),
+    ('nearby_tools', 'GET', '/api/tools/nearby/', None),
+    ('my_tools', 'GET', '/api/tools/my-tools/', None),
+    ('tool_stats', 'GET', '/api/tools/stats/', None),
+    ('tool_detail', 'GET', '/api/tools/{own_tool}/', None),
+    ('tool_bulk_export', 'GET', '/api/tools/bulk/export/', None),
+    ('user_info', 'GET', '/api/auth/user/', None),
+    ('borrow_request_list', 'GET', '/api/requests/', None),
+    ('incoming_requests', 'GET', '/api/requests/incoming/', None),
+    ('overdue_requests', 'GET', '/api/requests/overdue/', None),
+    ('request_stats', 'GET', '/api/requests/stats/', None),
+    ('notifications', 'GET', '/api/requests/notifications/', None),
+    ('lent_tools', 'GET', '/api/requests/lent/', None),
+    ('borrowed_tools', 'GET', '/api/requests/borrowed/', None),
+    ('lent_tools_ndjson', 'GET', '/api/requests/lent/?export_format=ndjson', None),
+]
+# Only run in-process, each inside a transaction that is rolled back
+WRITE_ENDPOINTS = [
+    ('borrow_request_create', 'POST', '/api/requests/', {'tool_id': '{other_tool}', 'reason': 'bench', 'duration': 3}),
+    ('approve_request', 'POST', '/api/requests/{pending}/approve/', None),
+    ('reject_request', 'POST', '/api/requests/{pending}/reject/', None),
+    ('batch_requests', 'POST', '/api/requests/batch/', 'batch'),
+    ('mark_notifications_read', 'POST', '/api/requests/notifications/read/', None),
+]
+SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every API endpoint through the test client and, with --target, '
+        'a running server; report throughput, latency percentiles and query counts '
+        'as JSON and optionally fail on regressions against a --baseline report. '
+        'Generate data first with seed_neighbourhood.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Email of the user to benchmark as; defaults to the busiest owner')
+        parser.add_argument('--iterations', type=int, default=50, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint first')
+        parser.add_argument('--cold', action='store_true', help='Clear caches before every request')
+        parser.add_argument('--target', action='append', default=[],
+                            help='name=base_url of a running server sharing this database (reads only); '
+                                 'query counts need PROFILING_ENABLED there')
+        parser.add_argument('--no-client', action='store_true', help='Skip the in-process test client run')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--baseline', help='Earlier report to compare against')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Allowed relative p95 slowdown against the baseline')
+
+    def handle(self, *args, **options):
+        user = self.pick_user(options['user'])
+        token = Token.objects.get_or_create(user=user)[0].key
+        ids = self.fixture_ids(user)
+        report = {
+            'meta': {
+                'vendor': connection.vendor,
+                'rows': {
+                    'users': get_user_model().objects.count(),
+                    'tools': Tool.objects.count(),
+                    'requests': BorrowRequest.objects.count(),
+                },
+                'user': user.pk,
+                'iterations': options['iterations'],
+                'cold': options['cold'],
+            },
+        }
+
+        if not options['no_client']:
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            report['client'] = {}
+            for endpoint in READ_ENDPOINTS + WRITE_ENDPOINTS:
+                if '{pending}' in endpoint[2] and ids['pending'] is None:
+                    continue
+                report['client'][endpoint[0]] = self.run_client(client, endpoint, ids, options)
+                self.print_result('client', endpoint[0], report['client'][endpoint[0]])
+
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep:
+                raise CommandError(f'--target must look like name=url, got {target!r}')
+            report.setdefault('servers', {})[name] = results = {}
+            for endpoint in READ_ENDPOINTS:
+                results[endpoint[0]] = self.run_server(url.rstrip('/'), token, endpoint, ids, options)
+                self.print_result(name, endpoint[0], results[endpoint[0]])
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                regressions = compare(json.load(fh), report, options['tolerance'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def pick_user(self, email):
+        User = get_user_model()
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f'No user with email {email}')
+        user = (
+            User.objects.filter(is_active=True, borrow_requests__isnull=False)
+            .annotate(n_tools=Count('tools', distinct=True)).order_by('-n_tools', 'pk').first()
+        )
+        if user is None:
+            raise CommandError('No data to benchmark; run seed_neighbourhood first')
+        return user
+
+    def fixture_ids(self, user):
+        pending = list(
+            BorrowRequest.objects.filter(tool__owner=user, status='pending')
+            .order_by('pk').values_list('pk', flat=True)[:50]
+        )
+        other_tool = (
+            Tool.objects.filter(is_available=True).exclude(owner=user)
+            .exclude(borrow_requests__borrower=user, borrow_requests__status='pending')
+            .order_by('pk').values_list('pk', flat=True).first()
+        )
+        return {
+            'own_tool': Tool.objects.filter(owner=user).order_by('pk').values_list('pk', flat=True).first(),
+            'other_tool': other_tool,
+            'pending': pending[0] if pending else None,
+            'batch': {'actions': [
+                {'id': pk, 'action': 'approve' if i % 2 else 'reject'} for i, pk in enumerate(pending)
+            ]},
+        }
+
+    @staticmethod
+    def format_body(body, ids):
+        if body is None:
+            return None
+        if isinstance(body, str):
+            return ids[body]
+        return {key: ids[value[1:-1]] if isinstance(value, str) and value.startswith('{') else value
+                for key, value in body.items()}
+
+    def run_client(self, client, endpoint, ids, options):
+        name, method, path, body = endpoint
+        path = path.format(**ids)
+        body = self.format_body(body, ids)
+        timings, queries, statuses = [], [], {}
+        for i in range(options['warmup'] + options['iterations']):
+            if options['cold']:
+                cache.clear()
+                _token_cache.clear()
+            with ExitStack() as stack:
+                captures = [stack.enter_context(CaptureQueriesContext(conn)) for conn in connections.all()]
+                start = time.perf_counter()
+                status = self.client_request(client, method, path, body)
+                elapsed = time.perf_counter() - start
+            if i >= options['warmup']:
+                timings.append(elapsed * 1000)
+                queries.append(sum(len(capture.captured_queries) for capture in captures))
+                statuses[status] = statuses.get(status, 0) + 1
+        return summarize(timings, queries, statuses)
+
+    @staticmethod
+    def client_request(client, method, path, body):
+        if method == 'GET':
+            response = client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            return response.status_code
+        # Writes run against the same rows every time and are then undone
+        try:
+            with transaction.atomic():
+                response = client.generic(method, path, json.dumps(body or {}), content_type='application/json')
+                raise Rollback
+        except Rollback:
+            pass
+        return response.status_code
+
+    def run_server(self, base_url, token, endpoint, ids, options):
+        name, method, path, _ = endpoint
+        parts = urlsplit(base_url)
+        conn_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        conn = conn_class(parts.hostname, parts.port)
+        headers = {'Authorization': f'Token {token}'}
+        timings, queries, statuses = [], [], {}
+        try:
+            for i in range(options['warmup'] + options['iterations']):
+                start = time.perf_counter()
+                conn.request(method, parts.path + path.format(**ids), headers=headers)
+                response = conn.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - start
+                if i < options['warmup']:
+                    continue
+                timings.append(elapsed * 1000)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+                match = SERVER_TIMING_QUERIES.search(response.getheader('Server-Timing', ''))
+                if match:
+                    queries.append(int(match.group(1)))
+        finally:
+            conn.close()
+        return summarize(timings, queries or None, statuses)
+
+    def print_result(self, section, name, result):
+        self.stdout.write(
+            f"{section} {name}: {result['throughput_rps']} req/s p50={result['p50_ms']}ms "
+            f"p95={result['p95_ms']}ms queries={result['queries']} statuses={result['statuses']}"
+        )
+
+
+def summarize(timings, queries, statuses):
+    timings = sorted(timings)
+
+    def percentile(p):
+        return round(timings[min(len(timings) - 1, int(len(timings) * p))], 3)
+
+    return {
+        'requests': len(timings),
+        'statuses': {str(status): n for status, n in statuses.items()},
+        # Median: the first request after a write may miss a cache the rest hit
+        'queries': statistics.median(queries) if queries else None,
+        'throughput_rps': round(len(timings) / (sum(timings) / 1000), 1),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(timings[-1], 3),
+    }
+
+
+def compare(baseline, report, tolerance, min_slowdown_ms=1.0):
+    """Regressions of report against baseline: more queries, or p95 beyond tolerance"""
+    sections = [('client', baseline.get('client', {}), report.get('client', {}))]
+    for name, results in report.get('servers', {}).items():
+        sections.append((name, baseline.get('servers', {}).get(name, {}), results))
+
+    regressions = []
+    for section, old_results, new_results in sections:
+        for endpoint, new in new_results.items():
+            old = old_results.get(endpoint)
+            if old is None:
+                continue
+            if old['queries'] is not None and new['queries'] is not None and new['queries'] > old['queries']:
+                regressions.append(f"{section} {endpoint}: queries {old['queries']} -> {new['queries']}")
+            limit = old['p95_ms'] * (1 + tolerance)
+            if new['p95_ms'] > limit and new['p95_ms'] - old['p95_ms'] >= min_slowdown_ms:
+                regressions.append(f"{section} {endpoint}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms")
+    return regressions
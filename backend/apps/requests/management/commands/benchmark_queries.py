@@ -0,0 +1,106 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.requests import seeding
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+
+
+class Command(BaseCommand):
+    help = (
+        'Record query plans and latency for the hot endpoint queries. Run it '
+        'before and after migrating the index migrations (e.g. `migrate '
+        'requests 0002`) to compare. --allow-seed first writes a synthetic '
+        'dataset into the default database, so only use it on a scratch one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1_000_000, help='Borrow requests to seed')
+        parser.add_argument('--users', type=int, default=2_000)
+        parser.add_argument('--tools', type=int, default=20_000)
+        parser.add_argument(
+            '--allow-seed', action='store_true',
+            help='Seed --users/--tools/--requests rows into the default database first; '
+                 'without it the existing data is benchmarked as-is',
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        if options['allow_seed']:
+            self.stdout.write(f"Seeding {connection.settings_dict['NAME']} (see seed_neighbourhood)...")
+            seeding.generate(
+                options['users'], options['tools'], options['requests'],
+                seed=options['seed'], prefix=f'bench{int(time.time())}',
+            )
+
+        user = (
+            get_user_model().objects.filter(tools__isnull=False, borrow_requests__isnull=False)
+            .order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError(
+                'No user with both tools and requests; nothing to benchmark. '
+                'Seed a scratch database with seed_neighbourhood, or pass --allow-seed.'
+            )
+
+        report = {
+            'vendor': connection.vendor,
+            'rows': {
+                'users': get_user_model().objects.count(),
+                'tools': Tool.objects.count(),
+                'requests': BorrowRequest.objects.count(),
+            },
+            'queries': {},
+        }
+        for name, make_queryset, evaluate in self.queries(user):
+            report['queries'][name] = self.measure(make_queryset, evaluate, options['repeat'])
+            self.stdout.write(f"{name}: p50={report['queries'][name]['p50_ms']}ms")
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+    def queries(self, user):
+        requests = BorrowRequest.objects
+        return [
+            ('tool_list', lambda: Tool.objects.with_related().filter(is_available=True).exclude(owner=user)[:10], list),
+            ('my_tools', lambda: Tool.objects.with_related().filter(owner=user), list),
+            ('borrow_request_list', lambda: requests.with_related().for_borrower(user)[:10], list),
+            ('incoming_requests', lambda: requests.with_related().for_owner(user)[:10], list),
+            ('notifications_approvals', lambda: requests.filter(
+                borrower=user, status__in=['approved', 'rejected'], borrower_notified=False), self.count),
+            ('notifications_requests', lambda: requests.filter(
+                tool__owner=user, status='pending', owner_notified=False), self.count),
+            ('request_stats_pending', lambda: requests.filter(borrower=user, status='pending'), self.count),
+            ('request_stats_incoming', lambda: requests.filter(tool__owner=user, status='pending'), self.count),
+        ]
+
+    @staticmethod
+    def count(queryset):
+        return queryset.count()
+
+    def measure(self, make_queryset, evaluate, repeat):
+        queryset = make_queryset()
+        plan = queryset.explain()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            evaluate(make_queryset())
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        return {
+            'plan': plan.splitlines(),
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+            'max_ms': round(timings[-1], 3),
+        }
@@ -0,0 +1,93 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from apps.requests.models import BorrowRequest
+from apps.requests.serializers import BorrowRequestSerializer, BorrowRequestValuesSerializer
+from apps.tools.models import Tool
+from apps.tools.serializers import ToolSerializer, ToolValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Time fetching and serializing 1k-row pages with the nested ModelSerializers '
+        'and with the values() serializers (full, ?expand= and ?fields= modes). '
+        'Generate data first with seed_neighbourhood.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        requests = BorrowRequest.objects.order_by('-created_at')
+        tools = Tool.objects.order_by('-created_at')
+        if requests.count() < rows or tools.count() < rows:
+            raise CommandError(f'Need at least {rows} tools and requests; run seed_neighbourhood first')
+
+        cases = {
+            'borrow_requests': (
+                lambda: requests.with_related().with_overdue()[:rows],
+                BorrowRequestSerializer,
+                lambda: requests.with_overdue()[:rows],
+                BorrowRequestValuesSerializer,
+                ('', '?expand=tool', '?fields=id,status,return_date,is_overdue,tool.name,borrower.username'),
+            ),
+            'tools': (
+                lambda: tools.with_related()[:rows],
+                ToolSerializer,
+                lambda: tools[:rows],
+                ToolValuesSerializer,
+                ('', '?expand=', '?fields=id,name,category,is_available'),
+            ),
+        }
+        report = {'rows': rows, 'repeat': options['repeat'], 'results': {}}
+        factory = RequestFactory()
+        for name, (instances, model_serializer, queryset, values_serializer, queries) in cases.items():
+            request = Request(factory.get('/'))
+            results = report['results'][name] = {
+                'model_serializer': self.measure(
+                    lambda: list(instances()),
+                    lambda page: model_serializer(page, many=True, context={'request': request}).data,
+                    options['repeat'],
+                ),
+            }
+            for query in queries:
+                serializer = values_serializer.from_request(Request(factory.get('/' + query)))
+                results[f'values{query or " (full)"}'] = self.measure(
+                    lambda: list(serializer.values(queryset())), serializer.many, options['repeat'],
+                )
+            baseline = results['model_serializer']['serialize_ms']
+            for label, result in results.items():
+                result['serialize_speedup'] = round(baseline / result['serialize_ms'], 1) if result['serialize_ms'] else None
+                self.stdout.write(
+                    f"{name} {label}: fetch={result['fetch_ms']}ms serialize={result['serialize_ms']}ms "
+                    f"(x{result['serialize_speedup']})"
+                )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+    def measure(self, fetch, serialize, repeat):
+        fetch_times, serialize_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            page = fetch()
+            fetched = time.perf_counter()
+            serialize(page)
+            fetch_times.append((fetched - start) * 1000)
+            serialize_times.append((time.perf_counter() - fetched) * 1000)
+        return {
+            'fetch_ms': round(statistics.median(fetch_times), 2),
+            'serialize_ms': round(statistics.median(serialize_times), 2),
+        }
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PATHS = [
+    '/api/tools/',
+    '/api/tools/stats/',
+    '/api/requests/stats/',
+    '/api/requests/notifications/',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server with many concurrent clients and report throughput '
+        'and latency percentiles. Start the two servers first, e.g. '
+        '`gunicorn toolshare.wsgi -w 4 --threads 8 -b :8000` and '
+        '`uvicorn toolshare.asgi:application --workers 4 --port 8001`, then pass '
+        '--target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True,
+                            help='name=base_url; repeat to compare servers')
+        parser.add_argument('--token', required=True, help='API token sent as "Authorization: Token <key>"')
+        parser.add_argument('--path', action='append', dest='paths', help='Endpoint path (repeatable)')
+        parser.add_argument('--concurrency', type=int, default=1000)
+        parser.add_argument('--requests', type=int, default=20000, help='Requests per target')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['target']:
+            name, sep, url = target.partition('=')
+            if not sep:
+                raise CommandError(f'--target must look like name=url, got {target!r}')
+            targets.append((name, url.rstrip('/')))
+
+        paths = options['paths'] or DEFAULT_PATHS
+        report = {}
+        for name, base_url in targets:
+            self.stdout.write(f'{name}: {options["requests"]} requests, {options["concurrency"]} clients')
+            report[name] = asyncio.run(self.run_target(
+                base_url, paths, options['token'], options['concurrency'],
+                options['requests'], options['timeout'],
+            ))
+            summary = report[name]
+            self.stdout.write(
+                f'  {summary["throughput_rps"]} req/s, p50={summary["p50_ms"]}ms '
+                f'p99={summary["p99_ms"]}ms errors={summary["errors"]}'
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+    async def run_target(self, base_url, paths, token, concurrency, total, timeout):
+        parts = urlsplit(base_url)
+        host, port = parts.hostname, parts.port or 80
+        latencies = []
+        statuses = {}
+        errors = 0
+        remaining = iter(range(total))
+
+        async def client():
+            nonlocal errors
+            for index in remaining:
+                path = paths[index % len(paths)]
+                start = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(
+                        self.fetch(host, port, parts.path + path, token), timeout
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError):
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            'requests': total,
+            'concurrency': concurrency,
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+            'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': round(latencies[-1], 2) if latencies else None,
+            'statuses': statuses,
+            'errors': errors,
+        }
+
+    @staticmethod
+    async def fetch(host, port, path, token):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(
+                f'GET {path} HTTP/1.1\r\n'
+                f'Host: {host}:{port}\r\n'
+                f'Authorization: Token {token}\r\n'
+                'Connection: close\r\n\r\n'.encode('latin-1')
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            # Drain the body so timings include the full response
+            while await reader.read(65536):
+                pass
+            return status
+        finally:
+            writer.close()
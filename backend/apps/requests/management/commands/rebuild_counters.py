@@ -0,0 +1,51 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.requests.counters import compute_counters, rebuild_counters
+from apps.requests.models import UserRequestCounters
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user request counters from BorrowRequest, or check them with --check.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift without writing; exits non-zero on mismatch')
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Limit to these user ids')
+
+    def handle(self, *args, **options):
+        user_ids = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+        if options['users']:
+            user_ids = user_ids.filter(pk__in=options['users'])
+
+        if not options['check']:
+            rebuilt = 0
+            for user_id in user_ids.iterator():
+                rebuild_counters(user_id)
+                rebuilt += 1
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt counters for {rebuilt} users'))
+            return
+
+        stored = {
+            row['user_id']: row
+            for row in UserRequestCounters.objects.values('user_id', *UserRequestCounters.COUNTER_FIELDS)
+        }
+        mismatches = 0
+        for user_id in user_ids.iterator():
+            actual = stored.get(user_id)
+            if actual is None:
+                # Rows are built lazily from scratch on first read, so they can't be stale
+                continue
+            expected = compute_counters(user_id)
+            diff = {
+                field: (actual[field], value)
+                for field, value in expected.items()
+                if actual[field] != value
+            }
+            if diff:
+                mismatches += 1
+                detail = ', '.join(f'{field} stored={got} actual={want}' for field, (got, want) in diff.items())
+                self.stdout.write(f'user {user_id}: {detail}')
+
+        if mismatches:
+            raise CommandError(f'{mismatches} users have inconsistent counters; run rebuild_counters to fix')
+        self.stdout.write(self.style.SUCCESS('All counters consistent'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.requests.reminders import DEFAULT_BATCH_SIZE, send_overdue_reminders
+
+
+class Command(BaseCommand):
+    help = 'Email borrowers and owners about overdue loans. Meant to run daily from cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--interval-days', type=int, default=1,
+                            help='Minimum days between reminders for the same loan')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the loans that would be reminded')
+
+    def handle(self, *args, **options):
+        count = send_overdue_reminders(
+            batch_size=options['batch_size'],
+            interval_days=options['interval_days'],
+            dry_run=options['dry_run'],
+        )
+        verb = 'Would remind' if options['dry_run'] else 'Reminded'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {count} overdue loans'))
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0002_created_at_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(fields=['borrower', 'status', '-created_at'], name='request_borrower_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(fields=['tool', 'status', '-created_at'], name='request_tool_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(condition=models.Q(('borrower_notified', False)), fields=['borrower', 'status'], name='request_borrower_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(condition=models.Q(('owner_notified', False)), fields=['tool', 'status'], name='request_owner_unread_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+        ('requests', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserRequestCounters',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='request_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_borrowed', models.IntegerField(default=0)),
+                ('outgoing_pending', models.IntegerField(default=0)),
+                ('outgoing_approved', models.IntegerField(default=0)),
+                ('unread_decisions', models.IntegerField(default=0)),
+                ('total_lent', models.IntegerField(default=0)),
+                ('incoming_pending', models.IntegerField(default=0)),
+                ('unread_requests', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Request Counters',
+                'verbose_name_plural': 'User Request Counters',
+            },
+        ),
+    ]
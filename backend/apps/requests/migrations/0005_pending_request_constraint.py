@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0004_user_request_counters'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='borrowrequest',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='borrowrequest',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('tool', 'borrower'), name='unique_pending_request'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0005_pending_request_constraint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='borrowrequest',
+            name='last_reminded_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['return_date'], name='request_overdue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowrequest',
+            index=models.Index(condition=models.Q(('status', 'approved')), fields=['borrower', 'return_date'], name='request_borrower_overdue_idx'),
+        ),
+    ]
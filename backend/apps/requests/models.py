@@ -4,6 +4,32 @@ from django.utils import timezone
 from datetime import timedelta
 
 
+class BorrowRequestQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join tool, tool owner and borrower in a single query"""
+        return self.select_related('tool__owner', 'borrower')
+    
+    def for_borrower(self, user):
+        return self.filter(borrower=user)
+    
+    def for_owner(self, user):
+        return self.filter(tool__owner=user)
+    
+    def overdue(self, today=None):
+        """Approved loans past their return date (a range scan on request_overdue_idx)"""
+        today = today or timezone.now().date()
+        return self.filter(status='approved', return_date__lt=today)
+    
+    def with_overdue(self, today=None):
+        """Annotate `overdue` in SQL so is_overdue doesn't work it out per row"""
+        today = today or timezone.now().date()
+        return self.annotate(overdue=models.Case(
+            models.When(status='approved', return_date__lt=today, then=models.Value(True)),
+            default=models.Value(False),
+            output_field=models.BooleanField(),
+        ))
+
+
 class BorrowRequest(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -22,6 +48,10 @@ class BorrowRequest(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     owner_notified = models.BooleanField(default=False)
     borrower_notified = models.BooleanField(default=False)
+    # Set by send_overdue_reminders
+    last_reminded_on = models.DateField(null=True, blank=True)
+    
+    objects = BorrowRequestQuerySet.as_manager()
     
     def save(self, *args, **kwargs):
         # Set return date when request is approved
@@ -34,6 +64,9 @@ class BorrowRequest(models.Model):
     
     @property
     def is_overdue(self):
+        if 'overdue' in self.__dict__:
+            # Annotated by BorrowRequestQuerySet.with_overdue()
+            return self.overdue
         if self.return_date and self.status == 'approved':
             return timezone.now().date() > self.return_date
         return False
@@ -42,4 +75,76 @@ class BorrowRequest(models.Model):
         ordering = ['-created_at']
         verbose_name = 'Borrow Request'
         verbose_name_plural = 'Borrow Requests'
-        unique_together = ['tool', 'borrower', 'status']  # Prevent duplicate pending requests
\ No newline at end of file
+        constraints = [
+            # Prevent duplicate pending requests; returned/rejected history may repeat
+            models.UniqueConstraint(
+                fields=['tool', 'borrower'],
+                condition=models.Q(status='pending'),
+                name='unique_pending_request',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['borrower', '-created_at', '-id'], name='request_borrower_created_idx'),
+            models.Index(fields=['tool', '-created_at', '-id'], name='request_tool_created_idx'),
+            # request_stats and status-filtered feeds
+            models.Index(fields=['borrower', 'status', '-created_at'], name='request_borrower_status_idx'),
+            models.Index(fields=['tool', 'status', '-created_at'], name='request_tool_status_idx'),
+            # notifications: only unread rows are ever counted
+            models.Index(
+                fields=['borrower', 'status'],
+                condition=models.Q(borrower_notified=False),
+                name='request_borrower_unread_idx',
+            ),
+            models.Index(
+                fields=['tool', 'status'],
+                condition=models.Q(owner_notified=False),
+                name='request_owner_unread_idx',
+            ),
+            # overdue loans: range scans on return_date over approved rows only
+            models.Index(
+                fields=['return_date'],
+                condition=models.Q(status='approved'),
+                name='request_overdue_idx',
+            ),
+            models.Index(
+                fields=['borrower', 'return_date'],
+                condition=models.Q(status='approved'),
+                name='request_borrower_overdue_idx',
+            ),
+        ]
+
+class UserRequestCounters(models.Model):
+    """
+    Denormalized per-user request counts for the notification badge and stats.
+
+    Kept current by apps.requests.counters on every state transition; rebuild
+    with `manage.py rebuild_counters` if they ever drift.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='request_counters',
+    )
+    # Borrower side
+    total_borrowed = models.IntegerField(default=0)
+    outgoing_pending = models.IntegerField(default=0)
+    outgoing_approved = models.IntegerField(default=0)
+    unread_decisions = models.IntegerField(default=0)
+    # Owner side
+    total_lent = models.IntegerField(default=0)
+    incoming_pending = models.IntegerField(default=0)
+    unread_requests = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    COUNTER_FIELDS = (
+        'total_borrowed', 'outgoing_pending', 'outgoing_approved', 'unread_decisions',
+        'total_lent', 'incoming_pending', 'unread_requests',
+    )
+    
+    def __str__(self):
+        return f"Request counters for {self.user_id}"
+    
+    class Meta:
+        verbose_name = 'User Request Counters'
+        verbose_name_plural = 'User Request Counters'
@@ -0,0 +1,96 @@
+"""
+Overdue loan reminders, sent in batches by `manage.py send_overdue_reminders`.
+
+Each batch is one indexed range query over overdue loans, one mail connection
+for the batch's messages, and one UPDATE stamping last_reminded_on. Only loans
+whose messages went out are stamped (and announced), so a mail failure leaves
+them due for the next run. A loan is reminded at most once every
+`interval_days`.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import ngettext
+
+from . import events
+from .models import BorrowRequest
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def due_for_reminder(today, interval_days=1):
+    return BorrowRequest.objects.overdue(today).filter(
+        Q(last_reminded_on__isnull=True) | Q(last_reminded_on__lte=today - timedelta(days=interval_days))
+    )
+
+
+def reminder_messages(loan, today):
+    days = (today - loan.return_date).days
+    ago = ngettext('%(days)d day ago', '%(days)d days ago', days) % {'days': days}
+    tool = loan.tool.name
+    return [
+        EmailMessage(
+            subject=f'"{tool}" is overdue',
+            body=(
+                f'Hi {loan.borrower.username},\n\n'
+                f'"{tool}" was due back on {loan.return_date:%d %b %Y} ({ago}). '
+                f'Please return it to {loan.tool.owner.username} as soon as you can.'
+            ),
+            to=[loan.borrower.email],
+        ),
+        EmailMessage(
+            subject=f'"{tool}" has not been returned',
+            body=(
+                f'Hi {loan.tool.owner.username},\n\n'
+                f'{loan.borrower.username} was due to return "{tool}" on '
+                f'{loan.return_date:%d %b %Y} ({ago}). We have sent them a reminder.'
+            ),
+            to=[loan.tool.owner.email],
+        ),
+    ]
+
+
+def send_overdue_reminders(today=None, batch_size=DEFAULT_BATCH_SIZE, interval_days=1, dry_run=False):
+    """Remind borrowers and owners of every overdue loan; returns the loans reminded"""
+    today = today or timezone.now().date()
+    reminded = 0
+    last_pk = 0
+    connection = None if dry_run else get_connection(fail_silently=getattr(settings, 'REMINDER_FAIL_SILENTLY', False))
+    while True:
+        # Walk by pk: loans left unstamped (dry run, failed sends) don't come round again
+        batch = list(
+            due_for_reminder(today, interval_days).filter(pk__gt=last_pk)
+            .select_related('tool__owner', 'borrower').order_by('pk')[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        if dry_run:
+            reminded += len(batch)
+            continue
+
+        sent = []
+        try:
+            with connection:
+                for loan in batch:
+                    messages = reminder_messages(loan, today)
+                    if connection.send_messages(messages) == len(messages):
+                        sent.append(loan)
+        finally:
+            # Also when sending raised part way: those already sent are done
+            _mark_reminded(sent, today)
+        reminded += len(sent)
+    return reminded
+
+
+@transaction.atomic
+def _mark_reminded(loans, today):
+    if not loans:
+        return
+    BorrowRequest.objects.filter(pk__in=[loan.pk for loan in loans]).update(last_reminded_on=today)
+    for loan in loans:
+        events.loan_overdue(loan)
@@ -0,0 +1,205 @@
+"""
+Synthetic neighbourhood data for benchmarks and local load testing.
+
+generate() creates users spread over blocks, tools for them and borrow
+histories for those tools with bulk_create. The same seed and sizes always
+produce the same data. The histories stay consistent with the rest of the
+app:
+- a tool has at most one approved (lent out) request, and is then unavailable
+- pending requests never repeat a (tool, borrower) pair
+- borrowers mostly come from the owner's block
+- some approved loans are overdue
+The counters, block distances and caches that bulk_create bypasses are
+rebuilt afterwards.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.tools.caching import tools_changed
+from apps.tools.models import Tool
+from apps.users.proximity import rebuild_block_distances
+from toolshare.stats import invalidate_global_counts
+from .models import BorrowRequest, UserRequestCounters
+
+BATCH_SIZE = 5_000
+
+TOOL_NAMES = {
+    'Power Tools': ['Cordless Drill', 'Circular Saw', 'Angle Grinder', 'Jigsaw', 'Orbital Sander', 'Impact Driver'],
+    'Hand Tools': ['Claw Hammer', 'Socket Set', 'Screwdriver Set', 'Hand Saw', 'Pliers', 'Spirit Level'],
+    'Garden Tools': ['Lawn Mower', 'Hedge Trimmer', 'Leaf Blower', 'Pruning Shears', 'Wheelbarrow', 'Rake'],
+    'Cleaning': ['Pressure Washer', 'Carpet Cleaner', 'Wet/Dry Vacuum', 'Steam Mop', 'Window Squeegee'],
+    'Automotive': ['Car Jack', 'Torque Wrench', 'Jump Starter', 'Tyre Inflator', 'OBD Scanner'],
+    'Measuring': ['Laser Measure', 'Stud Finder', 'Tape Measure', 'Multimeter', 'Moisture Meter'],
+    'Other': ['Ladder', 'Extension Cord', 'Folding Table', 'Camping Tent', 'Projector'],
+}
+# Relative frequency of categories and of request outcomes in a tool's history
+CATEGORY_WEIGHTS = {'Power Tools': 25, 'Hand Tools': 25, 'Garden Tools': 20, 'Cleaning': 10,
+                    'Automotive': 8, 'Measuring': 7, 'Other': 5}
+STATUS_WEIGHTS = {'returned': 50, 'rejected': 15, 'pending': 25, 'approved': 10}
+SAME_BLOCK_BORROWER = 0.7
+
+
+def generate(n_users, n_tools, n_requests, blocks=20, seed=42, prefix='seed', stdout=None):
+    """Create the data set; returns the row counts created"""
+    rng = random.Random(seed)
+    User = get_user_model()
+    if User.objects.filter(username__startswith=f'{prefix}-').exists():
+        raise ValueError(f'Users prefixed {prefix!r} already exist; delete them or pick another prefix')
+
+    with transaction.atomic():
+        users = _create_users(User, n_users, blocks, prefix)
+        tools = _create_tools(rng, users, n_tools, prefix)
+        created, lent_tools = _create_requests(rng, users, tools, n_requests, stdout)
+        for start in range(0, len(lent_tools), BATCH_SIZE):
+            Tool.objects.filter(pk__in=lent_tools[start:start + BATCH_SIZE]).update(is_available=False)
+        rebuild_counters_for([pk for pk, _ in users])
+        rebuild_block_distances()
+        tools_changed(*{pk for pk, _ in users})
+        invalidate_global_counts()
+    return {'users': len(users), 'tools': len(tools), 'requests': created}
+
+
+def _create_users(User, n_users, blocks, prefix):
+    for start in range(0, n_users, BATCH_SIZE):
+        User.objects.bulk_create([
+            User(
+                username=f'{prefix}-{i}',
+                email=f'{prefix}-{i}@example.com',
+                # Unusable: benchmark clients authenticate with tokens
+                password='!',
+                block_no=str(i % blocks + 1),
+                house_no=str(i // blocks + 1),
+            )
+            for i in range(start, min(start + BATCH_SIZE, n_users))
+        ])
+    return list(
+        User.objects.filter(username__startswith=f'{prefix}-').order_by('pk').values_list('pk', 'block_no')
+    )
+
+
+def _create_tools(rng, users, n_tools, prefix):
+    categories = list(CATEGORY_WEIGHTS)
+    weights = list(CATEGORY_WEIGHTS.values())
+    conditions = [c for c, _ in Tool.CONDITION_CHOICES]
+    owner_ids = [pk for pk, _ in users]
+    for start in range(0, n_tools, BATCH_SIZE):
+        batch = []
+        for _ in range(start, min(start + BATCH_SIZE, n_tools)):
+            category = rng.choices(categories, weights)[0]
+            batch.append(Tool(
+                name=rng.choice(TOOL_NAMES[category]),
+                category=category,
+                condition=rng.choice(conditions),
+                # A few owners have a shed full, most have one or two
+                owner_id=owner_ids[int(len(owner_ids) * rng.random() ** 2)],
+            ))
+        Tool.objects.bulk_create(batch)
+    return list(
+        Tool.objects.filter(owner__username__startswith=f'{prefix}-').order_by('pk').values_list('pk', 'owner_id')
+    )
+
+
+def _create_requests(rng, users, tools, n_requests, stdout):
+    if not tools or len(users) < 2:
+        return 0, []
+    block_of = dict(users)
+    by_block = {}
+    for pk, block in users:
+        by_block.setdefault(block, []).append(pk)
+    all_ids = [pk for pk, _ in users]
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    today = timezone.now().date()
+
+    def pick_borrower(owner_id):
+        while True:
+            pool = by_block[block_of[owner_id]] if rng.random() < SAME_BLOCK_BORROWER else all_ids
+            borrower_id = rng.choice(pool)
+            if borrower_id != owner_id:
+                return borrower_id
+
+    per_tool, extra = divmod(n_requests, len(tools))
+    created = 0
+    lent_tools = []
+    batch = []
+    for index, (tool_id, owner_id) in enumerate(tools):
+        history = []
+        lent = False
+        pending_borrowers = set()
+        for _ in range(per_tool + (1 if index < extra else 0)):
+            borrower_id = pick_borrower(owner_id)
+            status = rng.choices(statuses, weights)[0]
+            if status == 'approved' and lent:
+                status = 'returned'
+            if status == 'pending' and borrower_id in pending_borrowers:
+                status = 'rejected'
+            request = BorrowRequest(
+                tool_id=tool_id, borrower_id=borrower_id, reason='Synthetic request',
+                duration=rng.randint(1, 14), status=status,
+                # History has been seen; open items often haven't
+                owner_notified=status != 'pending' or rng.random() < 0.5,
+                borrower_notified=status in ('pending', 'returned') or rng.random() < 0.7,
+            )
+            if status == 'approved':
+                lent = True
+                # Roughly a fifth of current loans are overdue
+                request.return_date = today + timedelta(days=rng.randint(-3, 12))
+                lent_tools.append(tool_id)
+            elif status == 'returned':
+                request.return_date = today - timedelta(days=rng.randint(1, 365))
+            elif status == 'pending':
+                pending_borrowers.add(borrower_id)
+            history.append(request)
+        if lent:
+            # Approving a request rejects the others pending for the tool
+            for request in history:
+                if request.status == 'pending':
+                    request.status = 'rejected'
+                    request.owner_notified = True
+        batch.extend(history)
+        if len(batch) >= BATCH_SIZE:
+            BorrowRequest.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+            if stdout is not None:
+                stdout.write(f'  {created} requests')
+    if batch:
+        BorrowRequest.objects.bulk_create(batch)
+        created += len(batch)
+    return created, lent_tools
+
+
+def rebuild_counters_for(user_ids):
+    """Set-based rebuild of UserRequestCounters: two grouped aggregates, one bulk insert"""
+    counts = {user_id: dict.fromkeys(UserRequestCounters.COUNTER_FIELDS, 0) for user_id in user_ids}
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        chunk = user_ids[start:start + BATCH_SIZE]
+        borrower_side = BorrowRequest.objects.filter(borrower_id__in=chunk).values('borrower_id').annotate(
+            total_borrowed=Count('pk'),
+            outgoing_pending=Count('pk', filter=Q(status='pending')),
+            outgoing_approved=Count('pk', filter=Q(status='approved')),
+            unread_decisions=Count(
+                'pk', filter=Q(status__in=['approved', 'rejected'], borrower_notified=False)
+            ),
+        )
+        for row in borrower_side:
+            counts[row.pop('borrower_id')].update(row)
+        owner_side = BorrowRequest.objects.filter(tool__owner_id__in=chunk).values('tool__owner_id').annotate(
+            total_lent=Count('pk'),
+            incoming_pending=Count('pk', filter=Q(status='pending')),
+            unread_requests=Count('pk', filter=Q(status='pending', owner_notified=False)),
+        )
+        for row in owner_side:
+            counts[row.pop('tool__owner_id')].update(row)
+
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        UserRequestCounters.objects.filter(user_id__in=user_ids[start:start + BATCH_SIZE]).delete()
+    UserRequestCounters.objects.bulk_create(
+        [UserRequestCounters(user_id=user_id, **fields) for user_id, fields in counts.items()],
+        batch_size=BATCH_SIZE,
+    )
@@ -1,7 +1,12 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from . import counters, events
 from .models import BorrowRequest
-from apps.tools.serializers import ToolSerializer
-from apps.users.serializers import UserSerializer
+from .services import BATCH_ACTIONS
+from apps.tools.serializers import ToolSerializer, ToolValuesSerializer
+from apps.users.serializers import UserSerializer, UserValuesSerializer
+from toolshare.sparse import ValuesSerializer
 
 
 class BorrowRequestSerializer(serializers.ModelSerializer):
@@ -16,6 +21,26 @@ class BorrowRequestSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'borrower', 'created_at', 'updated_at', 'return_date')
 
 
+class BorrowRequestValuesSerializer(ValuesSerializer):
+    """BorrowRequestSerializer's output from values() rows, for list endpoints"""
+    fields = BorrowRequestSerializer.Meta.fields
+    relations = {
+        'tool': (ToolValuesSerializer, 'tool_id'),
+        'borrower': (UserValuesSerializer, 'borrower_id'),
+    }
+    datetime_fields = ('created_at', 'updated_at')
+    date_fields = ('return_date',)
+    computed = {'is_overdue': ('overdue',)}
+
+    def values(self, queryset):
+        if 'overdue' not in queryset.query.annotations:
+            queryset = queryset.with_overdue()
+        return super().values(queryset)
+
+    def get_is_overdue(self, row):
+        return self.value(row, 'overdue')
+
+
 class BorrowRequestCreateSerializer(serializers.ModelSerializer):
     tool_id = serializers.IntegerField()
     
@@ -55,7 +80,15 @@ class BorrowRequestCreateSerializer(serializers.ModelSerializer):
         
         validated_data['tool'] = tool
         validated_data['borrower'] = self.context['request'].user
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                borrow_request = super().create(validated_data)
+                counters.request_created(borrow_request)
+                events.request_changed(borrow_request, 'request.created')
+        except IntegrityError:
+            # Lost a race with a concurrent identical request
+            raise serializers.ValidationError("You already have a pending request for this tool")
+        return borrow_request
 
 
 class BorrowRequestUpdateSerializer(serializers.ModelSerializer):
@@ -66,4 +99,14 @@ class BorrowRequestUpdateSerializer(serializers.ModelSerializer):
     def validate_status(self, value):
         if value not in ['approved', 'rejected']:
             raise serializers.ValidationError("Status can only be 'approved' or 'rejected'")
-        return value
\ No newline at end of file
+        return value
+
+class BatchActionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=list(BATCH_ACTIONS))
+
+
+class BatchSerializer(serializers.Serializer):
+    actions = BatchActionSerializer(
+        many=True, allow_empty=False, max_length=getattr(settings, 'REQUEST_BATCH_MAX_ACTIONS', 1000)
+    )
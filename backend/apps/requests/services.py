@@ -0,0 +1,250 @@
+"""
+Borrow request state machine.
+
+    pending --approve--> approved --return--> returned
+    pending --reject---> rejected
+
+Every transition starts with a conditional UPDATE (`... WHERE status = <from>`)
+so the database decides the winner of concurrent clicks: whoever updates
+zero rows lost the race. The tool is claimed the same way
+(`... WHERE is_available`), and approving a request rejects the other pending
+requests for that tool in bulk, all inside one transaction.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from apps.tools.caching import tools_changed
+from apps.tools.models import Tool
+from toolshare.stats import invalidate_global_counts
+from . import counters, events
+from .models import BorrowRequest
+
+
+class TransitionError(Exception):
+    """Base class for transitions that could not be applied"""
+
+
+class RequestNotFound(TransitionError):
+    """No request with that id in the required state for this owner"""
+
+
+class ToolUnavailable(TransitionError):
+    """The tool is already lent out"""
+
+
+def _transition(pk, owner, from_status, **changes):
+    """Conditionally move one request; returns False if it wasn't in from_status"""
+    changes.setdefault('updated_at', timezone.now())
+    updated = BorrowRequest.objects.filter(
+        pk=pk, tool__owner=owner, status=from_status
+    ).update(**changes)
+    return bool(updated)
+
+
+def _set_tool_availability(pk, available):
+    tool_id = BorrowRequest.objects.filter(pk=pk).values('tool_id')
+    updated = Tool.objects.filter(pk=Subquery(tool_id), is_available=not available).update(
+        is_available=available, updated_at=timezone.now()
+    )
+    if updated:
+        # QuerySet.update() sends no post_save, so expire cached tool responses
+        # and the available_tools total here
+        tools_changed(*Tool.objects.filter(pk=Subquery(tool_id)).values_list('owner_id', flat=True))
+        invalidate_global_counts()
+    return updated
+
+
+def _load(pk):
+    return BorrowRequest.objects.with_related().get(pk=pk)
+
+
+@transaction.atomic
+def approve(pk, owner):
+    if not _transition(pk, owner, 'pending', status='approved', borrower_notified=False):
+        raise RequestNotFound(pk)
+    if not _set_tool_availability(pk, available=False):
+        raise ToolUnavailable('This tool is already lent out')
+
+    borrow_request = _load(pk)
+    borrow_request.return_date = timezone.now().date() + timedelta(days=borrow_request.duration)
+    BorrowRequest.objects.filter(pk=pk).update(return_date=borrow_request.return_date)
+    borrow_request.tool.is_available = False
+
+    counters.request_decided(borrow_request, borrow_request.owner_notified)
+    events.request_changed(borrow_request, 'request.approved')
+    reject_competing(borrow_request)
+    return borrow_request
+
+
+@transaction.atomic
+def reject(pk, owner):
+    if not _transition(pk, owner, 'pending', status='rejected', borrower_notified=False):
+        raise RequestNotFound(pk)
+
+    borrow_request = _load(pk)
+    counters.request_decided(borrow_request, borrow_request.owner_notified)
+    events.request_changed(borrow_request, 'request.rejected')
+    return borrow_request
+
+
+@transaction.atomic
+def mark_returned(pk, owner):
+    if not _transition(pk, owner, 'approved', status='returned'):
+        raise RequestNotFound(pk)
+    _set_tool_availability(pk, available=True)
+
+    borrow_request = _load(pk)
+    counters.request_returned(borrow_request, borrow_request.borrower_notified)
+    events.request_changed(borrow_request, 'request.returned')
+    return borrow_request
+
+
+def reject_competing(borrow_request):
+    """Reject, in one UPDATE, the other pending requests for an approved tool"""
+    competing = BorrowRequest.objects.filter(
+        tool_id=borrow_request.tool_id, status='pending'
+    ).exclude(pk=borrow_request.pk)
+    rows = list(competing.values_list('pk', 'borrower_id', 'owner_notified'))
+    if not rows:
+        return 0
+
+    competing.update(status='rejected', borrower_notified=False, updated_at=timezone.now())
+
+    # Counters: one UPDATE per distinct borrower delta plus one for the owner
+    per_borrower = {}
+    for _, borrower_id, _ in rows:
+        per_borrower[borrower_id] = per_borrower.get(borrower_id, 0) + 1
+    counters.apply_many({
+        borrower_id: {'outgoing_pending': -n, 'unread_decisions': n}
+        for borrower_id, n in per_borrower.items()
+    })
+    counters.apply_deltas(
+        borrow_request.tool.owner_id,
+        incoming_pending=-len(rows),
+        unread_requests=-sum(1 for _, _, notified in rows if not notified),
+    )
+
+    for pk, borrower_id, _ in rows:
+        events.request_changed(
+            BorrowRequest(pk=pk, tool=borrow_request.tool, borrower_id=borrower_id, status='rejected'),
+            'request.rejected',
+        )
+    return len(rows)
+
+
+class ConcurrentChange(TransitionError):
+    """Requests in a batch changed between reading and updating them"""
+
+
+BATCH_ACTIONS = {'approve': 'approved', 'reject': 'rejected'}
+
+
+@transaction.atomic
+def apply_batch(owner, actions):
+    """
+    Approve and reject many of owner's pending requests at once.
+
+    actions is a list of (request_id, action) pairs. The requests and their
+    tools are read (and locked, where the database supports it) in one query;
+    each kind of change is then one set-based UPDATE: the tool claims, the
+    approvals (one per distinct return date), the rejections and the
+    competing requests rejected by the approvals. Returns one result dict per
+    action, in order, with the status the request ended up in; a second
+    approval for a tool is rejected as competing and names the request that
+    won it in `superseded_by`. Actions that can't be applied are reported
+    with an `error`, not raised;
+    if rows change underneath the batch, ConcurrentChange rolls it all back.
+    """
+    rows = {
+        row['pk']: row
+        for row in BorrowRequest.objects.select_for_update().filter(
+            pk__in={pk for pk, _ in actions}, tool__owner=owner, status='pending'
+        ).values('pk', 'tool_id', 'borrower_id', 'duration', 'owner_notified', 'tool__is_available')
+    }
+
+    results = []
+    approved, rejected = {}, {}
+    claimed_tools = {}
+    seen = set()
+    for pk, action in actions:
+        result = {'id': pk, 'action': action}
+        results.append(result)
+        row = rows.get(pk)
+        if pk in seen:
+            result['error'] = 'Request appears more than once in the batch'
+        elif row is None:
+            result['error'] = 'Not found'
+        elif action == 'approve' and not row['tool__is_available']:
+            result['error'] = 'This tool is already lent out'
+        elif action == 'approve' and row['tool_id'] in claimed_tools:
+            # An earlier approval in this batch won the tool; this request is
+            # rejected with the other competing ones below
+            result['status'] = 'rejected'
+            result['superseded_by'] = claimed_tools[row['tool_id']]
+        else:
+            if action == 'approve':
+                claimed_tools[row['tool_id']] = pk
+                approved[pk] = row
+            else:
+                rejected[pk] = row
+            result['status'] = BATCH_ACTIONS[action]
+        seen.add(pk)
+
+    now = timezone.now()
+    if claimed_tools:
+        updated = Tool.objects.filter(pk__in=claimed_tools, is_available=True).update(
+            is_available=False, updated_at=now
+        )
+        if updated != len(claimed_tools):
+            raise ConcurrentChange()
+
+    by_return_date = {}
+    for pk, row in approved.items():
+        return_date = now.date() + timedelta(days=row['duration'])
+        by_return_date.setdefault(return_date, []).append(pk)
+    decided = 0
+    for return_date, pks in by_return_date.items():
+        decided += BorrowRequest.objects.filter(pk__in=pks, status='pending').update(
+            status='approved', return_date=return_date, borrower_notified=False, updated_at=now
+        )
+    if rejected:
+        decided += BorrowRequest.objects.filter(pk__in=rejected, status='pending').update(
+            status='rejected', borrower_notified=False, updated_at=now
+        )
+    if decided != len(approved) + len(rejected):
+        raise ConcurrentChange()
+
+    # Other pending requests for the tools just lent out, in the batch or not
+    competing = BorrowRequest.objects.filter(tool_id__in=claimed_tools, status='pending')
+    competing_rows = list(competing.values_list('pk', 'borrower_id', 'owner_notified'))
+    if competing_rows:
+        competing.update(status='rejected', borrower_notified=False, updated_at=now)
+
+    changes = [(pk, row['borrower_id'], 'approved') for pk, row in approved.items()]
+    changes += [(pk, row['borrower_id'], 'rejected') for pk, row in rejected.items()]
+    changes += [(pk, borrower_id, 'rejected') for pk, borrower_id, _ in competing_rows]
+    if not changes:
+        return results
+
+    per_borrower = {}
+    for pk, borrower_id, status in changes:
+        deltas = per_borrower.setdefault(
+            borrower_id, {'outgoing_pending': 0, 'outgoing_approved': 0, 'unread_decisions': 0}
+        )
+        deltas['outgoing_pending'] -= 1
+        deltas['unread_decisions'] += 1
+        if status == 'approved':
+            deltas['outgoing_approved'] += 1
+    counters.apply_many(per_borrower)
+    unread = sum(1 for row in [*approved.values(), *rejected.values()] if not row['owner_notified'])
+    unread += sum(1 for _, _, notified in competing_rows if not notified)
+    counters.apply_deltas(owner.pk, incoming_pending=-len(changes), unread_requests=-unread)
+
+    if claimed_tools:
+        tools_changed(owner.pk)
+        invalidate_global_counts()
+    events.requests_changed(owner.pk, changes)
+    return results
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.requests.counters import compute_counters, get_counters
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+
+
+class BorrowRequestAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password=None)
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        cls.borrowers = [
+            User.objects.create_user(username=f'borrower{i}', email=f'borrower{i}@example.com') for i in range(2)
+        ]
+        cls.tool = Tool.objects.create(owner=cls.owner, name='Drill', category='Power Tools', condition='Good')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.changelist = '/admin/requests/borrowrequest/'
+
+    def add_request(self, borrower):
+        response = self.client.post(self.changelist + 'add/', {
+            'tool': self.tool.pk, 'borrower': borrower.pk, 'reason': 'x', 'duration': 2, 'status': 'approved',
+        })
+        self.assertEqual(response.status_code, 302)
+        return BorrowRequest.objects.get(borrower=borrower)
+
+    def assertCountersConsistent(self):
+        for user in [self.owner, *self.borrowers]:
+            stored = get_counters(user.pk)
+            expected = compute_counters(user.pk)
+            self.assertEqual({field: getattr(stored, field) for field in expected}, expected, user.username)
+
+    def test_status_changes_go_through_the_state_machine(self):
+        first, second = [self.add_request(borrower) for borrower in self.borrowers]
+        # New requests always start pending
+        self.assertEqual(first.status, 'pending')
+        self.assertCountersConsistent()
+
+        response = self.client.post(self.changelist, {
+            'action': 'approve_selected', '_selected_action': [first.pk],
+        })
+        self.assertEqual(response.status_code, 302)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.tool.refresh_from_db()
+        self.assertEqual((first.status, second.status), ('approved', 'rejected'))
+        self.assertFalse(self.tool.is_available)
+        self.assertCountersConsistent()
+
+        self.client.post(self.changelist, {'action': 'mark_selected_returned', '_selected_action': [first.pk]})
+        first.refresh_from_db()
+        self.tool.refresh_from_db()
+        self.assertEqual(first.status, 'returned')
+        self.assertTrue(self.tool.is_available)
+        self.assertCountersConsistent()
+
+    def test_change_form_cannot_edit_status(self):
+        borrow_request = self.add_request(self.borrowers[0])
+        self.client.post(f'{self.changelist}{borrow_request.pk}/change/', {
+            'reason': 'y', 'duration': 2, 'status': 'approved', 'return_date': '',
+        })
+        borrow_request.refresh_from_db()
+        self.assertEqual((borrow_request.reason, borrow_request.status), ('y', 'pending'))
+        self.assertCountersConsistent()
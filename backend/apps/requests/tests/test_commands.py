@@ -0,0 +1,22 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+
+
+class BenchmarkQueriesTests(TestCase):
+    def test_seeds_nothing_unless_allowed(self):
+        with self.assertRaisesMessage(CommandError, '--allow-seed'):
+            call_command('benchmark_queries', repeat=1, stdout=StringIO())
+        self.assertFalse(get_user_model().objects.exists())
+
+    def test_allow_seed_seeds_then_benchmarks(self):
+        out = StringIO()
+        call_command('benchmark_queries', allow_seed=True, users=4, tools=8, requests=20, repeat=1, stdout=out)
+        self.assertEqual(BorrowRequest.objects.count(), 20)
+        self.assertEqual(Tool.objects.count(), 8)
+        self.assertIn('tool_list: p50=', out.getvalue())
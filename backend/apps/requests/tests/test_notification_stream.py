@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.test import RequestFactory
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from apps.requests import views
+
+
+class NotificationStreamTokenTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='user', email='user@example.com')
+        cls.api_token = Token.objects.create(user=cls.user)
+
+    def stream_token(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.post('/api/requests/notifications/stream/token/')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 200)
+        return response.data['token']
+
+    def stream_user(self, **params):
+        return views.stream_user(RequestFactory().get('/api/requests/notifications/stream/', params))
+
+    def test_stream_token_opens_the_stream(self):
+        self.assertEqual(self.stream_user(stream_token=self.stream_token()), self.user)
+
+    def test_api_token_is_not_accepted_in_the_url(self):
+        self.assertIsNone(self.stream_user(token=self.api_token.key))
+        self.assertIsNone(self.stream_user(stream_token=self.api_token.key))
+        response = self.client.get('/api/requests/notifications/stream/', {'token': self.api_token.key})
+        self.assertEqual(response.status_code, 401)
+
+    def test_api_token_is_accepted_in_the_header(self):
+        request = RequestFactory().get(
+            '/api/requests/notifications/stream/', HTTP_AUTHORIZATION=f'Token {self.api_token.key}'
+        )
+        self.assertEqual(views.stream_user(request), self.user)
+
+    def test_stream_token_expires(self):
+        token = self.stream_token()
+        with mock.patch('time.time', return_value=2**40):
+            self.assertIsNone(self.stream_user(stream_token=token))
+
+    def test_stream_token_is_single_purpose(self):
+        # Same user id, signed for something else
+        other = signing.TimestampSigner(salt='something-else').sign(str(self.user.pk))
+        self.assertIsNone(self.stream_user(stream_token=other))
+
+    def test_stream_token_requires_authentication(self):
+        response = self.client.post('/api/requests/notifications/stream/token/')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,87 @@
+import base64
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+
+
+class KeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        tool = Tool.objects.create(owner=cls.owner, name='Drill', category='Power Tools', condition='Good')
+        cls.requests = [
+            BorrowRequest.objects.create(
+                tool=tool, reason='x', duration=2,
+                borrower=User.objects.create_user(username=f'borrower{i}', email=f'borrower{i}@example.com'),
+            )
+            for i in range(7)
+        ]
+        # Spread over three timestamps so pages break inside runs of equal created_at
+        start = timezone.now()
+        for i, borrow_request in enumerate(cls.requests):
+            BorrowRequest.objects.filter(pk=borrow_request.pk).update(created_at=start - timedelta(minutes=i // 3))
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    def expected_order(self):
+        return list(BorrowRequest.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def walk(self, path):
+        """Follow `next` links from path; returns the pages"""
+        pages = []
+        while path:
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(set(response.data), {'next', 'results'})
+            pages.append(response.data['results'])
+            path = response.data['next']
+        return pages
+
+    def test_cursor_round_trip_visits_every_row_once(self):
+        pages = self.walk('/api/requests/incoming/?pagination=cursor&page_size=2')
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual([row['id'] for page in pages for row in page], self.expected_order())
+
+    def test_ties_on_created_at_break_on_id(self):
+        BorrowRequest.objects.update(created_at=timezone.now())
+        for page_size in (1, 2, 3):
+            with self.subTest(page_size=page_size):
+                pages = self.walk(f'/api/requests/incoming/?pagination=cursor&page_size={page_size}')
+                ids = [row['id'] for page in pages for row in page]
+                self.assertEqual(ids, sorted((r.pk for r in self.requests), reverse=True))
+
+    def test_last_page_has_no_next_link(self):
+        response = self.client.get('/api/requests/incoming/?pagination=cursor&page_size=7')
+        self.assertEqual(len(response.data['results']), 7)
+        self.assertIsNone(response.data['next'])
+
+    def test_malformed_cursor_is_not_found(self):
+        def encode(raw):
+            return base64.urlsafe_b64encode(raw).decode('ascii')
+
+        for cursor in ('not base64!', encode(b'no separator'), encode(b'yesterday|3'),
+                       encode(b'2024-01-01T00:00:00+00:00|x'), encode('é|1'.encode())):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/requests/incoming/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+    def test_cursor_with_sparse_fields(self):
+        pages = self.walk('/api/requests/incoming/?pagination=cursor&page_size=3&fields=status,tool.name')
+        rows = [row for page in pages for row in page]
+        # The cursor still comes from id and created_at, which aren't in the output
+        self.assertEqual(len(rows), len(self.requests))
+        self.assertEqual(rows[0], {'status': 'pending', 'tool': {'name': 'Drill'}})
+
+        response = self.client.get('/api/requests/incoming/?pagination=cursor&page_size=3&fields=status')
+        next_query = parse_qs(urlparse(response.data['next']).query)
+        self.assertEqual(next_query['fields'], ['status'])
+        self.assertIn('cursor', next_query)
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+from apps.tools.search import get_search_backend
+from apps.users.proximity import rebuild_block_distances
+
+# Queries each list endpoint may run for a page of rows, whatever the page
+# size: a view that starts loading relations per row (N+1) goes over.
+# Authentication is forced, so these count only the view's own work.
+BUDGETS = {
+    '/api/tools/': 3,
+    # Versions and facet cells for everyone and for the requester's tools, then the page
+    '/api/tools/search/?q=drill': 5,
+    '/api/tools/search/?q=drill&pagination=cursor': 5,
+    # The block distances, then one query per distance the page reaches (two blocks here)
+    '/api/tools/nearby/': 3,
+    '/api/tools/my-tools/': 2,
+    '/api/requests/': 2,
+    '/api/requests/incoming/': 2,
+    '/api/requests/lent/': 2,
+    '/api/requests/borrowed/': 2,
+    '/api/requests/overdue/': 2,
+    # Keyset pages skip the COUNT(*)
+    '/api/tools/?pagination=cursor': 2,
+    '/api/requests/?pagination=cursor': 1,
+    '/api/requests/lent/?pagination=cursor': 1,
+}
+
+
+class QueryBudgetTests(APITestCase):
+    TOOLS_PER_USER = 6
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', block_no='AB'[i % 2])
+            for i in range(4)
+        ]
+        rebuild_block_distances()
+        tools = [
+            Tool.objects.create(owner=user, name=f'Drill {user.pk}-{i}', category='Power Tools', condition='Good')
+            for user in cls.users for i in range(cls.TOOLS_PER_USER)
+        ]
+        # Every user borrows from every other user, in every status, some overdue
+        statuses = ['pending', 'approved', 'rejected', 'returned']
+        past = timezone.now().date() - timedelta(days=3)
+        for i, tool in enumerate(tools):
+            for borrower in cls.users:
+                if borrower.pk == tool.owner_id:
+                    continue
+                status = statuses[(i + borrower.pk) % len(statuses)]
+                BorrowRequest.objects.create(
+                    tool=tool, borrower=borrower, reason='x', duration=2, status=status,
+                    return_date=past if status == 'approved' else None,
+                )
+
+    def setUp(self):
+        self.user = self.users[0]
+        self.client.force_authenticate(self.user)
+        # Picked once per process, whichever test runs first
+        get_search_backend()
+
+    def get(self, path, budget):
+        # Cold caches: the budget covers a request that has to do all the work
+        cache.clear()
+        with self.assertNumQueries(budget):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200, path)
+        return response
+
+    def test_list_endpoints_stay_within_budget(self):
+        for path, budget in BUDGETS.items():
+            with self.subTest(path=path):
+                response = self.get(path, budget)
+                results = response.data['results'] if 'results' in response.data else response.data
+                if isinstance(results, dict):
+                    results = results['borrowed'] + results['lent']
+                # Enough rows that an N+1 shows up as extra queries
+                self.assertGreater(len(results), 1, path)
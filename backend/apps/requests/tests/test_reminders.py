@@ -0,0 +1,93 @@
+from datetime import date, timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase
+
+from apps.requests.models import BorrowRequest
+from apps.requests.reminders import send_overdue_reminders
+from apps.tools.models import Tool
+
+
+class OverdueReminderTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        borrower = User.objects.create_user(username='borrower', email='borrower@example.com')
+        tool = Tool.objects.create(owner=owner, name='Drill', category='Power Tools', condition='Good')
+        cls.loan = BorrowRequest.objects.create(
+            tool=tool, borrower=borrower, reason='x', duration=2, status='approved', return_date=date(2024, 3, 1)
+        )
+
+    def remind(self, days_overdue):
+        mail.outbox = []
+        self.assertEqual(send_overdue_reminders(today=self.loan.return_date + timedelta(days=days_overdue)), 1)
+        BorrowRequest.objects.filter(pk=self.loan.pk).update(last_reminded_on=None)
+        return [message.body for message in mail.outbox]
+
+    def test_one_day_overdue_is_singular(self):
+        bodies = self.remind(1)
+        self.assertEqual(len(bodies), 2)
+        for body in bodies:
+            self.assertIn('(1 day ago)', body)
+
+    def test_several_days_overdue_is_plural(self):
+        for body in self.remind(3):
+            self.assertIn('(3 days ago)', body)
+
+
+class ReminderDeliveryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        borrower = User.objects.create_user(username='borrower', email='borrower@example.com')
+        cls.loans = [
+            BorrowRequest.objects.create(
+                tool=Tool.objects.create(owner=owner, name=f'Drill {i}', category='Power Tools', condition='Good'),
+                borrower=borrower, reason='x', duration=2, status='approved', return_date=date(2024, 3, 1),
+            )
+            for i in range(3)
+        ]
+        cls.today = date(2024, 3, 5)
+
+    def reminded_on(self):
+        return list(
+            BorrowRequest.objects.filter(pk__in=[loan.pk for loan in self.loans])
+            .order_by('pk').values_list('last_reminded_on', flat=True)
+        )
+
+    def test_loans_are_stamped_once_sent(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(send_overdue_reminders(today=self.today, batch_size=2), 3)
+        self.assertEqual(self.reminded_on(), [self.today] * 3)
+        self.assertEqual(len(mail.outbox), 6)
+        # Reminded today, so not due again until the interval has passed
+        self.assertEqual(send_overdue_reminders(today=self.today), 0)
+
+    def test_a_failed_send_leaves_the_rest_of_the_batch_due(self):
+        sent = EmailBackend.send_messages
+        calls = []
+
+        def send_messages(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise SMTPException('connection lost')
+            return sent(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', send_messages):
+            with self.assertRaises(SMTPException):
+                send_overdue_reminders(today=self.today)
+        self.assertEqual(self.reminded_on(), [self.today, None, None])
+
+        self.assertEqual(send_overdue_reminders(today=self.today), 2)
+        self.assertEqual(self.reminded_on(), [self.today] * 3)
+
+    def test_silently_failed_sends_are_not_stamped(self):
+        with mock.patch.object(EmailBackend, 'send_messages', return_value=0):
+            self.assertEqual(send_overdue_reminders(today=self.today), 0)
+        self.assertEqual(self.reminded_on(), [None] * 3)
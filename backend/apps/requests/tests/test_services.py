@@ -0,0 +1,212 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.requests import services
+from apps.requests.counters import compute_counters
+from apps.requests.models import BorrowRequest, UserRequestCounters
+from apps.tools.models import Tool
+from toolshare.stats import global_counts
+
+
+class ConcurrentApprovalTests(TransactionTestCase):
+    """Competing approvals race on real, separate connections"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        self.borrowers = [
+            User.objects.create_user(username=f'borrower{i}', email=f'borrower{i}@example.com')
+            for i in range(2)
+        ]
+        self.tool = Tool.objects.create(owner=self.owner, name='Drill', category='Power Tools', condition='Good')
+        self.requests = []
+        for borrower in self.borrowers:
+            client = APIClient()
+            client.force_authenticate(borrower)
+            response = client.post('/api/requests/', {'tool_id': self.tool.pk, 'reason': 'x', 'duration': 2}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.requests.append(response.data['id'])
+
+    def approve_in_parallel(self, pks):
+        barrier = threading.Barrier(len(pks))
+        statuses = {}
+
+        def approve(pk):
+            client = APIClient()
+            client.force_authenticate(self.owner)
+            try:
+                barrier.wait()
+                statuses[pk] = client.post(f'/api/requests/{pk}/approve/').status_code
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=approve, args=(pk,)) for pk in pks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return statuses
+
+    def test_exactly_one_competing_approval_wins(self):
+        statuses = self.approve_in_parallel(self.requests)
+
+        winners = [pk for pk, code in statuses.items() if code == 200]
+        self.assertEqual(len(winners), 1, statuses)
+        loser = next(pk for pk in self.requests if pk not in winners)
+        # Lost the race for the tool (409), or was auto-rejected by the winner first (404)
+        self.assertIn(statuses[loser], (404, 409))
+
+        self.assertEqual(BorrowRequest.objects.get(pk=winners[0]).status, 'approved')
+        self.assertEqual(BorrowRequest.objects.get(pk=loser).status, 'rejected')
+        self.tool.refresh_from_db()
+        self.assertFalse(self.tool.is_available)
+        for user in [self.owner, *self.borrowers]:
+            counters = UserRequestCounters.objects.get(pk=user.pk)
+            stored = {field: getattr(counters, field) for field in compute_counters(user.pk)}
+            self.assertEqual(stored, compute_counters(user.pk), user.username)
+
+
+class GlobalCountsTests(TestCase):
+    """Transitions update tools with QuerySet.update(), which sends no signals"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        cls.borrower = User.objects.create_user(username='borrower', email='borrower@example.com')
+        cls.tools = [
+            Tool.objects.create(owner=cls.owner, name=f'Drill {i}', category='Power Tools', condition='Good')
+            for i in range(2)
+        ]
+        cls.requests = [
+            BorrowRequest.objects.create(tool=tool, borrower=cls.borrower, reason='x', duration=2)
+            for tool in cls.tools
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def available(self):
+        return global_counts()['available_tools']
+
+    def test_approve_and_return_refresh_available_tools(self):
+        self.assertEqual(self.available(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.approve(self.requests[0].pk, self.owner)
+        self.assertEqual(self.available(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.mark_returned(self.requests[0].pk, self.owner)
+        self.assertEqual(self.available(), 2)
+
+    def test_batch_approval_refreshes_available_tools(self):
+        self.assertEqual(self.available(), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            services.apply_batch(self.owner, [(request.pk, 'approve') for request in self.requests])
+        self.assertEqual(self.available(), 0)
+
+
+class BatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        cls.stranger = User.objects.create_user(username='stranger', email='stranger@example.com')
+        cls.borrowers = [
+            User.objects.create_user(username=f'borrower{i}', email=f'borrower{i}@example.com')
+            for i in range(3)
+        ]
+        cls.drill, cls.saw = [
+            Tool.objects.create(owner=cls.owner, name=name, category='Power Tools', condition='Good')
+            for name in ('Drill', 'Saw')
+        ]
+        cls.theirs = Tool.objects.create(owner=cls.stranger, name='Rake', category='Garden Tools', condition='Good')
+        cls.drill_requests = [
+            BorrowRequest.objects.create(tool=cls.drill, borrower=borrower, reason='x', duration=2)
+            for borrower in cls.borrowers
+        ]
+        cls.saw_request = BorrowRequest.objects.create(tool=cls.saw, borrower=cls.borrowers[0], reason='x', duration=2)
+        cls.their_request = BorrowRequest.objects.create(tool=cls.theirs, borrower=cls.borrowers[0], reason='x', duration=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def batch(self, *actions):
+        return self.client.post(
+            '/api/requests/batch/',
+            {'actions': [{'id': pk, 'action': action} for pk, action in actions]},
+            format='json',
+        )
+
+    def statuses(self):
+        return dict(BorrowRequest.objects.values_list('pk', 'status'))
+
+    def test_results_report_what_happened_to_each_request(self):
+        first, second, third = self.drill_requests
+        response = self.batch(
+            (first.pk, 'approve'), (second.pk, 'approve'), (self.saw_request.pk, 'reject'),
+            (self.saw_request.pk, 'approve'), (999999, 'reject'),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applied'], 2)
+        self.assertEqual(response.data['results'], [
+            {'id': first.pk, 'action': 'approve', 'status': 'approved'},
+            {'id': second.pk, 'action': 'approve', 'status': 'rejected', 'superseded_by': first.pk},
+            {'id': self.saw_request.pk, 'action': 'reject', 'status': 'rejected'},
+            {'id': self.saw_request.pk, 'action': 'approve', 'error': 'Request appears more than once in the batch'},
+            {'id': 999999, 'action': 'reject', 'error': 'Not found'},
+        ])
+
+        statuses = self.statuses()
+        self.assertEqual(statuses[first.pk], 'approved')
+        # The request left out of the batch loses the tool too
+        self.assertEqual(statuses[second.pk], 'rejected')
+        self.assertEqual(statuses[third.pk], 'rejected')
+        self.assertEqual(statuses[self.saw_request.pk], 'rejected')
+        self.assertFalse(Tool.objects.get(pk=self.drill.pk).is_available)
+        self.assertTrue(Tool.objects.get(pk=self.saw.pk).is_available)
+        for user in [self.owner, *self.borrowers]:
+            counters = UserRequestCounters.objects.get(user=user)
+            stored = {field: getattr(counters, field) for field in compute_counters(user.pk)}
+            self.assertEqual(stored, compute_counters(user.pk), user.username)
+
+    def test_approving_a_tool_already_lent_out_is_an_error(self):
+        Tool.objects.filter(pk=self.drill.pk).update(is_available=False)
+        response = self.batch((self.drill_requests[0].pk, 'approve'))
+        self.assertEqual(response.data['applied'], 0)
+        self.assertEqual(response.data['results'][0]['error'], 'This tool is already lent out')
+        self.assertEqual(self.statuses()[self.drill_requests[0].pk], 'pending')
+
+    def test_other_owners_requests_are_refused(self):
+        response = self.batch((self.their_request.pk, 'approve'), (self.drill_requests[0].pk, 'reject'))
+        self.assertEqual(response.data['applied'], 1)
+        self.assertEqual(response.data['results'][0]['error'], 'Not found')
+        self.assertEqual(self.statuses()[self.their_request.pk], 'pending')
+        self.assertTrue(Tool.objects.get(pk=self.theirs.pk).is_available)
+
+    def test_concurrent_change_rolls_back_the_whole_batch(self):
+        before = self.statuses()
+        real_now = timezone.now
+
+        def now_after_a_competing_approval():
+            # Another approval lends the drill out between the batch's read
+            # and its updates
+            Tool.objects.filter(pk=self.drill.pk).update(is_available=False)
+            return real_now()
+
+        with mock.patch.object(services.timezone, 'now', side_effect=now_after_a_competing_approval):
+            with self.assertRaises(services.ConcurrentChange):
+                services.apply_batch(self.owner, [(self.saw_request.pk, 'reject'), (self.drill_requests[0].pk, 'approve')])
+        self.assertEqual(self.statuses(), before)
+
+    def test_concurrent_change_is_a_conflict(self):
+        with mock.patch.object(services, 'apply_batch', side_effect=services.ConcurrentChange):
+            response = self.batch((self.drill_requests[0].pk, 'approve'))
+        self.assertEqual(response.status_code, 409)
@@ -0,0 +1,205 @@
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.requests.models import BorrowRequest
+from apps.requests.views import parse_bound
+from apps.tools.models import Tool
+
+
+class OverdueRequestsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username='user', email='user@example.com')
+        other = User.objects.create_user(username='other', email='other@example.com')
+        today = timezone.now().date()
+        cls.borrowed, cls.lent = [], []
+        for i in range(3):
+            for owner, borrower, loans in ((other, cls.user, cls.borrowed), (cls.user, other, cls.lent)):
+                tool = Tool.objects.create(owner=owner, name=f'Drill {i}', category='Power Tools', condition='Good')
+                loans.append(BorrowRequest.objects.create(
+                    tool=tool, borrower=borrower, reason='x', duration=2, status='approved',
+                    return_date=today - timedelta(days=10 - i),
+                ).pk)
+        # Not overdue yet
+        tool = Tool.objects.create(owner=other, name='Saw', category='Power Tools', condition='Good')
+        BorrowRequest.objects.create(
+            tool=tool, borrower=cls.user, reason='x', duration=2, status='approved', return_date=today,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def ids(self, **params):
+        response = self.client.get('/api/requests/overdue/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data, [row['id'] for row in response.data['results']]
+
+    def test_overdue_loans_are_paged_oldest_return_date_first(self):
+        data, ids = self.ids(page_size=4)
+        self.assertEqual(data['count'], 6)
+        self.assertIsNotNone(data['next'])
+        _, rest = self.ids(page_size=4, page=2)
+        # Same return dates pair up borrowed and lent loans; pk breaks the tie
+        expected = [pk for pair in zip(self.borrowed, self.lent) for pk in sorted(pair)]
+        self.assertEqual(ids + rest, expected)
+        self.assertTrue(all(row['is_overdue'] for row in data['results']))
+
+    def test_role_keeps_one_side(self):
+        self.assertEqual(self.ids(role='borrowed')[1], self.borrowed)
+        self.assertEqual(self.ids(role='lent')[1], self.lent)
+        response = self.client.get('/api/requests/overdue/', {'role': 'owner'})
+        self.assertEqual(response.status_code, 400)
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class LoanHistoryTests(APITestCase):
+    # Fields each row needs for the frontend's BorrowRequest, Tool and User types
+    REQUEST_FIELDS = {
+        'id', 'tool', 'borrower', 'reason', 'duration', 'status', 'return_date', 'created_at',
+        'updated_at', 'owner_notified', 'borrower_notified', 'is_overdue',
+    }
+    TOOL_FIELDS = {
+        'id', 'name', 'image', 'image_url', 'thumbnail_url', 'image_srcset', 'category', 'condition',
+        'is_available', 'owner', 'created_at', 'updated_at',
+    }
+    USER_FIELDS = {'id', 'username', 'email', 'phone', 'block_no', 'house_no', 'date_joined'}
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username='user', email='user@example.com')
+        others = [User.objects.create_user(username=f'other{i}', email=f'other{i}@example.com') for i in range(4)]
+        tool = Tool.objects.create(owner=cls.user, name='Drill', category='Power Tools', condition='Good')
+        loans = (
+            ('pending', utc(2024, 5, 1, 0, 0)),
+            ('approved', utc(2024, 5, 1, 23, 59, 30)),
+            ('rejected', utc(2024, 5, 2, 0, 0)),
+            ('returned', utc(2024, 5, 3, 12, 0)),
+        )
+        cls.lent = {}
+        for borrower, (status, created_at) in zip(others, loans):
+            borrow_request = BorrowRequest.objects.create(
+                tool=tool, borrower=borrower, reason='x', duration=2, status=status,
+                return_date=created_at.date() + timedelta(days=2) if status == 'approved' else None,
+            )
+            BorrowRequest.objects.filter(pk=borrow_request.pk).update(created_at=created_at)
+            cls.lent[status] = borrow_request.pk
+        cls.borrowed = [
+            BorrowRequest.objects.create(
+                tool=Tool.objects.create(owner=owner, name='Saw', category='Hand Tools', condition='Fair'),
+                borrower=cls.user, reason='x', duration=3,
+            ).pk
+            for owner in others[:2]
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def get(self, path='/api/requests/lent/', **params):
+        return self.client.get(path, params)
+
+    def ids(self, path='/api/requests/lent/', **params):
+        response = self.get(path, **params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [row['id'] for row in response.data['results']]
+
+    def test_lent_and_borrowed_are_split(self):
+        self.assertEqual(set(self.ids()), set(self.lent.values()))
+        self.assertEqual(set(self.ids('/api/requests/borrowed/')), set(self.borrowed))
+
+    def test_paginated_response_shape_matches_the_frontend(self):
+        for path in ('/api/requests/lent/', '/api/requests/borrowed/'):
+            with self.subTest(path=path):
+                data = self.get(path, page_size=1).data
+                # MyTools reads count, getAllPages follows next
+                self.assertEqual(set(data), {'count', 'next', 'previous', 'results'})
+                self.assertIsNotNone(data['next'])
+                row = data['results'][0]
+                self.assertLessEqual(self.REQUEST_FIELDS, set(row))
+                self.assertLessEqual(self.TOOL_FIELDS, set(row['tool']))
+                self.assertLessEqual(self.USER_FIELDS, set(row['tool']['owner']))
+                self.assertLessEqual(self.USER_FIELDS, set(row['borrower']))
+        self.assertEqual(self.get(page_size=1).data['count'], 4)
+
+    def test_status_filter_is_repeatable(self):
+        self.assertEqual(self.ids(status='approved'), [self.lent['approved']])
+        self.assertEqual(
+            set(self.ids(status=['approved', 'returned'])),
+            {self.lent['approved'], self.lent['returned']},
+        )
+
+    def test_date_bounds_are_inclusive_whole_days(self):
+        # created_before a date includes the last second of that day
+        self.assertEqual(
+            set(self.ids(created_before='2024-05-01')),
+            {self.lent['pending'], self.lent['approved']},
+        )
+        self.assertEqual(
+            set(self.ids(created_after='2024-05-02')),
+            {self.lent['rejected'], self.lent['returned']},
+        )
+        self.assertEqual(self.ids(created_after='2024-05-02', created_before='2024-05-02'), [self.lent['rejected']])
+
+    def test_datetime_bounds_are_exact(self):
+        self.assertEqual(self.ids(created_before='2024-05-01T23:59:00Z'), [self.lent['pending']])
+        self.assertEqual(
+            set(self.ids(created_after='2024-05-01T23:59:30+00:00', created_before='2024-05-02T00:00:00Z')),
+            {self.lent['approved'], self.lent['rejected']},
+        )
+
+    def test_invalid_filters_are_a_bad_request(self):
+        for params, field in (
+            ({'status': 'lost'}, 'status'),
+            ({'created_after': 'yesterday'}, 'created_after'),
+            ({'created_before': '2024-02-30'}, 'created_before'),
+            ({'created_before': '2024-05-01T25:00'}, 'created_before'),
+            ({'export_format': 'csv'}, 'export_format'),
+        ):
+            with self.subTest(params=params):
+                response = self.get(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.data), [field])
+
+    def test_ndjson_streams_every_match_newest_first(self):
+        response = self.get(export_format='ndjson', status=['pending', 'approved', 'returned'], page_size=1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="lent.ndjson"')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows],
+            [self.lent['returned'], self.lent['approved'], self.lent['pending']],
+        )
+        self.assertLessEqual(self.REQUEST_FIELDS, set(rows[0]))
+
+    def test_ndjson_respects_sparse_fields(self):
+        response = self.get('/api/requests/borrowed/', export_format='ndjson', fields='id,status')
+        self.assertEqual(
+            b''.join(response.streaming_content).decode(),
+            ''.join(f'{{"id":{pk},"status":"pending"}}\n' for pk in reversed(self.borrowed)),
+        )
+
+
+class ParseBoundTests(SimpleTestCase):
+    def test_dates_cover_the_whole_day(self):
+        self.assertEqual(parse_bound('2024-05-01'), utc(2024, 5, 1))
+        self.assertEqual(parse_bound('2024-05-01', end_of_day=True), utc(2024, 5, 1, 23, 59, 59, 999999))
+
+    def test_datetimes_are_taken_as_given(self):
+        self.assertEqual(parse_bound('2024-05-01T10:30:00+02:00', end_of_day=True), utc(2024, 5, 1, 8, 30))
+        # Naive datetimes are in the current timezone
+        self.assertEqual(parse_bound('2024-05-01T10:30'), utc(2024, 5, 1, 10, 30))
+
+    def test_invalid_values(self):
+        for value in ('yesterday', '2024-02-30', '2024-13-01', '2024-05-01T24:61', '05/01/2024'):
+            with self.subTest(value=value):
+                self.assertIsNone(parse_bound(value))
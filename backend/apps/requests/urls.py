@@ -1,11 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_API_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
     path('', views.borrow_request_list, name='borrow_request_list'),
     path('incoming/', views.incoming_requests, name='incoming_requests'),
-    path('stats/', views.request_stats, name='request_stats'),
-    path('notifications/', views.notifications, name='notifications'),
+    path('batch/', views.batch_requests, name='batch_requests'),
+    path('overdue/', views.overdue_requests, name='overdue_requests'),
+    path('stats/', read_views.request_stats, name='request_stats'),
+    path('notifications/', read_views.notifications, name='notifications'),
+    path('notifications/stream/', read_views.notification_stream, name='notification_stream'),
+    path('notifications/stream/token/', views.notification_stream_token, name='notification_stream_token'),
     path('notifications/read/', views.mark_notifications_read, name='mark_notifications_read'),
     path('<int:pk>/approve/', views.approve_request, name='approve_request'),
     path('<int:pk>/reject/', views.reject_request, name='reject_request'),
@@ -1,3 +1,7 @@
+import json
+import queue
+from datetime import datetime, time
+
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
@@ -7,18 +11,39 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from apps.requests.models import BorrowRequest
 from apps.tools.serializers import ToolSerializer
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from apps.tools.models import Tool
+from django.core import signing
+from django.db import connection, transaction
+from django.db.models import Q
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from apps.users.authentication import CachingTokenAuthentication
 
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from toolshare.pagination import KeysetPagination, wants_cursor
+from toolshare.stats import global_counts
+from . import counters, events, services
 from .models import BorrowRequest
 from .serializers import (
+    BatchSerializer,
     BorrowRequestSerializer, 
     BorrowRequestCreateSerializer, 
-    BorrowRequestUpdateSerializer
+    BorrowRequestValuesSerializer,
 )
 
 
+STREAM_KEEPALIVE_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_KEEPALIVE', 15)
+# Stream tokens are only checked when the EventSource connects
+STREAM_TOKEN_MAX_AGE = getattr(settings, 'NOTIFICATION_STREAM_TOKEN_MAX_AGE', 60)
+STREAM_TOKEN_SALT = 'apps.requests.notification_stream'
+# Rows fetched per server-side cursor round trip in ?export_format=ndjson
+HISTORY_STREAM_CHUNK_SIZE = getattr(settings, 'HISTORY_STREAM_CHUNK_SIZE', 500)
+
+
 class RequestPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
@@ -29,18 +54,17 @@ class RequestPagination(PageNumberPagination):
 def borrow_request_list(request):
     if request.method == 'GET':
         # Get user's borrow requests
-        requests = BorrowRequest.objects.filter(borrower=request.user)
+        serializer = BorrowRequestValuesSerializer.from_request(request)
+        requests = serializer.values(BorrowRequest.objects.with_overdue().for_borrower(request.user))
         
-        # Apply pagination
-        paginator = RequestPagination()
+        # Apply pagination (keyset when the client asks for a cursor)
+        paginator = KeysetPagination() if wants_cursor(request) else RequestPagination()
         page = paginator.paginate_queryset(requests, request)
         
         if page is not None:
-            serializer = BorrowRequestSerializer(page, many=True, context={'request': request})
-            return paginator.get_paginated_response(serializer.data)
+            return paginator.get_paginated_response(serializer.many(page))
         
-        serializer = BorrowRequestSerializer(requests, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(serializer.many(requests))
     
     elif request.method == 'POST':
         serializer = BorrowRequestCreateSerializer(data=request.data, context={'request': request})
@@ -54,99 +78,55 @@ def borrow_request_list(request):
 @api_view(['GET'])
 def incoming_requests(request):
     # Get requests for user's tools
-    requests = BorrowRequest.objects.filter(tool__owner=request.user)
+    serializer = BorrowRequestValuesSerializer.from_request(request)
+    requests = serializer.values(BorrowRequest.objects.with_overdue().for_owner(request.user))
     
-    # Apply pagination
-    paginator = RequestPagination()
+    # Apply pagination (keyset when the client asks for a cursor)
+    paginator = KeysetPagination() if wants_cursor(request) else RequestPagination()
     page = paginator.paginate_queryset(requests, request)
     
     if page is not None:
-        serializer = BorrowRequestSerializer(page, many=True, context={'request': request})
-        return paginator.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serializer.many(page))
     
-    serializer = BorrowRequestSerializer(requests, many=True, context={'request': request})
-    return Response(serializer.data)
+    return Response(serializer.many(requests))
 
 
 @api_view(['POST'])
 def approve_request(request, pk):
-    borrow_request = get_object_or_404(
-        BorrowRequest, 
-        pk=pk, 
-        tool__owner=request.user, 
-        status='pending'
-    )
-    
-    # Update tool availability
-    borrow_request.tool.is_available = False
-    borrow_request.tool.save()
-    
-    # Update request status
-    serializer = BorrowRequestUpdateSerializer(
-        borrow_request, 
-        data={'status': 'approved'}, 
-        context={'request': request}
-    )
-    
-    if serializer.is_valid():
-        borrow_request = serializer.save()
-        borrow_request.borrower_notified = False  # Reset notification flag
-        borrow_request.save()
-        
-        response_serializer = BorrowRequestSerializer(borrow_request, context={'request': request})
-        return Response({
-            'message': 'Request approved successfully',
-            'request': response_serializer.data
-        })
+    try:
+        borrow_request = services.approve(pk, request.user)
+    except services.RequestNotFound:
+        raise Http404
+    except services.ToolUnavailable as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_409_CONFLICT)
     
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    response_serializer = BorrowRequestSerializer(borrow_request, context={'request': request})
+    return Response({
+        'message': 'Request approved successfully',
+        'request': response_serializer.data
+    })
 
 
 @api_view(['POST'])
 def reject_request(request, pk):
-    borrow_request = get_object_or_404(
-        BorrowRequest, 
-        pk=pk, 
-        tool__owner=request.user, 
-        status='pending'
-    )
-    
-    serializer = BorrowRequestUpdateSerializer(
-        borrow_request, 
-        data={'status': 'rejected'}, 
-        context={'request': request}
-    )
-    
-    if serializer.is_valid():
-        borrow_request = serializer.save()
-        borrow_request.borrower_notified = False  # Reset notification flag
-        borrow_request.save()
-        
-        response_serializer = BorrowRequestSerializer(borrow_request, context={'request': request})
-        return Response({
-            'message': 'Request rejected successfully',
-            'request': response_serializer.data
-        })
+    try:
+        borrow_request = services.reject(pk, request.user)
+    except services.RequestNotFound:
+        raise Http404
     
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    response_serializer = BorrowRequestSerializer(borrow_request, context={'request': request})
+    return Response({
+        'message': 'Request rejected successfully',
+        'request': response_serializer.data
+    })
 
 
 @api_view(['POST'])
 def mark_returned(request, pk):
-    borrow_request = get_object_or_404(
-        BorrowRequest, 
-        pk=pk, 
-        tool__owner=request.user, 
-        status='approved'
-    )
-    
-    # Mark tool as available again
-    borrow_request.tool.is_available = True
-    borrow_request.tool.save()
-    
-    # Update request status
-    borrow_request.status = 'returned'
-    borrow_request.save()
+    try:
+        borrow_request = services.mark_returned(pk, request.user)
+    except services.RequestNotFound:
+        raise Http404
     
     serializer = BorrowRequestSerializer(borrow_request, context={'request': request})
     return Response({
@@ -155,44 +135,135 @@ def mark_returned(request, pk):
     })
 
 
-@api_view(['GET'])
-def request_stats(request):
-    total_requests = BorrowRequest.objects.filter(borrower=request.user).count()
-    pending_requests = BorrowRequest.objects.filter(borrower=request.user, status='pending').count()
-    approved_requests = BorrowRequest.objects.filter(borrower=request.user, status='approved').count()
-    incoming_pending = BorrowRequest.objects.filter(tool__owner=request.user, status='pending').count()
-    
+@api_view(['POST'])
+def batch_requests(request):
+    """
+    Approve/reject many incoming requests in one transaction:
+    {"actions": [{"id": 1, "action": "approve"}, {"id": 2, "action": "reject"}]}
+    """
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    actions = [(item['id'], item['action']) for item in serializer.validated_data['actions']]
+    try:
+        results = services.apply_batch(request.user, actions)
+    except services.ConcurrentChange:
+        return Response(
+            {'detail': 'Some of these requests changed meanwhile; please reload and try again.'},
+            status=status.HTTP_409_CONFLICT,
+        )
     return Response({
-        'total_requests': total_requests,
-        'pending_requests': pending_requests,
-        'approved_requests': approved_requests,
-        'incoming_pending': incoming_pending,
+        'applied': sum(1 for result in results if result.get('status') == services.BATCH_ACTIONS[result['action']]),
+        'results': results,
     })
 
 
+@api_view(['GET'])
+def overdue_requests(request):
+    """
+    Overdue loans the user borrowed or lent, oldest return date first, paged
+    like the other request lists. ?role=borrowed or ?role=lent keeps one side.
+    """
+    overdue = BorrowRequest.objects.with_overdue().overdue().order_by('return_date', 'pk')
+    role = request.query_params.get('role')
+    if role == 'borrowed':
+        overdue = overdue.for_borrower(request.user)
+    elif role == 'lent':
+        overdue = overdue.for_owner(request.user)
+    elif role is None:
+        overdue = overdue.filter(Q(borrower=request.user) | Q(tool__owner=request.user))
+    else:
+        return Response({'role': ['Choose from: borrowed, lent']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = BorrowRequestValuesSerializer.from_request(request)
+    paginator = RequestPagination()
+    page = paginator.paginate_queryset(serializer.values(overdue), request)
+    return paginator.get_paginated_response(serializer.many(page))
+
+
 @api_view(['GET'])
 def notifications(request):
-    # Get unread notifications for the user
-    new_approvals = BorrowRequest.objects.filter(
-        borrower=request.user,
-        status__in=['approved', 'rejected'],
-        borrower_notified=False
-    ).count()
+    # Unread counts come from the denormalized counter row (one pk lookup).
+    # No replica: clients re-read this right after mark_notifications_read.
+    user_counters = counters.get_counters(request.user.pk)
+    return Response(events.notification_payload(user_counters))
+
+
+@require_GET
+def notification_stream(request):
+    """
+    Server-Sent Events feed of notification counts.
+
+    Sends the current counts once, then only pushes when a request involving
+    the user changes, so an idle connection costs no database queries.
+    EventSource can't set headers, so it may authenticate with a short-lived
+    ?stream_token= from notification_stream_token instead of the API token.
+    """
+    user = stream_user(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
     
-    new_requests = BorrowRequest.objects.filter(
-        tool__owner=request.user,
-        status='pending',
-        owner_notified=False
-    ).count()
+    broker = events.get_broker()
+    # Subscribe before reading the snapshot so no change can slip in between
+    subscription = broker.subscribe(user.pk)
+    snapshot = events.notification_payload(counters.get_counters(user.pk))
+    # Don't pin a database connection for the lifetime of the stream
+    connection.close()
     
-    return Response({
-        'new_approvals': new_approvals,
-        'new_requests': new_requests,
-        'total_notifications': new_approvals + new_requests
-    })
+    def stream():
+        try:
+            yield sse_message({'type': 'snapshot', 'notifications': snapshot})
+            while True:
+                try:
+                    event = subscription.get(timeout=STREAM_KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+                    continue
+                yield sse_message(event)
+        finally:
+            broker.unsubscribe(user.pk, subscription)
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['POST'])
+def notification_stream_token(request):
+    """
+    A token that only opens the notification stream and expires after
+    STREAM_TOKEN_MAX_AGE seconds, so the API token never goes in a URL.
+    """
+    signer = signing.TimestampSigner(salt=STREAM_TOKEN_SALT)
+    return Response({'token': signer.sign(str(request.user.pk)), 'expires_in': STREAM_TOKEN_MAX_AGE})
+
+
+def stream_user(request):
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(header) == 2 and header[0].lower() == 'token':
+        try:
+            user, _ = CachingTokenAuthentication().authenticate_credentials(header[1])
+        except AuthenticationFailed:
+            return None
+        return user
+
+    token = request.GET.get('stream_token')
+    if not token:
+        return None
+    signer = signing.TimestampSigner(salt=STREAM_TOKEN_SALT)
+    try:
+        user_id = signer.unsign(token, max_age=STREAM_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def sse_message(event):
+    return f'data: {json.dumps(event)}\n\n'
 
 
 @api_view(['POST'])
+@transaction.atomic
 def mark_notifications_read(request):
     # Mark borrower notifications as read
     BorrowRequest.objects.filter(
@@ -205,15 +276,16 @@ def mark_notifications_read(request):
         tool__owner=request.user,
         owner_notified=False
     ).update(owner_notified=True)
+    counters.notifications_read(request.user)
+    events.notifications_read(request.user)
     
     return Response({'message': 'Notifications marked as read'})
 
 @api_view(['GET'])
 #@permission_classes([IsAuthenticated])
 def lent_tools_view(request):
-    lent_requests = BorrowRequest.objects.filter(tool__owner=request.user)
-    serializer = BorrowRequestSerializer(lent_requests, many=True, context={'request': request})
-    return Response({'results': serializer.data})
+    """Requests for the user's tools; see loan_history for the options"""
+    return loan_history(request, BorrowRequest.objects.for_owner(request.user), 'lent')
 
 
 # views.py
@@ -222,22 +294,98 @@ def lent_tools_view(request):
 @api_view(['GET'])
 #@permission_classes([IsAuthenticated])
 def borrowed_tools_view(request):
-    borrowed = BorrowRequest.objects.filter(borrower=request.user)
-    serializer = BorrowRequestSerializer(borrowed, many=True, context={'request': request})
-    return Response({'results': serializer.data})
+    """The user's own requests; see loan_history for the options"""
+    return loan_history(request, BorrowRequest.objects.for_borrower(request.user), 'borrowed')
+
+
+def loan_history(request, requests, name):
+    """
+    Paginated (page numbers, or keyset with ?pagination=cursor) and filtered by
+    ?status= (repeatable), ?created_after= and ?created_before= (dates or
+    datetimes, both inclusive). ?export_format=ndjson streams every matching
+    request instead, one JSON object per line, newest first.
+    """
+    requests, errors = filter_history(request.query_params, requests)
+    export_format = request.query_params.get('export_format')
+    if export_format not in (None, 'ndjson'):
+        errors['export_format'] = ['Choose from: ndjson']
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = BorrowRequestValuesSerializer.from_request(request)
+    requests = requests.with_overdue()
+    if export_format == 'ndjson':
+        response = StreamingHttpResponse(
+            serializer.iter_ndjson(requests.order_by('-created_at', '-pk'), HISTORY_STREAM_CHUNK_SIZE),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{name}.ndjson"'
+        return response
+    
+    rows = serializer.values(requests)
+    paginator = KeysetPagination() if wants_cursor(request) else RequestPagination()
+    page = paginator.paginate_queryset(rows, request)
+    return paginator.get_paginated_response(serializer.many(page))
+
+
+def filter_history(params, requests):
+    """Apply the status and created_at range filters; returns (queryset, errors)"""
+    errors = {}
+    statuses = params.getlist('status')
+    valid_statuses = [value for value, _ in BorrowRequest.STATUS_CHOICES]
+    if any(s not in valid_statuses for s in statuses):
+        errors['status'] = [f'Choose from: {", ".join(valid_statuses)}']
+    elif statuses:
+        requests = requests.filter(status__in=statuses)
+    
+    for param, lookup in (('created_after', 'gte'), ('created_before', 'lte')):
+        value = params.get(param)
+        if not value:
+            continue
+        bound = parse_bound(value, end_of_day=lookup == 'lte')
+        if bound is None:
+            errors[param] = ['Use a date (YYYY-MM-DD) or an ISO 8601 datetime.']
+        else:
+            requests = requests.filter(**{f'created_at__{lookup}': bound})
+    return requests, errors
+
+
+def parse_bound(value, end_of_day=False):
+    """
+    A datetime bound on created_at. Dates cover the whole day in the current
+    timezone, so the filter stays a range on the indexed column.
+    """
+    # Dates first: parse_datetime would read '2024-05-01' as midnight
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is not None:
+        return timezone.make_aware(datetime.combine(day, time.max if end_of_day else time.min))
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
 
 @api_view(['GET'])
 def request_stats(request):
-    total_requests = BorrowRequest.objects.all().count()
-    total_users = get_user_model().objects.count()
-    total_tools = Tool.objects.count()
-    total_lent = BorrowRequest.objects.filter(tool__owner=request.user).count()
-    total_borrowed = BorrowRequest.objects.filter(borrower=request.user).count()
+    # No replica, like notifications: the counts must reflect the user's own writes
+    user_counters = counters.get_counters(request.user.pk)
+    return Response(request_stats_payload(user_counters, global_counts()))
 
-    return Response({
-        'total_requests': total_requests,
-        'total_users': total_users,
-        'total_tools': total_tools,
-        'total_lent': total_lent,
-        'total_borrowed': total_borrowed,
-    })
+
+def request_stats_payload(user_counters, totals):
+    return {
+        'total_requests': totals['total_requests'],
+        'total_users': totals['total_users'],
+        'total_tools': totals['total_tools'],
+        'total_borrowed': user_counters.total_borrowed,
+        'pending_requests': user_counters.outgoing_pending,
+        'approved_requests': user_counters.outgoing_approved,
+        'total_lent': user_counters.total_lent,
+        'incoming_pending': user_counters.incoming_pending,
+    }
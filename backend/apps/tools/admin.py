@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Tool
+from .models import ImageBlob, Tool
 
 
 @admin.register(Tool)
@@ -21,4 +21,12 @@ class ToolAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'ref_count', 'updated_at')
+    list_filter = ('updated_at',)
+    search_fields = ('name',)
+    readonly_fields = ('name', 'ref_count', 'updated_at')
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ToolsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.tools'
\ No newline at end of file
+    name = 'apps.tools'
+
+    def ready(self):
+        # Count image blob references and expire cached responses on tool save/delete;
+        # put back the search index triggers a migration's table rebuild drops
+        from . import blobs, caching  # noqa: F401
+        from .search import repair_fts_index
+        post_migrate.connect(repair_fts_index, sender=self)
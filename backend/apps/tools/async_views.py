@@ -0,0 +1,33 @@
+from toolshare.async_api import async_api_view, render_json
+from toolshare.db import replica_reads
+from toolshare.pagination import KeysetPagination, wants_cursor
+from toolshare.response_cache import cache_response
+from toolshare.stats import aglobal_counts
+from . import views
+from .caching import all_tools
+from .models import Tool
+from .serializers import ToolValuesSerializer
+
+
+@async_api_view(methods=('GET',), sync_view=views.tool_list)
+@cache_response(all_tools)
+async def tool_list(request):
+    serializer = ToolValuesSerializer.from_request(request)
+    rows = serializer.values(Tool.objects.filter(is_available=True).exclude(owner=request.user))
+    
+    paginator = KeysetPagination() if wants_cursor(request) else views.ToolPagination()
+    page = await paginator.apaginate_queryset(rows, request)
+    return render_json(paginator.get_paginated_response(serializer.many(page)).data)
+
+
+@async_api_view()
+@replica_reads
+async def tool_stats(request):
+    totals = await aglobal_counts()
+    my_tools_count = await Tool.objects.filter(owner=request.user).acount()
+    
+    return render_json({
+        'total_tools': totals['total_tools'],
+        'available_tools': totals['available_tools'],
+        'my_tools': my_tools_count,
+    })
@@ -0,0 +1,109 @@
+"""
+Reference counting for tool image files.
+
+Tool saves and deletes move ImageBlob.ref_count with F() deltas, and
+collect_media_blobs deletes files (and their rendered variants) once they
+are unreferenced. The counts can always be rebuilt from the Tool table with
+recount(), which the collector does before deleting anything.
+"""
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from toolshare.storage import tool_image_storage
+from .images import delete_variants
+from .models import ImageBlob, Tool
+
+
+def retain(name):
+    if not ImageBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1, updated_at=timezone.now()):
+        _, created = ImageBlob.objects.get_or_create(name=name, defaults={'ref_count': 1})
+        if not created:
+            retain(name)
+
+
+def release(name):
+    ImageBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1, updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Tool)
+def tool_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old = None if created else instance._saved_image
+    new = instance.image.name or None
+    if old != new:
+        if new:
+            retain(new)
+        if old:
+            release(old)
+    instance._saved_image = new
+
+
+@receiver(post_delete, sender=Tool)
+def tool_deleted(sender, instance, **kwargs):
+    if instance.image:
+        release(instance.image.name)
+
+
+def recount():
+    """Reset every ImageBlob.ref_count from the Tool table; returns rows fixed"""
+    actual = dict(
+        Tool.objects.exclude(image='').exclude(image__isnull=True)
+        .values_list('image').annotate(n=Count('pk')).values_list('image', 'n')
+    )
+    fixed = 0
+    for blob in ImageBlob.objects.all().iterator():
+        count = actual.pop(blob.name, 0)
+        if blob.ref_count != count:
+            ImageBlob.objects.filter(pk=blob.pk).update(ref_count=count, updated_at=timezone.now())
+            fixed += 1
+    ImageBlob.objects.bulk_create([ImageBlob(name=name, ref_count=n) for name, n in actual.items()])
+    return fixed + len(actual)
+
+
+def collect(grace=timedelta(hours=24), dry_run=False):
+    """
+    Delete unreferenced image files and return their names.
+
+    The grace period covers uploads whose Tool row hasn't been saved yet, and
+    blobs released moments ago that an in-flight upload may be re-using (the
+    storage touches a blob's mtime whenever an upload dedupes onto it).
+    """
+    cutoff = timezone.now() - grace
+    cutoff_ts = time.time() - grace.total_seconds()
+
+    def settled(name):
+        try:
+            return tool_image_storage.get_modified_time(name).timestamp() < cutoff_ts
+        except FileNotFoundError:
+            return True
+
+    with transaction.atomic():
+        recount()
+        known = set(ImageBlob.objects.values_list('name', flat=True))
+        dead = [
+            name for name in ImageBlob.objects.filter(
+                ref_count__lte=0, updated_at__lt=cutoff
+            ).values_list('name', flat=True)
+            if settled(name)
+        ]
+        if not dry_run:
+            ImageBlob.objects.filter(name__in=dead, ref_count__lte=0).delete()
+
+    # Blob files no row knows about: uploads from rolled-back requests
+    removed = dead + [
+        name for name, mtime in tool_image_storage.iter_blob_files()
+        if name not in known and mtime < cutoff_ts
+    ]
+
+    if not dry_run:
+        for name in removed:
+            tool_image_storage.delete(name)
+            delete_variants(name)
+    return removed
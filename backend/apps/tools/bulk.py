@@ -0,0 +1,207 @@
+"""
+Bulk tool import and export in CSV or NDJSON.
+
+Imports read the input line by line, validate it in chunks and insert each
+chunk's valid rows with one bulk_create inside a transaction, so an estate's
+whole inventory costs a handful of INSERTs rather than a request per tool.
+Invalid rows are reported with their line number and skipped. Input that
+can't be read past some line (bad UTF-8, broken CSV quoting) stops the import
+there; the result says where, next to what was already created.
+
+Exports are generators over a server-side iterator, so memory use doesn't
+grow with the number of rows. CSV cells that a spreadsheet would run as a
+formula get a leading apostrophe, which imports strip again.
+"""
+import csv
+import json
+
+from django.db import transaction
+
+from toolshare.stats import invalidate_global_counts
+from .caching import tools_changed
+from .models import Tool
+from .serializers import ToolImportSerializer
+
+FORMATS = ('csv', 'ndjson')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_FIELDS = ('id', 'name', 'category', 'condition', 'is_available', 'created_at', 'updated_at')
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+# Leading characters that make spreadsheet apps treat a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class UnreadableInputError(ImportFormatError):
+    """The input can't be read from this line on; the rows before it stand"""
+
+
+def escape_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_cell(value):
+    if value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def format_for_content_type(content_type):
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if content_type in ('text/csv', 'application/csv'):
+        return 'csv'
+    if content_type in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+        return 'ndjson'
+    return None
+
+
+def _text_lines(stream):
+    # Decode a line at a time: the upload is never read whole, and a bad
+    # byte fails on its own line rather than somewhere in a read-ahead buffer
+    for number, raw in enumerate(iter(stream.readline, b'')):
+        line = raw.decode('utf-8')
+        yield line.removeprefix('\ufeff') if number == 0 else line
+
+
+def iter_rows(stream, fmt):
+    """
+    Yield (line_number, row) pairs, or (line_number, ImportFormatError) for
+    unreadable lines. An UnreadableInputError is the last item yielded.
+    """
+    lines = _text_lines(stream)
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        try:
+            fieldnames = reader.fieldnames
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ImportFormatError(f'Unreadable CSV header: {exc}')
+        if not fieldnames or 'name' not in fieldnames:
+            raise ImportFormatError('CSV input needs a header row with at least a "name" column')
+        try:
+            for row in reader:
+                # Blank cells fall back to the field defaults
+                yield reader.line_num, {
+                    key: unescape_cell(value) for key, value in row.items() if key is not None and value != ''
+                }
+        except (csv.Error, UnicodeDecodeError) as exc:
+            yield reader.line_num + 1, UnreadableInputError(f'Unreadable input from line {reader.line_num + 1}: {exc}')
+    elif fmt == 'ndjson':
+        number = 0
+        try:
+            for number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as exc:
+                    yield number, ImportFormatError(f'Invalid JSON: {exc}')
+                    continue
+                if not isinstance(row, dict):
+                    yield number, ImportFormatError('Each line must be a JSON object')
+                    continue
+                yield number, row
+        except UnicodeDecodeError as exc:
+            yield number + 1, UnreadableInputError(f'Unreadable input from line {number + 1}: {exc}')
+    else:
+        raise ImportFormatError(f'Unsupported format {fmt!r}; use one of: {", ".join(FORMATS)}')
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_tools(stream, fmt, owner, chunk_size=CHUNK_SIZE, dry_run=False):
+    """
+    Import tools for `owner`; returns {'created', 'error_count', 'errors'},
+    plus 'detail' when unreadable input stopped the import part way.
+
+    Each chunk is committed on its own: a bad row never discards good rows
+    from other chunks.
+    """
+    created = 0
+    error_count = 0
+    errors = []
+    stopped = None
+
+    def report(line, detail):
+        nonlocal error_count
+        error_count += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'line': line, 'errors': detail})
+
+    for chunk in _chunks(iter_rows(stream, fmt), chunk_size):
+        tools = []
+        for line, row in chunk:
+            if isinstance(row, UnreadableInputError):
+                stopped = str(row)
+                continue
+            if isinstance(row, ImportFormatError):
+                report(line, {'non_field_errors': [str(row)]})
+                continue
+            serializer = ToolImportSerializer(data=row)
+            if serializer.is_valid():
+                tools.append(Tool(owner=owner, **serializer.validated_data))
+            else:
+                report(line, serializer.errors)
+        if tools and not dry_run:
+            with transaction.atomic():
+                Tool.objects.bulk_create(tools, batch_size=chunk_size)
+        created += len(tools)
+
+    if created and not dry_run:
+        # bulk_create sends no post_save
+        tools_changed(owner.pk)
+        invalidate_global_counts()
+    result = {'created': created, 'error_count': error_count, 'errors': errors}
+    if stopped:
+        result['detail'] = stopped
+    return result
+
+
+class _Echo:
+    """csv.writer target that hands each formatted row back instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(queryset):
+    return queryset.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+
+
+def export_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(queryset):
+        yield writer.writerow(value.isoformat() if hasattr(value, 'isoformat') else escape_cell(value) for value in row)
+
+
+def export_ndjson(queryset):
+    for row in _export_rows(queryset):
+        record = dict(zip(EXPORT_FIELDS, row))
+        record['created_at'] = record['created_at'].isoformat()
+        record['updated_at'] = record['updated_at'].isoformat()
+        yield json.dumps(record) + '\n'
+
+
+def export_tools(queryset, fmt):
+    if fmt == 'csv':
+        return export_csv(queryset)
+    if fmt == 'ndjson':
+        return export_ndjson(queryset)
+    raise ImportFormatError(f'Unsupported format {fmt!r}; use one of: {", ".join(FORMATS)}')
@@ -0,0 +1,62 @@
+"""
+Response cache scopes for the tool endpoints (see toolshare.response_cache).
+
+'tools' covers every tool (the shared feed) and 'tools:owner:<id>' one owner's
+tools. Saves and deletes go through the signals below; code that changes
+tools with QuerySet.update() calls tools_changed() itself.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from apps.users.serializers import UserSerializer
+from toolshare.response_cache import bump
+from .models import Tool
+
+ALL_TOOLS_KEY = 'version:tools'
+# What tool responses show of their owner
+OWNER_FIELDS = UserSerializer.Meta.fields
+
+
+def owner_key(owner_id):
+    return f'version:tools:owner:{owner_id}'
+
+
+def all_tools(request, *args, **kwargs):
+    return ALL_TOOLS_KEY, Tool.objects.all()
+
+
+def own_tools(request, *args, **kwargs):
+    return owner_key(request.user.pk), Tool.objects.filter(owner=request.user)
+
+
+def tools_changed(*owner_ids):
+    bump(ALL_TOOLS_KEY, *(owner_key(owner_id) for owner_id in set(owner_ids)))
+
+
+@receiver(post_save, sender=Tool)
+@receiver(post_delete, sender=Tool)
+def tool_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tools_changed(instance.owner_id)
+
+
+def _embedded_owner_values(instance):
+    return {field: instance.__dict__.get(field) for field in OWNER_FIELDS}
+
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_owner_fields(sender, instance, **kwargs):
+    instance._tool_owner_values = _embedded_owner_values(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def owner_changed(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Tool responses embed the owner: expire them only when what they show changed"""
+    # A new user has no tools; logins and password rehashes touch other fields
+    if raw or created or (update_fields and not set(update_fields) & set(OWNER_FIELDS)):
+        return
+    values = _embedded_owner_values(instance)
+    if values != getattr(instance, '_tool_owner_values', None):
+        instance._tool_owner_values = values
+        tools_changed(instance.pk)
@@ -0,0 +1,135 @@
+"""
+Resized WebP/JPEG variants of Tool.image.
+
+Uploads are stored as-is and the variants are rendered by a small background
+thread pool once the upload's transaction commits, so the upload response
+isn't held up by Pillow. Finished variants are recorded on
+Tool.image_variants as {size: {'width': ..., 'webp': path, 'jpeg': path}}.
+
+Variant names are derived from the image name, and image names are content
+hashes, so tools sharing an image share its variants; they are deleted with
+the image blob by collect_media_blobs.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> longest edge in pixels
+VARIANT_SIZES = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1600,
+}
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 75, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True},
+}
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_WORKERS', 2),
+            thread_name_prefix='tool-images',
+        )
+    return _executor
+
+
+def variant_name(image_name, size, ext):
+    directory, filename = os.path.split(image_name)
+    stem = os.path.splitext(filename)[0]
+    return f'{directory}/variants/{stem}-{size}.{ext}'
+
+
+def render_variants(image_name):
+    """Render every size/format of an image and return the variants mapping"""
+    with default_storage.open(image_name, 'rb') as fh:
+        source = Image.open(fh)
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'transparency' in source.info else 'RGB')
+
+    variants = {}
+    for size, edge in VARIANT_SIZES.items():
+        image = source.copy()
+        # Never upscale: a small original just yields a same-size variant
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        entry = {'width': image.width, 'height': image.height}
+        for ext, options in FORMATS.items():
+            output = image
+            if options['format'] == 'JPEG' and image.mode == 'RGBA':
+                output = Image.new('RGB', image.size, (255, 255, 255))
+                output.paste(image, mask=image.getchannel('A'))
+            buffer = BytesIO()
+            output.save(buffer, **options)
+            name = variant_name(image_name, size, ext)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            entry[ext] = default_storage.save(name, ContentFile(buffer.getvalue()))
+        variants[size] = entry
+    return variants
+
+
+def delete_variants(image_name):
+    for size in VARIANT_SIZES:
+        for ext in FORMATS:
+            name = variant_name(image_name, size, ext)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+
+
+def generate_variants(tool_id, image_name):
+    """Render and record variants, unless the tool's image changed meanwhile"""
+    from .models import Tool
+
+    try:
+        # Another tool with the same image blob already has them rendered
+        variants = Tool.objects.filter(image=image_name).exclude(image_variants={}).values_list(
+            'image_variants', flat=True
+        ).first()
+        if variants is None:
+            variants = render_variants(image_name)
+        if Tool.objects.filter(pk=tool_id, image=image_name).update(image_variants=variants):
+            from .caching import tools_changed
+            tools_changed(*Tool.objects.filter(pk=tool_id).values_list('owner_id', flat=True))
+        return variants
+    except Exception:
+        logger.exception('Could not render variants for tool %s (%s)', tool_id, image_name)
+        return None
+
+
+def _run_in_worker(tool_id, image_name):
+    try:
+        generate_variants(tool_id, image_name)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def schedule_variants(tool):
+    """Queue variant rendering for after the current transaction commits"""
+    if not tool.image:
+        return
+    tool_id, image_name = tool.pk, tool.image.name
+
+    def submit():
+        if getattr(settings, 'IMAGE_WORKERS', 2) <= 0:
+            generate_variants(tool_id, image_name)
+        else:
+            get_executor().submit(_run_in_worker, tool_id, image_name)
+
+    transaction.on_commit(submit)
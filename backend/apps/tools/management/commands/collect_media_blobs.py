@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.tools import blobs
+
+
+class Command(BaseCommand):
+    help = 'Recount tool image references and delete image files nothing uses any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-hours', type=float, default=24,
+                            help='Leave files touched within this many hours alone (default 24)')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted')
+
+    def handle(self, *args, **options):
+        removed = blobs.collect(timedelta(hours=options['grace_hours']), dry_run=options['dry_run'])
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(removed)} unreferenced files'))
@@ -0,0 +1,31 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tools import bulk
+from apps.tools.models import Tool
+
+
+class Command(BaseCommand):
+    help = 'Stream tools as CSV or NDJSON to stdout or a file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', help="Only this owner's tools (email address)")
+        parser.add_argument('--format', choices=bulk.FORMATS, default='csv')
+        parser.add_argument('--output', help='File to write instead of stdout')
+
+    def handle(self, *args, **options):
+        tools = Tool.objects.all()
+        if options['owner']:
+            if not get_user_model().objects.filter(email=options['owner']).exists():
+                raise CommandError(f"No user with email {options['owner']}")
+            tools = tools.filter(owner__email=options['owner'])
+
+        out = open(options['output'], 'w', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in bulk.export_tools(tools, options['format']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.tools.images import generate_variants
+from apps.tools.models import Tool
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnail/card/full WebP and JPEG variants for tool images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render tools that already have variants')
+
+    def handle(self, *args, **options):
+        tools = Tool.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            tools = tools.filter(image_variants={})
+
+        done = failed = 0
+        for tool_id, image_name in tools.values_list('pk', 'image').iterator():
+            if generate_variants(tool_id, image_name) is None:
+                failed += 1
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f'Rendered variants for {done} tools ({failed} failed)'))
@@ -0,0 +1,45 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tools import bulk
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create tools for one owner from a CSV or NDJSON file ("-" reads stdin).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--owner', required=True, help="Owner's email address")
+        parser.add_argument('--format', choices=bulk.FORMATS,
+                            help='Defaults to ndjson for .ndjson/.jsonl files, else csv')
+        parser.add_argument('--chunk-size', type=int, default=bulk.CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Validate without inserting')
+
+    def handle(self, *args, **options):
+        try:
+            owner = get_user_model().objects.get(email=options['owner'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['owner']}")
+
+        path = options['path']
+        fmt = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            result = bulk.import_tools(
+                stream, fmt, owner, chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+            )
+        except bulk.ImportFormatError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        verb = 'Would create' if options['dry_run'] else 'Created'
+        summary = f"{verb} {result['created']} tools ({result['error_count']} rows rejected)"
+        if 'detail' in result:
+            raise CommandError(f"{result['detail']}. {summary} before it.")
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from apps.tools.search import SQLiteFTS5Backend
+
+
+class Command(BaseCommand):
+    help = 'Recreate missing tool search index triggers and rebuild the SQLite FTS5 index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite' or not SQLiteFTS5Backend.is_available(using):
+            raise CommandError(f'{using!r} has no FTS5 tool index; searches use the LIKE backend')
+        missing = SQLiteFTS5Backend.repair(using, rebuild=True)
+        if missing:
+            self.stdout.write(f'Recreated triggers: {", ".join(missing)}')
+        indexed, total = SQLiteFTS5Backend.row_counts(using)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} of {total} tools'))
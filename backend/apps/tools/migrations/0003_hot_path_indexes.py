@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0002_created_at_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-created_at', '-id'], name='tool_available_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(fields=['owner', 'is_available'], name='tool_owner_available_idx'),
+        ),
+    ]
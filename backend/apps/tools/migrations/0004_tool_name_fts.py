@@ -0,0 +1,58 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:38
+
+from django.db import migrations, OperationalError
+
+from apps.tools.search import FTS_TABLE, FTS_TRIGGERS
+
+# External-content FTS5 index over Tool.name, kept in sync by triggers.
+# Only created on SQLite builds that ship FTS5; other databases use the
+# portable search backend.
+CREATE_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, content='tools_tool', content_rowid='id', tokenize='unicode61'
+    )
+    """,
+    *FTS_TRIGGERS.values(),
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    'DROP TRIGGER IF EXISTS tools_tool_fts_au',
+    'DROP TRIGGER IF EXISTS tools_tool_fts_ad',
+    'DROP TRIGGER IF EXISTS tools_tool_fts_ai',
+    'DROP TABLE IF EXISTS tools_tool_fts',
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)')
+            cursor.execute('DROP TABLE temp.fts5_probe')
+        except OperationalError:
+            # SQLite built without FTS5
+            return
+        for sql in CREATE_SQL:
+            cursor.execute(sql)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in DROP_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0003_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
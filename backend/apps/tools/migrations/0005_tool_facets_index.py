@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0004_tool_name_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tool',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['category', 'condition', 'owner'], name='tool_available_facets_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:50
+
+import apps.tools.models
+from django.db import migrations, models
+import toolshare.storage
+
+
+def count_existing_images(apps, schema_editor):
+    # Existing uploads keep their tools/<owner>/ names; they just get counted
+    Tool = apps.get_model('tools', 'Tool')
+    ImageBlob = apps.get_model('tools', 'ImageBlob')
+    counts = (
+        Tool.objects.exclude(image='').exclude(image__isnull=True)
+        .values_list('image').annotate(n=models.Count('pk')).values_list('image', 'n')
+    )
+    ImageBlob.objects.bulk_create([ImageBlob(name=name, ref_count=n) for name, n in counts], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0006_tool_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='tool',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=toolshare.storage.ContentAddressedStorage(), upload_to=apps.tools.models.tool_image_upload_path),
+        ),
+        migrations.RunPython(count_existing_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:12
+
+from django.db import migrations
+
+from apps.tools.search import FTS_TABLE, FTS_TRIGGERS
+
+# 0006 and 0007 rebuild tools_tool on SQLite (AddField/AlterField copy the
+# table), which drops the triggers 0004 put on it. Put them back and
+# reindex the rows that were saved while they were missing.
+TRIGGER_SQL = [
+    *FTS_TRIGGERS.values(),
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def restore_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            # SQLite without FTS5: 0004 created nothing
+            return
+        for sql in TRIGGER_SQL:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tools', '0007_image_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_triggers, migrations.RunPython.noop),
+    ]
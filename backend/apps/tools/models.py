@@ -1,6 +1,8 @@
+from collections import defaultdict
+
 from django.db import models
 from django.conf import settings
-import os
+from toolshare.storage import tool_image_storage
 
 
 def tool_image_upload_path(instance, filename):
@@ -8,6 +10,41 @@ def tool_image_upload_path(instance, filename):
     return f'tools/{instance.owner.id}/{filename}'
 
 
+class ToolQuerySet(models.QuerySet):
+    def with_related(self):
+        """Join the owner so serializing a page doesn't query per row"""
+        return self.select_related('owner')
+    
+    def by_distance_from(self, user, max_distance=None):
+        """
+        (distance, tools) pairs, nearest first: one queryset per distance from
+        `user`'s block, each annotated with `distance`. Owners in blocks with no
+        known distance come last at UNKNOWN_DISTANCE, unless max_distance is set.
+        """
+        from apps.users.models import BlockDistance
+        from apps.users.proximity import UNKNOWN_DISTANCE
+        
+        # One range scan of the (from_block, distance) index; blocks are few
+        rows = BlockDistance.objects.filter(from_block=user.block_no).order_by('distance')
+        if max_distance is not None:
+            rows = rows.filter(distance__lte=max_distance)
+        blocks = defaultdict(list)
+        for to_block, distance in rows.values_list('to_block', 'distance'):
+            blocks[distance].append(to_block)
+        
+        groups = [
+            (distance, self.filter(owner__block_no__in=group).annotate(distance=models.Value(distance)))
+            for distance, group in blocks.items()
+        ]
+        if max_distance is None:
+            known = [block for group in blocks.values() for block in group]
+            groups.append((
+                UNKNOWN_DISTANCE,
+                self.exclude(owner__block_no__in=known).annotate(distance=models.Value(UNKNOWN_DISTANCE)),
+            ))
+        return groups
+
+
 class Tool(models.Model):
     CATEGORY_CHOICES = [
         ('Power Tools', 'Power Tools'),
@@ -27,7 +64,9 @@ class Tool(models.Model):
     ]
     
     name = models.CharField(max_length=100)
-    image = models.ImageField(upload_to=tool_image_upload_path, blank=True, null=True)
+    image = models.ImageField(upload_to=tool_image_upload_path, storage=tool_image_storage, blank=True, null=True)
+    # Resized copies of image, filled in by apps.tools.images
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
     condition = models.CharField(max_length=20, choices=CONDITION_CHOICES)
     is_available = models.BooleanField(default=True)
@@ -35,17 +74,53 @@ class Tool(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = ToolQuerySet.as_manager()
+    
+    # Image name as last loaded/saved, so apps.tools.blobs can move references
+    _saved_image = None
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'image' in instance.__dict__:
+            instance._saved_image = instance.image.name or None
+        return instance
+    
     def __str__(self):
         return f"{self.name} - {self.owner.username}"
     
-    def delete(self, *args, **kwargs):
-        # Delete image file when tool is deleted
-        if self.image:
-            if os.path.isfile(self.image.path):
-                os.remove(self.image.path)
-        super().delete(*args, **kwargs)
-    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Tool'
-        verbose_name_plural = 'Tools'
\ No newline at end of file
+        verbose_name_plural = 'Tools'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='tool_created_id_idx'),
+            models.Index(fields=['owner', '-created_at', '-id'], name='tool_owner_created_idx'),
+            # tool_list: available tools newest first
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_available=True),
+                name='tool_available_created_idx',
+            ),
+            models.Index(fields=['owner', 'is_available'], name='tool_owner_available_idx'),
+            # tool_search facets: counted from the index alone
+            models.Index(
+                fields=['category', 'condition', 'owner'],
+                condition=models.Q(is_available=True),
+                name='tool_available_facets_idx',
+            ),
+        ]
+
+
+class ImageBlob(models.Model):
+    """
+    Reference count for a stored image file. Image files can be shared by
+    several tools, so they are only removed by collect_media_blobs once
+    nothing points at them.
+    """
+    name = models.CharField(max_length=255, primary_key=True)
+    ref_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count})"
\ No newline at end of file
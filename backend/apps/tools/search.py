@@ -0,0 +1,193 @@
+"""
+Tool name search backends.
+
+The backend is chosen by settings.TOOL_SEARCH_BACKEND (a dotted path). By
+default SQLite databases use the FTS5 index created by migration 0004 and
+everything else falls back to a portable LIKE-based backend.
+
+The FTS5 index is fed by triggers on tools_tool. SQLite drops them whenever
+a migration rebuilds that table (most AddField/AlterField on Tool do), so
+repair_fts_index() puts any missing ones back after every migrate.
+"""
+import re
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from toolshare.response_cache import bump
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TOKENS = 8
+
+# External-content FTS5 index over Tool.name, and the triggers that feed it.
+# Migrations 0004 and 0008 create them from here too.
+FTS_TABLE = 'tools_tool_fts'
+# Moves when an index is rebuilt, which changes matches without a tool write
+INDEX_VERSION_KEY = 'version:tools:search-index'
+FTS_TRIGGERS = {
+    'tools_tool_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS tools_tool_fts_ai AFTER INSERT ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+    'tools_tool_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS tools_tool_fts_ad AFTER DELETE ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """,
+    'tools_tool_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS tools_tool_fts_au AFTER UPDATE OF name ON tools_tool BEGIN
+            INSERT INTO tools_tool_fts(tools_tool_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO tools_tool_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+}
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:MAX_TOKENS]
+
+
+def index_version():
+    return cache.get(INDEX_VERSION_KEY, '0')
+
+
+class SimpleSearchBackend:
+    """Every token must appear in the name; works on any database"""
+
+    def filter(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        condition = Q()
+        for token in tokens:
+            condition &= Q(name__icontains=token)
+        return queryset.filter(condition)
+
+    def search(self, queryset, query):
+        """filter(), annotated with match_id: order by -match_id for newest first"""
+        return self.filter(queryset, query).annotate(match_id=F('pk'))
+
+
+class SQLiteFTS5Backend:
+    """Prefix-matches every token against the tools_tool_fts index"""
+    table = FTS_TABLE
+    triggers = FTS_TRIGGERS
+
+    def filter(self, queryset, query):
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [self.match(tokens)])
+        )
+
+    def search(self, queryset, query):
+        """
+        filter(), but joined to the index, with match_id being its rowid. The
+        index returns matches in rowid order, so a page ordered by -match_id
+        (and a cursor on it) stops after the page instead of sorting them all.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.annotate(match_id=F('pk'))
+        return queryset.extra(
+            tables=[self.table],
+            where=[f'{self.table}.rowid = {queryset.model._meta.db_table}.id', f'{self.table} MATCH %s'],
+            params=[self.match(tokens)],
+        ).annotate(match_id=RawSQL(f'{self.table}.rowid', []))
+
+    @staticmethod
+    def match(tokens):
+        # Quote each token so user input can't inject FTS5 query syntax
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    @classmethod
+    def is_available(cls, using='default'):
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [cls.table])
+            return cursor.fetchone() is not None
+
+    @classmethod
+    def missing_triggers(cls, using='default'):
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'tools_tool'")
+            present = {row[0] for row in cursor.fetchall()}
+        return sorted(set(cls.triggers) - present)
+
+    @classmethod
+    def row_counts(cls, using='default'):
+        """(rows indexed, rows in tools_tool); the docsize table has one row per indexed document"""
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'SELECT (SELECT COUNT(*) FROM {cls.table}_docsize), (SELECT COUNT(*) FROM tools_tool)')
+            return cursor.fetchone()
+
+    @classmethod
+    def repair(cls, using='default', rebuild=False):
+        """Recreate missing triggers and reindex; returns the names recreated"""
+        missing = cls.missing_triggers(using)
+        with connections[using].cursor() as cursor:
+            for name in missing:
+                cursor.execute(cls.triggers[name])
+            if missing or rebuild:
+                # Rows saved while the triggers were gone aren't indexed
+                cursor.execute(f"INSERT INTO {cls.table}({cls.table}) VALUES ('rebuild')")
+                bump(INDEX_VERSION_KEY)
+        return missing
+
+
+def _uses_fts(using):
+    return connections[using].vendor == 'sqlite' and SQLiteFTS5Backend.is_available(using)
+
+
+def repair_fts_index(sender=None, using='default', **kwargs):
+    """post_migrate receiver: undo the trigger loss of any table rebuild"""
+    if _uses_fts(using):
+        SQLiteFTS5Backend.repair(using)
+
+
+@checks.register(checks.Tags.database)
+def check_fts_index(app_configs=None, databases=None, **kwargs):
+    """Run by migrate and `check --database default`: the index must still be fed and complete"""
+    errors = []
+    for using in databases or ():
+        if not _uses_fts(using):
+            continue
+        missing = SQLiteFTS5Backend.missing_triggers(using)
+        if missing:
+            errors.append(checks.Error(
+                f'Tool search index triggers are missing on {using!r}: {", ".join(missing)}. '
+                'New and renamed tools are not searchable.',
+                hint='Run manage.py rebuild_search_index.',
+                id='tools.E001',
+            ))
+            continue
+        indexed, total = SQLiteFTS5Backend.row_counts(using)
+        if indexed != total:
+            errors.append(checks.Warning(
+                f'Tool search index on {using!r} holds {indexed} rows but tools_tool has {total}.',
+                hint='Run manage.py rebuild_search_index.',
+                id='tools.W001',
+            ))
+    return errors
+
+
+_backend = None
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'TOOL_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'sqlite' and SQLiteFTS5Backend.is_available():
+            _backend = SQLiteFTS5Backend()
+        else:
+            _backend = SimpleSearchBackend()
+    return _backend
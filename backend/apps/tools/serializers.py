@@ -1,15 +1,32 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
+from toolshare.sparse import ValuesSerializer
+from .images import FORMATS, schedule_variants
 from .models import Tool
-from apps.users.serializers import UserSerializer
+from apps.users.serializers import UserSerializer, UserValuesSerializer
+
+
+def variant_srcset(image_variants, url):
+    """{'webp': '<url> 160w, <url> 480w, ...', 'jpeg': ...} for the stored variants"""
+    return {
+        ext: ', '.join(
+            f"{url(entry[ext])} {entry['width']}w"
+            for entry in sorted(image_variants.values(), key=lambda entry: entry['width'])
+        )
+        for ext in FORMATS
+    }
 
 
 class ToolSerializer(serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     image_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = Tool
-        fields = ('id', 'name', 'image', 'image_url', 'category', 'condition', 'is_available', 'owner', 'created_at', 'updated_at')
+        fields = ('id', 'name', 'image', 'image_url', 'thumbnail_url', 'image_srcset', 'category', 'condition',
+                  'is_available', 'owner', 'created_at', 'updated_at')
         read_only_fields = ('id', 'owner', 'created_at', 'updated_at')
     
     def get_image_url(self, obj):
@@ -19,11 +36,84 @@ class ToolSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.image.url)
         return None
     
+    def _variant_url(self, name):
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(default_storage.url(name))
+        return None
+    
+    def get_thumbnail_url(self, obj):
+        thumb = obj.image_variants.get('thumb')
+        if thumb:
+            return self._variant_url(thumb['jpeg'])
+        return None
+    
+    def get_image_srcset(self, obj):
+        """{'webp': '<url> 160w, <url> 480w, ...', 'jpeg': ...} once variants exist"""
+        if not obj.image_variants or not self.context.get('request'):
+            return None
+        return variant_srcset(obj.image_variants, self._variant_url)
+    
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
         return super().create(validated_data)
 
 
+class NearbyToolSerializer(ToolSerializer):
+    distance = serializers.IntegerField(read_only=True)
+    
+    class Meta(ToolSerializer.Meta):
+        fields = ToolSerializer.Meta.fields + ('distance',)
+
+
+class ToolValuesSerializer(ValuesSerializer):
+    """ToolSerializer's output from values() rows, for list endpoints"""
+    fields = ToolSerializer.Meta.fields
+    relations = {'owner': (UserValuesSerializer, 'owner_id')}
+    datetime_fields = ('created_at', 'updated_at')
+    computed = {
+        'image': ('image',),
+        'image_url': ('image',),
+        'thumbnail_url': ('image_variants',),
+        'image_srcset': ('image_variants',),
+    }
+    image_storage = Tool._meta.get_field('image').storage
+
+    def _absolute(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_image(self, row):
+        name = self.value(row, 'image')
+        return self._absolute(self.image_storage.url(name)) if name else None
+
+    def get_image_url(self, row):
+        name = self.value(row, 'image')
+        if name and self.context.get('request'):
+            return self._absolute(self.image_storage.url(name))
+        return None
+
+    def _variant_url(self, name):
+        if self.context.get('request'):
+            return self._absolute(default_storage.url(name))
+        return None
+
+    def get_thumbnail_url(self, row):
+        thumb = (self.value(row, 'image_variants') or {}).get('thumb')
+        return self._variant_url(thumb['jpeg']) if thumb else None
+
+    def get_image_srcset(self, row):
+        variants = self.value(row, 'image_variants')
+        if not variants or not self.context.get('request'):
+            return None
+        return variant_srcset(variants, self._variant_url)
+
+
+class NearbyToolValuesSerializer(ToolValuesSerializer):
+    """Rows annotated with `distance` by Tool.objects.by_distance_from()"""
+    fields = NearbyToolSerializer.Meta.fields
+
+
 class ToolCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tool
@@ -31,4 +121,23 @@ class ToolCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['owner'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        tool = super().create(validated_data)
+        schedule_variants(tool)
+        return tool
+    
+    def update(self, instance, validated_data):
+        old_image = instance.image.name
+        if 'image' in validated_data:
+            validated_data['image_variants'] = {}
+        tool = super().update(instance, validated_data)
+        if tool.image.name != old_image:
+            schedule_variants(tool)
+        return tool
+
+
+class ToolImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk import; validated without touching the database"""
+    
+    class Meta:
+        model = Tool
+        fields = ('name', 'category', 'condition', 'is_available')
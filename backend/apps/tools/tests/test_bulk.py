@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+from tempfile import NamedTemporaryFile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from rest_framework.test import APITestCase
+
+from apps.tools import bulk
+from apps.tools.models import Tool
+
+
+class BulkImportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.owner)
+
+    def post(self, body, content_type='text/csv', **params):
+        query = '?' + '&'.join(f'{key}={value}' for key, value in params.items()) if params else ''
+        return self.client.generic('POST', f'/api/tools/bulk/import/{query}', body, content_type=content_type)
+
+    def test_csv_rows_are_created_and_bad_rows_reported(self):
+        response = self.post(
+            'name,category,condition\n'
+            'Drill,Power Tools,Good\n'
+            'Rake,Spaceships,Good\n'
+            ',Hand Tools,Fair\n'
+            'Saw,Hand Tools,Fair\n'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual([error['line'] for error in response.data['errors']], [3, 4])
+        self.assertIn('category', response.data['errors'][0]['errors'])
+        self.assertEqual(sorted(Tool.objects.values_list('name', flat=True)), ['Drill', 'Saw'])
+
+    def test_ndjson_body_and_upload(self):
+        body = b'{"name": "Drill", "category": "Power Tools", "condition": "Good"}\nnot json\n[1]\n'
+        response = self.post(body, content_type='application/x-ndjson')
+        self.assertEqual((response.data['created'], response.data['error_count']), (1, 2))
+
+        upload = SimpleUploadedFile('tools.jsonl', body)
+        response = self.client.post('/api/tools/bulk/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(Tool.objects.count(), 2)
+
+    def test_dry_run_creates_nothing(self):
+        response = self.post('name,category,condition\nDrill,Power Tools,Good\n', dry_run=1)
+        self.assertEqual(response.data['created'], 1)
+        self.assertFalse(Tool.objects.exists())
+
+    def test_bad_header_is_rejected(self):
+        for body in ('title,category\nDrill,Power Tools\n', '', b'\xff\xfename\n'):
+            with self.subTest(body=body):
+                response = self.post(body)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
+        self.assertEqual(self.client.post('/api/tools/bulk/import/', {}, format='multipart').status_code, 400)
+
+    def test_only_rejected_rows_is_a_bad_request(self):
+        response = self.post('name,category,condition\nRake,Spaceships,Good\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error_count'], 1)
+
+    def test_malformed_csv_reports_what_was_created(self):
+        # A cell over csv's field size limit
+        for broken in ('Saw,Hand Tools,"' + 'x' * 200000 + '"\n', 'Saw \udcff,Hand Tools,Fair\n'):
+            with self.subTest(broken=broken):
+                Tool.objects.all().delete()
+                body = 'name,category,condition\nDrill,Power Tools,Good\n' + broken
+                response = self.post(body.encode(errors='surrogateescape'))
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.data)
+                self.assertIn('line 3', response.data['detail'])
+                self.assertEqual(response.data['created'], 1)
+                self.assertEqual(Tool.objects.count(), 1)
+
+    def test_bad_encoding_in_a_later_chunk_keeps_and_reports_earlier_chunks(self):
+        rows = ''.join(f'Drill {i},Power Tools,Good\n' for i in range(bulk.CHUNK_SIZE + 10))
+        body = ('name,category,condition\n' + rows).encode() + b'Saw \xff,Hand Tools,Fair\n'
+        response = self.post(body)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Unreadable input', response.data['detail'])
+        self.assertEqual(response.data['created'], bulk.CHUNK_SIZE + 10)
+        self.assertEqual(Tool.objects.count(), bulk.CHUNK_SIZE + 10)
+
+    def test_command_reports_unreadable_input(self):
+        with NamedTemporaryFile(suffix='.csv') as fh:
+            fh.write(b'name,category,condition\nDrill,Power Tools,Good\nSaw \xff,Hand Tools,Fair\n')
+            fh.flush()
+            with self.assertRaisesMessage(CommandError, 'Created 1 tools'):
+                call_command('import_tools', fh.name, owner=self.owner.email, stdout=io.StringIO())
+        self.assertEqual(Tool.objects.count(), 1)
+
+
+class BulkExportTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        other = User.objects.create_user(username='other', email='other@example.com')
+        for name in ('Drill', '=HYPERLINK("http://evil.example")', '+1', '-rake', '@sum', "'quoted", 'Saw, "big"'):
+            Tool.objects.create(owner=cls.owner, name=name, category='Other', condition='Good')
+        Tool.objects.create(owner=other, name='Not mine', category='Other', condition='Good')
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    def export(self, **params):
+        response = self.client.get('/api/tools/bulk/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv_export_escapes_formulas(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="tools.csv"')
+        rows = list(csv.DictReader(io.StringIO(body)))
+        names = [row['name'] for row in rows]
+        self.assertEqual(names, [
+            'Drill', '\'=HYPERLINK("http://evil.example")', "'+1", "'-rake", "'@sum", "'quoted", 'Saw, "big"',
+        ])
+
+    def test_ndjson_export_is_verbatim(self):
+        response, body = self.export(export_format='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        names = [json.loads(line)['name'] for line in body.splitlines()]
+        self.assertIn('=HYPERLINK("http://evil.example")', names)
+        self.assertNotIn('Not mine', names)
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(self.client.get('/api/tools/bulk/export/', {'export_format': 'xml'}).status_code, 400)
+
+    def test_round_trip(self):
+        expected = sorted(Tool.objects.filter(owner=self.owner).values_list('name', 'category', 'condition', 'is_available'))
+        for fmt, content_type in (('csv', 'text/csv'), ('ndjson', 'application/x-ndjson')):
+            with self.subTest(fmt=fmt):
+                _, body = self.export(export_format=fmt)
+                Tool.objects.filter(owner=self.owner).delete()
+                response = self.client.generic('POST', '/api/tools/bulk/import/', body.encode(), content_type=content_type)
+                self.assertEqual(response.data['error_count'], 0, response.data)
+                imported = Tool.objects.filter(owner=self.owner).values_list('name', 'category', 'condition', 'is_available')
+                self.assertEqual(sorted(imported), expected)
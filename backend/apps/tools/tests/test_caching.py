@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from apps.tools.caching import ALL_TOOLS_KEY
+
+
+class OwnerChangeInvalidationTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch('apps.tools.caching.bump')
+        self.bump = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = get_user_model().objects.create_user(
+            username='owner', email='owner@example.com', password='correct horse', block_no='A'
+        )
+
+    def assertBumped(self, bumped):
+        if bumped:
+            self.bump.assert_called_once()
+            self.assertIn(ALL_TOOLS_KEY, self.bump.call_args.args)
+        else:
+            self.bump.assert_not_called()
+        self.bump.reset_mock()
+
+    def test_signup_and_login_leave_the_feed_cached(self):
+        self.assertBumped(False)
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.save(update_fields=['last_login'])
+        user.save(update_fields=['password'])
+        self.assertBumped(False)
+
+    def test_saves_that_change_nothing_shown_leave_the_feed_cached(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.first_name = 'Not shown in tool responses'
+        user.save()
+        user.save()
+        self.assertBumped(False)
+
+    def test_changing_embedded_owner_fields_expires_the_feed(self):
+        user = get_user_model().objects.get(pk=self.user.pk)
+        user.block_no = 'B'
+        user.save()
+        self.assertBumped(True)
+        user.save()
+        self.assertBumped(False)
+
+        user.username = 'renamed'
+        user.save(update_fields=['username'])
+        self.assertBumped(True)
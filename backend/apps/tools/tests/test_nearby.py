@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core import serializers
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from apps.tools.models import Tool
+from apps.users.models import BlockDistance
+from apps.users.proximity import UNKNOWN_DISTANCE, rebuild_block_distances
+
+
+class NearbyToolsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.me = User.objects.create_user(username='me', email='me@example.com', block_no='2')
+        owners = {
+            block: User.objects.create_user(username=f'owner{block or "x"}', email=f'{block}@example.com', block_no=block)
+            for block in ('1', '2', '3', '5', '')
+        }
+        rebuild_block_distances()
+        # Blocks sit in a row (1, 2, 3, 5), so block 5 is two away from 2.
+        # Three tools per owner, created in an order that doesn't match distance.
+        now = timezone.now()
+        for block in ('5', '', '3', '1', '2'):
+            for i in range(3):
+                Tool.objects.create(owner=owners[block], name=f'Tool {block}{i}', category='Other', condition='Good')
+        Tool.objects.create(owner=owners['1'], name='Lent out', category='Other', condition='Good', is_available=False)
+        Tool.objects.create(owner=cls.me, name='Mine', category='Other', condition='Good')
+        # Equal created_at within a block, so ties fall back to id
+        Tool.objects.filter(owner=owners['3']).update(created_at=now - timedelta(days=1))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.me)
+
+    def walk(self, **params):
+        rows, url, pages = [], '/api/tools/nearby/', 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, 200)
+            rows += response.data['results']
+            url, pages = response.data['next'], pages + 1
+        return rows, pages
+
+    def test_tools_come_nearest_first_then_newest(self):
+        rows, _ = self.walk(page_size=50)
+        distances = [row['distance'] for row in rows]
+        self.assertEqual(distances, [0] * 3 + [1] * 6 + [2] * 3 + [UNKNOWN_DISTANCE] * 3)
+        same_block = [(row['created_at'], row['id']) for row in rows if row['owner']['block_no'] == '3']
+        self.assertEqual(same_block, sorted(same_block, reverse=True))
+        names = {row['name'] for row in rows}
+        self.assertNotIn('Mine', names)
+        self.assertNotIn('Lent out', names)
+
+    def test_cursor_pages_cover_every_tool_once(self):
+        everything, _ = self.walk(page_size=50)
+        for page_size in (1, 2, 4):
+            with self.subTest(page_size=page_size):
+                rows, pages = self.walk(page_size=page_size)
+                self.assertEqual([row['id'] for row in rows], [row['id'] for row in everything])
+                self.assertEqual(pages, -(-len(everything) // page_size))
+
+    def test_max_distance_drops_far_and_unknown_blocks(self):
+        rows, _ = self.walk(page_size=50, max_distance=1)
+        self.assertEqual({row['distance'] for row in rows}, {0, 1})
+        self.assertEqual(self.client.get('/api/tools/nearby/', {'max_distance': 'x'}).status_code, 400)
+
+    def test_malformed_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/tools/nearby/', {'cursor': 'nope'}).status_code, 404)
+
+
+class BlockDistanceMaintenanceTests(APITestCase):
+    def test_new_block_adds_distances(self):
+        User = get_user_model()
+        User.objects.create_user(username='a', email='a@example.com', block_no='1')
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='b', email='b@example.com', block_no='4')
+        self.assertEqual(BlockDistance.objects.get(from_block='1', to_block='4').distance, 1)
+
+    def test_fixture_loads_do_not_rebuild(self):
+        user = get_user_model()(pk=999, username='c', email='c@example.com', block_no='9')
+        fixture = serializers.serialize('json', [user])
+        with self.captureOnCommitCallbacks(execute=True):
+            for obj in serializers.deserialize('json', fixture):
+                obj.save()
+        self.assertFalse(BlockDistance.objects.exists())
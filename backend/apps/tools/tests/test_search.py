@@ -0,0 +1,193 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APITestCase
+
+from apps.tools.models import Tool
+from apps.tools.search import SimpleSearchBackend, SQLiteFTS5Backend, check_fts_index
+
+sqlite_only = skipUnless(connection.vendor == 'sqlite', 'FTS5 index is SQLite-only')
+
+
+class ToolSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.searcher = User.objects.create_user(username='searcher', email='searcher@example.com', block_no='A')
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com', block_no='A')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.searcher)
+
+    def create_tool(self, name, category='Power Tools', condition='Good', **kwargs):
+        return Tool.objects.create(owner=self.owner, name=name, category=category, condition=condition, **kwargs)
+
+    def search(self, q='', **params):
+        response = self.client.get('/api/tools/search/', {'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_new_tool_is_found_by_prefix(self):
+        tool = self.create_tool('Drill')
+        for q in ('Drill', 'dri'):
+            data = self.search(q)
+            self.assertEqual(data['count'], 1, q)
+            self.assertEqual([row['id'] for row in data['results']], [tool.pk])
+
+    def test_renamed_tool_is_found_by_its_new_name(self):
+        tool = self.create_tool('Drill')
+        tool.name = 'Hammer'
+        tool.save()
+        self.assertEqual(self.search('ham')['count'], 1)
+        self.assertEqual(self.search('dri')['count'], 0)
+
+    def test_facet_counts_ignore_their_own_filter(self):
+        self.create_tool('Cordless drill', 'Power Tools', 'Good')
+        self.create_tool('Hammer drill', 'Power Tools', 'Fair')
+        self.create_tool('Hand drill', 'Hand Tools', 'Good')
+        self.create_tool('Drill bits', 'Hand Tools', 'Good', is_available=False)
+        self.create_tool('Rake', 'Garden Tools', 'Good')
+
+        data = self.search('drill', category='Power Tools')
+        self.assertEqual(data['count'], 2)
+        # Category counts ignore the category filter; condition counts apply it
+        self.assertEqual(data['facets']['category'], {
+            'Power Tools': 2, 'Hand Tools': 1, 'Garden Tools': 0, 'Cleaning': 0,
+            'Automotive': 0, 'Measuring': 0, 'Other': 0,
+        })
+        self.assertEqual(data['facets']['condition'], {'Excellent': 0, 'Very Good': 0, 'Good': 1, 'Fair': 1})
+
+        data = self.search('drill', category='Power Tools', condition='Good')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['facets']['category']['Hand Tools'], 1)
+        self.assertEqual(data['facets']['condition']['Fair'], 1)
+
+    def test_results_come_newest_first_and_cursor_pages_cover_them(self):
+        tools = [self.create_tool(f'Drill {i}') for i in range(5)]
+        self.create_tool('Rake')
+        expected = [tool.pk for tool in reversed(tools)]
+        self.assertEqual([row['id'] for row in self.search('drill', page_size=50)['results']], expected)
+        
+        seen, params = [], {'q': 'drill', 'pagination': 'cursor', 'page_size': 2}
+        url = '/api/tools/search/'
+        while url:
+            data = self.client.get(url, params).data
+            seen += [row['id'] for row in data['results']]
+            url, params = data['next'], None
+        self.assertEqual(seen, expected)
+    
+    def test_facets_are_counted_once_per_query(self):
+        for i in range(3):
+            self.create_tool(f'Drill {i}')
+        self.search('drill', page_size=1)
+        # Versions and facet cells now come from the cache: only the page is read
+        with self.assertNumQueries(1):
+            data = self.search('drill', page_size=1, page=2)
+        self.assertEqual(data['count'], 3)
+        
+        self.create_tool('Drill press')
+        self.assertEqual(self.search('drill')['count'], 4)
+    
+    def test_counts_leave_out_the_requesters_tools(self):
+        self.create_tool('Drill')
+        Tool.objects.create(owner=self.searcher, name='My drill', category='Power Tools', condition='Good')
+        data = self.search('drill')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['facets']['category']['Power Tools'], 1)
+        
+        Tool.objects.create(owner=self.searcher, name='Drill bits', category='Hand Tools', condition='Good')
+        data = self.search('drill')
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['facets']['category']['Hand Tools'], 0)
+    
+    def test_invalid_facet_values_are_rejected(self):
+        response = self.client.get('/api/tools/search/', {'category': 'Spaceships'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.data)
+
+    @sqlite_only
+    def test_migrate_restores_triggers_lost_to_a_table_rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER tools_tool_fts_ai')
+        tool = self.create_tool('Drill')
+        self.assertEqual(self.search('dri')['count'], 0)
+
+        call_command('migrate', verbosity=0)
+        self.assertEqual([row['id'] for row in self.search('dri')['results']], [tool.pk])
+
+
+class SearchBackendTests:
+    """Shared cases; subclasses set backend"""
+    backend = None
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        names = ['Cordless Drill', 'Hammer drill', 'Claw hammer', 'Hedge trimmer', 'Perceuse à percussion']
+        cls.tools = {
+            name: Tool.objects.create(owner=owner, name=name, category='Other', condition='Good')
+            for name in names
+        }
+
+    def names(self, query):
+        return sorted(self.backend.filter(Tool.objects.all(), query).values_list('name', flat=True))
+
+    def test_prefix_and_case_insensitive(self):
+        self.assertEqual(self.names('DRI'), ['Cordless Drill', 'Hammer drill'])
+
+    def test_every_token_must_match(self):
+        self.assertEqual(self.names('hammer dri'), ['Hammer drill'])
+
+    def test_empty_query_matches_everything(self):
+        self.assertEqual(len(self.names('  ')), len(self.tools))
+
+    def test_unicode_tokens(self):
+        self.assertEqual(self.names('à perc'), ['Perceuse à percussion'])
+
+    def test_query_syntax_is_treated_as_words(self):
+        self.assertEqual(self.names('"drill*'), ['Cordless Drill', 'Hammer drill'])
+        # 'or' and 'name' are just more words that have to match
+        self.assertEqual(self.names('drill OR hedge'), [])
+        self.assertEqual(self.names('name:drill'), [])
+
+    def test_deleted_tools_leave_the_index(self):
+        self.tools['Hammer drill'].delete()
+        self.assertEqual(self.names('drill'), ['Cordless Drill'])
+
+
+class SimpleSearchBackendTests(SearchBackendTests, TestCase):
+    backend = SimpleSearchBackend()
+
+
+@sqlite_only
+class SQLiteFTS5BackendTests(SearchBackendTests, TestCase):
+    backend = SQLiteFTS5Backend()
+
+    def test_index_is_complete(self):
+        self.assertEqual(SQLiteFTS5Backend.missing_triggers(), [])
+        indexed, total = SQLiteFTS5Backend.row_counts()
+        self.assertEqual(indexed, total)
+
+    def test_check_reports_missing_triggers(self):
+        self.assertEqual(check_fts_index(databases=['default']), [])
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER tools_tool_fts_au')
+        self.assertEqual([error.id for error in check_fts_index(databases=['default'])], ['tools.E001'])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(check_fts_index(databases=['default']), [])
+
+    def test_check_reports_unindexed_rows(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO tools_tool_fts(tools_tool_fts) VALUES ('delete-all')")
+        self.assertEqual([error.id for error in check_fts_index(databases=['default'])], ['tools.W001'])
+        self.assertEqual(self.names('drill'), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.names('drill'), ['Cordless Drill', 'Hammer drill'])
@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_API_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
-    path('', views.tool_list, name='tool_list'),
+    path('', read_views.tool_list, name='tool_list'),
+    path('nearby/', views.nearby_tools, name='nearby_tools'),
+    path('search/', views.tool_search, name='tool_search'),
     path('my-tools/', views.my_tools, name='my_tools'),
-    path('stats/', views.tool_stats, name='tool_stats'),
+    path('bulk/import/', views.bulk_import, name='tool_bulk_import'),
+    path('bulk/export/', views.bulk_export, name='tool_bulk_export'),
+    path('stats/', read_views.tool_stats, name='tool_stats'),
     path('<int:pk>/', views.tool_detail, name='tool_detail'),
 ]
\ No newline at end of file
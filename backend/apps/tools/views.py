@@ -1,34 +1,68 @@
+import hashlib
+import io
+
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
+from toolshare.db import replica_reads
+from toolshare.pagination import (
+    AsyncPageNumberPagination, GroupedKeysetPagination, IdKeysetPagination, KeysetPagination, wants_cursor,
+)
+from toolshare.response_cache import cache_response, get_version
+from toolshare.stats import global_counts
+from . import bulk
+from .caching import all_tools, own_tools
 from .models import Tool
-from .serializers import ToolSerializer, ToolCreateSerializer
+from .search import get_search_backend, index_version, tokenize
+from .serializers import NearbyToolValuesSerializer, ToolCreateSerializer, ToolSerializer, ToolValuesSerializer
+
 
+# Facet cells are keyed on the tool versions, so this only bounds memory
+SEARCH_FACETS_TIMEOUT = getattr(settings, 'SEARCH_FACETS_TIMEOUT', 300)
 
-class ToolPagination(PageNumberPagination):
+
+class ToolPagination(AsyncPageNumberPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 50
 
 
+class KnownCountPagination(ToolPagination):
+    """ToolPagination for result sets whose size was already counted"""
+    
+    def __init__(self, count):
+        self.count = count
+    
+    def django_paginator_class(self, object_list, per_page):
+        paginator = Paginator(object_list, per_page)
+        paginator.count = self.count
+        return paginator
+
+
 @api_view(['GET', 'POST'])
+@cache_response(all_tools)
 def tool_list(request):
     if request.method == 'GET':
         # Get all available tools from other users
-        tools = Tool.objects.filter(is_available=True).exclude(owner=request.user)
+        tools = Tool.objects.with_related().filter(is_available=True).exclude(owner=request.user)
+        
+        serializer = ToolValuesSerializer.from_request(request)
+        rows = serializer.values(tools)
         
-        # Apply pagination
-        paginator = ToolPagination()
-        page = paginator.paginate_queryset(tools, request)
+        # Apply pagination (keyset when the client asks for a cursor)
+        paginator = KeysetPagination() if wants_cursor(request) else ToolPagination()
+        page = paginator.paginate_queryset(rows, request)
         
         if page is not None:
-            serializer = ToolSerializer(page, many=True, context={'request': request})
-            return paginator.get_paginated_response(serializer.data)
+            return paginator.get_paginated_response(serializer.many(page))
         
-        serializer = ToolSerializer(tools, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response(serializer.many(rows))
     
     elif request.method == 'POST':
         serializer = ToolCreateSerializer(data=request.data, context={'request': request})
@@ -40,15 +74,123 @@ def tool_list(request):
 
 
 @api_view(['GET'])
+def tool_search(request):
+    """
+    Search available tools by name with optional category/condition filters.
+    
+    Results come newest first by id, the order the search index returns
+    them in. Facet counts and the total come from the cached
+    (category, condition) cells of the query, see search_facet_cells().
+    """
+    categories = request.query_params.getlist('category')
+    conditions = request.query_params.getlist('condition')
+    errors = {}
+    valid_categories = [value for value, _ in Tool.CATEGORY_CHOICES]
+    valid_conditions = [value for value, _ in Tool.CONDITION_CHOICES]
+    if any(c not in valid_categories for c in categories):
+        errors['category'] = [f'Choose from: {", ".join(valid_categories)}']
+    if any(c not in valid_conditions for c in conditions):
+        errors['condition'] = [f'Choose from: {", ".join(valid_conditions)}']
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    query = request.query_params.get('q', '')
+    tools = Tool.objects.filter(is_available=True).exclude(owner=request.user)
+    
+    # Each dimension's counts ignore its own filter so clients can offer the
+    # other values as alternatives
+    facets = {
+        'category': dict.fromkeys(valid_categories, 0),
+        'condition': dict.fromkeys(valid_conditions, 0),
+    }
+    total = 0
+    for (category, condition), n in search_facet_cells(request, query).items():
+        category_selected = not categories or category in categories
+        condition_selected = not conditions or condition in conditions
+        if condition_selected and category in facets['category']:
+            facets['category'][category] += n
+        if category_selected and condition in facets['condition']:
+            facets['condition'][condition] += n
+        if category_selected and condition_selected:
+            total += n
+    
+    category_q = Q(category__in=categories) if categories else Q()
+    condition_q = Q(condition__in=conditions) if conditions else Q()
+    serializer = ToolValuesSerializer.from_request(request)
+    matches = get_search_backend().search(tools.filter(category_q & condition_q), query)
+    results = serializer.values(matches).order_by('-match_id')
+    paginator = IdKeysetPagination('match_id') if wants_cursor(request) else KnownCountPagination(total)
+    page = paginator.paginate_queryset(results, request)
+    response = paginator.get_paginated_response(serializer.many(page))
+    response.data['facets'] = facets
+    return response
+
+
+def search_facet_cells(request, query):
+    """
+    {(category, condition): available tools matching `query`}, leaving out the
+    requester's own. Counting every match takes a pass over the whole match
+    set, so it runs once per query and version: for all owners, minus the
+    requester's tools, each cached under its own tool version and the index's.
+    """
+    backend = get_search_backend()
+    tokens = hashlib.sha1(' '.join(tokenize(query)).encode()).hexdigest()
+    
+    def cells(scope):
+        # One write bumps both scopes to the same token, so the key names its scope
+        version_key, tools = scope(request)
+        key = f'search:facets:{version_key}:{index_version()}:{get_version(version_key, tools)}:{tokens}'
+        counted = cache.get(key)
+        if counted is None:
+            counted = {
+                (category, condition): n
+                for category, condition, n in backend.filter(tools.filter(is_available=True), query)
+                .values_list('category', 'condition').annotate(n=Count('pk')).order_by()
+            }
+            cache.set(key, counted, SEARCH_FACETS_TIMEOUT)
+        return counted
+    
+    everyone, own = cells(all_tools), cells(own_tools)
+    return {cell: n - own.get(cell, 0) for cell, n in everyone.items() if n > own.get(cell, 0)}
+
+
+@api_view(['GET'])
+def nearby_tools(request):
+    """
+    Available tools ranked by the owner's block distance from the requester,
+    newest first within a distance. Blocks are walked nearest first with one
+    query per distance a page reaches, and pages follow a cursor instead of
+    counting every match.
+    """
+    max_distance = request.query_params.get('max_distance')
+    if max_distance is not None:
+        try:
+            max_distance = int(max_distance)
+        except ValueError:
+            return Response({'max_distance': ['A valid integer is required.']}, status=status.HTTP_400_BAD_REQUEST)
+    tools = Tool.objects.with_related().filter(is_available=True).exclude(owner=request.user)
+    serializer = NearbyToolValuesSerializer.from_request(request)
+    groups = [
+        (distance, serializer.values(group))
+        for distance, group in tools.by_distance_from(request.user, max_distance)
+    ]
+    
+    paginator = GroupedKeysetPagination()
+    page = paginator.paginate_groups(groups, request)
+    return paginator.get_paginated_response(serializer.many(page))
+
+
+@api_view(['GET'])
+@cache_response(own_tools)
 def my_tools(request):
-    tools = Tool.objects.filter(owner=request.user)
-    serializer = ToolSerializer(tools, many=True, context={'request': request})
-    return Response(serializer.data)
+    serializer = ToolValuesSerializer.from_request(request)
+    return Response(serializer.many(serializer.values(Tool.objects.filter(owner=request.user))))
 
 
 @api_view(['GET', 'PUT', 'DELETE'])
+@cache_response(own_tools)
 def tool_detail(request, pk):
-    tool = get_object_or_404(Tool, pk=pk, owner=request.user)
+    tool = get_object_or_404(Tool.objects.with_related(), pk=pk, owner=request.user)
     
     if request.method == 'GET':
         serializer = ToolSerializer(tool, context={'request': request})
@@ -68,13 +210,60 @@ def tool_detail(request, pk):
 
 
 @api_view(['GET'])
+@replica_reads
 def tool_stats(request):
-    total_tools = Tool.objects.count()
-    available_tools = Tool.objects.filter(is_available=True).count()
+    totals = global_counts()
     my_tools_count = Tool.objects.filter(owner=request.user).count()
     
     return Response({
-        'total_tools': total_tools,
-        'available_tools': available_tools,
+        'total_tools': totals['total_tools'],
+        'available_tools': totals['available_tools'],
         'my_tools': my_tools_count,
-    })
\ No newline at end of file
+    })
+
+
+@api_view(['POST'])
+def bulk_import(request):
+    """
+    Create many tools owned by the requester from CSV or NDJSON, sent either
+    as the request body (Content-Type text/csv or application/x-ndjson) or
+    as a multipart `file` upload. ?dry_run=1 only validates.
+    """
+    fmt = bulk.format_for_content_type(request.content_type)
+    if fmt is not None:
+        # DRF leaves the stream unset for an empty body
+        stream = request.stream or io.BytesIO()
+    else:
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response(
+                {'detail': 'Send CSV or NDJSON as the request body or as a "file" upload.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        fmt = request.data.get('format') or ('ndjson' if upload.name.endswith(('.ndjson', '.jsonl')) else 'csv')
+        stream = upload
+    
+    try:
+        result = bulk.import_tools(stream, fmt, request.user, dry_run=request.query_params.get('dry_run') in ('1', 'true'))
+    except bulk.ImportFormatError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Input that broke off part way is an error even though earlier chunks
+    # were created; the body says how many
+    failed = 'detail' in result or (result['error_count'] and not result['created'])
+    return Response(result, status=status.HTTP_400_BAD_REQUEST if failed else status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def bulk_export(request):
+    """Stream the requester's tools as ?export_format=csv (default) or ndjson"""
+    fmt = request.query_params.get('export_format', 'csv')
+    if fmt not in bulk.FORMATS:
+        return Response({'export_format': [f'Choose from: {", ".join(bulk.FORMATS)}']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    response = StreamingHttpResponse(
+        bulk.export_tools(Tool.objects.filter(owner=request.user), fmt),
+        content_type=bulk.CONTENT_TYPES[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="tools.{fmt}"'
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser
+from .models import BlockDistance, CustomUser
 
 
 @admin.register(CustomUser)
@@ -16,4 +16,11 @@ class CustomUserAdmin(UserAdmin):
     
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Additional Info', {'fields': ('email', 'phone', 'block_no', 'house_no')}),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(BlockDistance)
+class BlockDistanceAdmin(admin.ModelAdmin):
+    list_display = ('from_block', 'to_block', 'distance')
+    list_filter = ('from_block',)
+    search_fields = ('from_block', 'to_block')
@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.users'
\ No newline at end of file
+    name = 'apps.users'
+
+    def ready(self):
+        # Keep the block distance table in step with new blocks, and cached
+        # token lookups in step with logouts and user changes
+        from . import authentication, proximity  # noqa: F401
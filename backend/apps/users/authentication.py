@@ -0,0 +1,166 @@
+"""
+Token authentication with an in-process cache of token -> user lookups.
+
+DRF's TokenAuthentication joins Token and the user table on every request.
+CachingTokenAuthentication keeps recent lookups in a bounded LRU for
+TOKEN_CACHE_TTL seconds. Each entry also records the user's auth generation,
+a counter kept in the shared Django cache and bumped whenever the user's
+tokens or account change (logout, rotation, user save/delete), so other
+worker processes drop their copy on the next request if CACHES is shared.
+
+With TOKEN_EXPIRY set (seconds), tokens older than that are rejected and
+replaced on the next login or via the token rotation endpoint.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_expiry():
+    seconds = getattr(settings, 'TOKEN_EXPIRY', 0)
+    return timedelta(seconds=seconds) if seconds else None
+
+
+def token_expired(token):
+    expiry = token_expiry()
+    return expiry is not None and token.created + expiry <= timezone.now()
+
+
+def _generation_key(user_id):
+    return f'auth:generation:{user_id}'
+
+
+def auth_generation(user_id):
+    return cache.get(_generation_key(user_id), 0)
+
+
+def _bump_generation(user_id):
+    _token_cache.discard_user(user_id)
+    cache.set(_generation_key(user_id), time.time_ns(), None)
+
+
+def invalidate_user(user_id):
+    """
+    Make every process forget cached tokens of this user, now and again on
+    commit (a lookup racing an uncommitted write may have cached old rows).
+    """
+    _bump_generation(user_id)
+    transaction.on_commit(lambda: _bump_generation(user_id))
+
+
+class TokenCache:
+    """Thread-safe LRU of token key -> (user, token, generation, expires_at)"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, user, token, generation):
+        ttl = self.ttl
+        expiry = token_expiry()
+        if expiry is not None:
+            # Don't keep a token past its own expiry
+            remaining = (token.created + expiry - timezone.now()).total_seconds()
+            ttl = min(ttl, max(remaining, 0))
+        with self._lock:
+            self._entries[key] = (user, token, generation, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_user(self, user_id):
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0].pk == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_token_cache = TokenCache(
+    maxsize=getattr(settings, 'TOKEN_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'TOKEN_CACHE_TTL', 60),
+)
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        entry = _token_cache.get(key)
+        if entry is not None:
+            user, token, generation, _ = entry
+            if auth_generation(user.pk) == generation and not token_expired(token):
+                # Views may modify request.user; never hand out the shared instance
+                return copy.copy(user), token
+            _token_cache.discard(key)
+
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        if token_expired(token):
+            raise exceptions.AuthenticationFailed('Token has expired.')
+
+        _token_cache.set(key, token.user, token, auth_generation(token.user_id))
+        return copy.copy(token.user), token
+
+
+def rotate_token(user):
+    """Replace the user's token with a new key"""
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+def get_fresh_token(user):
+    """The user's token, rotated first if it has expired"""
+    token, _ = Token.objects.get_or_create(user=user)
+    if token_expired(token):
+        token = rotate_token(user)
+    return token
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    _token_cache.discard(instance.key)
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Logins only touch last_login; nothing cached depends on it
+    if raw or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    invalidate_user(instance.pk)
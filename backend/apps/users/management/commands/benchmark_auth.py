@@ -0,0 +1,79 @@
+import json
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+
+from apps.users.authentication import CachingTokenAuthentication, _token_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare queries and latency per authenticated request for DRF '
+        'TokenAuthentication and CachingTokenAuthentication.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2_000, help='Authentications per run')
+        parser.add_argument('--users', type=int, default=50, help='Distinct tokens to rotate through')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        tokens = self.tokens(options['users'])
+        factory = RequestFactory()
+        requests = [
+            factory.get('/api/tools/', HTTP_AUTHORIZATION=f'Token {tokens[i % len(tokens)]}')
+            for i in range(options['requests'])
+        ]
+
+        report = {}
+        for name, authentication in (
+            ('TokenAuthentication', TokenAuthentication),
+            ('CachingTokenAuthentication', CachingTokenAuthentication),
+        ):
+            _token_cache.clear()
+            report[name] = self.measure(authentication(), requests)
+            self.stdout.write(
+                f"{name}: {report[name]['queries_per_request']} queries/request, "
+                f"p50={report[name]['p50_us']}us"
+            )
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+    def tokens(self, n_users):
+        User = get_user_model()
+        users = list(User.objects.filter(is_active=True).order_by('pk')[:n_users])
+        for i in range(len(users), n_users):
+            users.append(User.objects.create_user(
+                username=f'authbench-{i}', email=f'authbench-{i}@example.com', password=None,
+            ))
+        return [Token.objects.get_or_create(user=user)[0].key for user in users]
+
+    def measure(self, authentication, requests):
+        timings = []
+        with CaptureQueriesContext(connection) as ctx:
+            for django_request in requests:
+                request = Request(django_request, authenticators=[authentication])
+                start = time.perf_counter()
+                request.user
+                timings.append((time.perf_counter() - start) * 1_000_000)
+        timings.sort()
+        return {
+            'requests': len(requests),
+            'queries': len(ctx.captured_queries),
+            'queries_per_request': round(len(ctx.captured_queries) / len(requests), 3),
+            'p50_us': round(statistics.median(timings), 1),
+            'p95_us': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 1),
+        }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.users.proximity import load_adjacency, rebuild_block_distances
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the block-to-block distance table used by the nearby tools feed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--adjacency',
+            help='CSV of neighbouring block pairs; defaults to settings.BLOCK_ADJACENCY_FILE, '
+                 'else blocks are treated as a row in natural order',
+        )
+
+    def handle(self, *args, **options):
+        edges = load_adjacency(options['adjacency']) if options['adjacency'] else None
+        rows = rebuild_block_distances(edges)
+        self.stdout.write(self.style.SUCCESS(f'Stored {rows} block distances'))
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-17 20:46
+
+import re
+
+from django.db import migrations, models
+
+
+def natural_key(block):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', block.strip().upper())]
+
+
+def populate_distances(apps, schema_editor):
+    # Seed the table for existing users with the default row-of-blocks layout.
+    # A frozen copy of apps.users.proximity at the time, not an import of it.
+    CustomUser = apps.get_model('users', 'CustomUser')
+    BlockDistance = apps.get_model('users', 'BlockDistance')
+    blocks = sorted(set(CustomUser.objects.exclude(block_no='').values_list('block_no', flat=True)), key=natural_key)
+    BlockDistance.objects.bulk_create(
+        [
+            BlockDistance(from_block=a, to_block=b, distance=abs(i - j))
+            for i, a in enumerate(blocks)
+            for j, b in enumerate(blocks)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='block_no',
+            field=models.CharField(blank=True, db_index=True, max_length=10),
+        ),
+        migrations.CreateModel(
+            name='BlockDistance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_block', models.CharField(max_length=10)),
+                ('to_block', models.CharField(max_length=10)),
+                ('distance', models.PositiveIntegerField()),
+            ],
+            options={
+                'verbose_name': 'Block Distance',
+                'verbose_name_plural': 'Block Distances',
+                'indexes': [models.Index(fields=['from_block', 'to_block', 'distance'], name='block_distance_lookup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='blockdistance',
+            constraint=models.UniqueConstraint(fields=('from_block', 'to_block'), name='unique_block_pair'),
+        ),
+        migrations.RunPython(populate_distances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_block_distances'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blockdistance',
+            name='block_distance_lookup_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blockdistance',
+            index=models.Index(fields=['from_block', 'distance', 'to_block'], name='block_distance_rank_idx'),
+        ),
+    ]
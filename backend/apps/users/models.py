@@ -1,11 +1,12 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from . import passwords
 
 
 class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
     phone = models.CharField(max_length=15, blank=True)
-    block_no = models.CharField(max_length=10, blank=True)
+    block_no = models.CharField(max_length=10, blank=True, db_index=True)
     house_no = models.CharField(max_length=10, blank=True)
     
     USERNAME_FIELD = 'email'
@@ -14,6 +15,46 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.email
     
+    def set_password(self, raw_password):
+        # Hash in the password pool rather than on the request thread
+        self.password = passwords.make_password(raw_password)
+        self._password = raw_password
+    
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            # Rehash with the current hasher settings
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+        
+        return passwords.check_password(raw_password, self.password, setter)
+    
     class Meta:
         verbose_name = 'User'
-        verbose_name_plural = 'Users'
\ No newline at end of file
+        verbose_name_plural = 'Users'
+
+
+class BlockDistance(models.Model):
+    """
+    Precomputed walking distance (in blocks) between two blocks of the estate.
+
+    Maintained by apps.users.proximity; rebuild with
+    `manage.py build_block_distances`.
+    """
+    from_block = models.CharField(max_length=10)
+    to_block = models.CharField(max_length=10)
+    distance = models.PositiveIntegerField()
+    
+    def __str__(self):
+        return f"{self.from_block} -> {self.to_block}: {self.distance}"
+    
+    class Meta:
+        verbose_name = 'Block Distance'
+        verbose_name_plural = 'Block Distances'
+        constraints = [
+            models.UniqueConstraint(fields=['from_block', 'to_block'], name='unique_block_pair'),
+        ]
+        indexes = [
+            # Covers walking the blocks around one block in distance order
+            models.Index(fields=['from_block', 'distance', 'to_block'], name='block_distance_rank_idx'),
+        ]
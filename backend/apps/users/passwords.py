@@ -0,0 +1,107 @@
+"""
+Password hashing off the request threads.
+
+Hashing a password is deliberately slow and CPU-bound, so a burst of logins
+would otherwise occupy every worker. make_password() and check_password()
+run Django's hashers in a small process pool (PASSWORD_HASH_WORKERS
+processes, 0 hashes inline) and bound how many hashes may be queued; a
+request that can't get a slot within PASSWORD_HASH_WAIT seconds fails with
+503 instead of piling up.
+
+The tuned hashers below read their cost parameters from settings. Raising
+them (or switching PASSWORD_HASHER) makes must_update() true for existing
+hashes, and they're re-encoded transparently on the user's next login.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PasswordHashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, please try again shortly.'
+    default_code = 'password_hashing_busy'
+
+
+class TunedScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = getattr(settings, 'SCRYPT_WORK_FACTOR', 2**14)
+    block_size = getattr(settings, 'SCRYPT_BLOCK_SIZE', 8)
+    parallelism = getattr(settings, 'SCRYPT_PARALLELISM', 1)
+    # hashlib.scrypt refuses more than 32MiB by default
+    maxmem = 256 * work_factor * block_size + 1024 * 1024
+
+
+class TunedArgon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Needs the argon2-cffi package"""
+    time_cost = getattr(settings, 'ARGON2_TIME_COST', 2)
+    memory_cost = getattr(settings, 'ARGON2_MEMORY_COST', 65536)
+    parallelism = getattr(settings, 'ARGON2_PARALLELISM', 1)
+
+
+def _init_worker(settings_module):
+    # Workers start from a fresh interpreter, not a fork of a threaded server
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup(set_prefix=False)
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'PASSWORD_HASH_WORKERS', 2)
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('forkserver'),
+                initializer=_init_worker,
+                initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'toolshare.settings'),),
+            )
+            _slots = threading.BoundedSemaphore(workers * getattr(settings, 'PASSWORD_HASH_QUEUE', 4))
+    return _pool, _slots
+
+
+def _run(func, *args):
+    if getattr(settings, 'PASSWORD_HASH_WORKERS', 2) <= 0:
+        return func(*args)
+    pool, slots = _get_pool()
+    if not slots.acquire(timeout=getattr(settings, 'PASSWORD_HASH_WAIT', 5)):
+        raise PasswordHashingBusy()
+    try:
+        return pool.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def make_password(password):
+    if password is None:
+        # Unusable passwords involve no hashing
+        return hashers.make_password(None)
+    return _run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """hashers.check_password with the verification done in the pool"""
+    if password is None or not hashers.is_password_usable(encoded):
+        return False
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = hashers.get_hasher('default')
+    must_update = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+    is_correct = _run(hashers.check_password, password, encoded)
+    if setter and is_correct and must_update:
+        setter(password)
+    return is_correct
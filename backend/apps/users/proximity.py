@@ -0,0 +1,97 @@
+"""
+Block-to-block distances for the proximity-ranked tool feed.
+
+Without an explicit layout, blocks are assumed to sit along a street in
+natural order ("2" < "10", "A" < "B"), so the distance between two blocks is
+how many blocks apart they are in that order. An estate with a different
+layout can supply an adjacency list (pairs of neighbouring blocks); distances
+are then shortest-path hop counts, read from settings.BLOCK_ADJACENCY_FILE
+(one "block,block" pair per line) when that is set.
+"""
+import csv
+import re
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import BlockDistance, CustomUser
+
+# Distance used when either block is unknown, so those tools sort last
+UNKNOWN_DISTANCE = 1_000_000
+
+
+def natural_key(block):
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', block.strip().upper())]
+
+
+def known_blocks():
+    blocks = CustomUser.objects.exclude(block_no='').values_list('block_no', flat=True).distinct()
+    return sorted(set(blocks), key=natural_key)
+
+
+def linear_distances(blocks):
+    position = {block: index for index, block in enumerate(blocks)}
+    return {
+        (a, b): abs(position[a] - position[b])
+        for a in blocks
+        for b in blocks
+    }
+
+
+def adjacency_distances(blocks, edges):
+    graph = defaultdict(set)
+    for a, b in edges:
+        graph[a].add(b)
+        graph[b].add(a)
+    blocks = sorted(set(blocks) | set(graph), key=natural_key)
+
+    distances = {}
+    for start in blocks:
+        seen = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            for neighbour in graph[current]:
+                if neighbour not in seen:
+                    seen[neighbour] = seen[current] + 1
+                    queue.append(neighbour)
+        for end, hops in seen.items():
+            distances[(start, end)] = hops
+    return distances
+
+
+def load_adjacency(path):
+    with open(path, newline='') as fh:
+        return [
+            (row[0].strip(), row[1].strip())
+            for row in csv.reader(fh)
+            if len(row) >= 2 and row[0].strip() and not row[0].startswith('#')
+        ]
+
+
+@transaction.atomic
+def rebuild_block_distances(edges=None):
+    if edges is None and getattr(settings, 'BLOCK_ADJACENCY_FILE', None):
+        edges = load_adjacency(settings.BLOCK_ADJACENCY_FILE)
+    blocks = known_blocks()
+    distances = adjacency_distances(blocks, edges) if edges else linear_distances(blocks)
+    BlockDistance.objects.all().delete()
+    BlockDistance.objects.bulk_create(
+        [BlockDistance(from_block=a, to_block=b, distance=d) for (a, b), d in distances.items()],
+        batch_size=1000,
+    )
+    return len(distances)
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Not for fixture loads: run build_block_distances once they are in
+    if raw or (update_fields is not None and 'block_no' not in update_fields):
+        return
+    # A new block only appears occasionally; recompute the (small) table then
+    block = instance.block_no
+    if block and not BlockDistance.objects.filter(from_block=block, to_block=block).exists():
+        transaction.on_commit(lambda: rebuild_block_distances())
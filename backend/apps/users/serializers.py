@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from toolshare.sparse import ValuesSerializer
 from .models import CustomUser
 
 
@@ -47,4 +48,10 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = CustomUser
         fields = ('id', 'username', 'email', 'phone', 'block_no', 'house_no', 'date_joined')
-        read_only_fields = ('id', 'date_joined')
\ No newline at end of file
+        read_only_fields = ('id', 'date_joined')
+
+
+class UserValuesSerializer(ValuesSerializer):
+    """UserSerializer's output from values() rows"""
+    fields = UserSerializer.Meta.fields
+    datetime_fields = ('date_joined',)
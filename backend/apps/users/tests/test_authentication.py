@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APITestCase
+
+from apps.users.authentication import (
+    CachingTokenAuthentication, TokenCache, _generation_key, _token_cache,
+)
+
+
+class CachingTokenAuthenticationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+
+    def setUp(self):
+        cache.clear()
+        _token_cache.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def get_user_info(self, client=None):
+        return (client or self.client).get('/api/auth/user/').status_code
+
+    def test_repeat_lookups_come_from_the_cache(self):
+        auth = CachingTokenAuthentication()
+        user, _ = auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            cached_user, _ = auth.authenticate_credentials(self.token.key)
+        self.assertEqual(cached_user.pk, user.pk)
+        # Each request gets its own copy of the cached user
+        self.assertIsNot(cached_user, auth.authenticate_credentials(self.token.key)[0])
+
+    def test_logout_revokes_the_token_at_once(self):
+        self.assertEqual(self.get_user_info(), 200)
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(self.get_user_info(), 401)
+
+    def test_rotation_revokes_the_old_token_at_once(self):
+        self.assertEqual(self.get_user_info(), 200)
+        new_key = self.client.post('/api/auth/token/rotate/').data['token']
+        self.assertEqual(self.get_user_info(), 401)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {new_key}')
+        self.assertEqual(self.get_user_info(client), 200)
+
+    def test_account_changes_are_seen_at_once(self):
+        self.assertEqual(self.get_user_info(), 200)
+        self.user.set_password('a new password')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.get_user_info(), 401)
+
+    def test_last_login_updates_keep_the_cached_entry(self):
+        self.assertEqual(self.get_user_info(), 200)
+        self.user.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            CachingTokenAuthentication().authenticate_credentials(self.token.key)
+
+    def test_generation_bumped_by_another_process_drops_the_entry(self):
+        auth = CachingTokenAuthentication()
+        auth.authenticate_credentials(self.token.key)
+        # Only the shared cache changes, as when another worker logs the user out
+        cache.set(_generation_key(self.user.pk), 1, None)
+        with self.assertNumQueries(1):
+            auth.authenticate_credentials(self.token.key)
+
+
+class TokenCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.users = [User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com') for i in range(3)]
+        cls.tokens = [Token.objects.create(user=user) for user in cls.users]
+
+    def test_is_bounded_and_evicts_least_recently_used(self):
+        token_cache = TokenCache(maxsize=2, ttl=60)
+        first, second, third = self.tokens
+        token_cache.set(first.key, first.user, first, 0)
+        token_cache.set(second.key, second.user, second, 0)
+        token_cache.get(first.key)
+        token_cache.set(third.key, third.user, third, 0)
+
+        self.assertEqual(len(token_cache._entries), 2)
+        self.assertIsNone(token_cache.get(second.key))
+        self.assertIsNotNone(token_cache.get(first.key))
+        self.assertIsNotNone(token_cache.get(third.key))
+
+    def test_entries_expire(self):
+        token_cache = TokenCache(maxsize=2, ttl=0)
+        token = self.tokens[0]
+        token_cache.set(token.key, token.user, token, 0)
+        self.assertIsNone(token_cache.get(token.key))
+
+    def test_discard_user(self):
+        token_cache = TokenCache(maxsize=4, ttl=60)
+        for token in self.tokens:
+            token_cache.set(token.key, token.user, token, 0)
+        token_cache.discard_user(self.users[0].pk)
+        self.assertEqual(
+            [token.key for token in self.tokens if token_cache.get(token.key)],
+            [token.key for token in self.tokens[1:]],
+        )
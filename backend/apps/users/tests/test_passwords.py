@@ -0,0 +1,97 @@
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model, hashers
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework.throttling import SimpleRateThrottle
+
+from apps.users import passwords
+
+PASSWORD = 'correct horse battery'
+
+
+class LoginHasherTests(APITestCase):
+    """Logins verify in the hashing pool, whatever hasher made the stored hash"""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_user(self, encoded):
+        user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        get_user_model().objects.filter(pk=user.pk).update(password=encoded)
+        return user
+
+    def login(self, password=PASSWORD):
+        return self.client.post('/api/auth/login/', {'email': 'owner@example.com', 'password': password}, format='json')
+
+    def stored_algorithm(self, user):
+        user.refresh_from_db()
+        return hashers.identify_hasher(user.password).algorithm
+
+    def test_scrypt_hashes_verify_in_the_pool(self):
+        user = self.create_user(passwords.make_password(PASSWORD))
+        self.assertEqual(self.stored_algorithm(user), 'scrypt')
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(self.login('wrong password').status_code, 400)
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_scrypt_hashes_verify_inline(self):
+        self.create_user(passwords.make_password(PASSWORD))
+        self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_legacy_hashes_verify_and_are_upgraded(self):
+        for hasher in ('pbkdf2_sha256', 'pbkdf2_sha1'):
+            with self.subTest(hasher=hasher):
+                get_user_model().objects.all().delete()
+                user = self.create_user(hashers.make_password(PASSWORD, hasher=hasher))
+                self.assertEqual(self.login().status_code, 200)
+                self.assertEqual(self.stored_algorithm(user), 'scrypt')
+                self.assertEqual(self.login().status_code, 200)
+
+    @override_settings(PASSWORD_HASH_WORKERS=0)
+    def test_legacy_hashes_are_kept_on_a_wrong_password(self):
+        user = self.create_user(hashers.make_password(PASSWORD, hasher='pbkdf2_sha1'))
+        self.assertEqual(self.login('wrong password').status_code, 400)
+        self.assertEqual(self.stored_algorithm(user), 'pbkdf2_sha1')
+
+    @override_settings(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_WAIT=0)
+    def test_full_queue_is_a_503(self):
+        self.create_user(passwords.make_password(PASSWORD))
+        no_slots = threading.BoundedSemaphore(1)
+        no_slots.acquire()
+        with mock.patch.object(passwords, '_get_pool', return_value=(None, no_slots)):
+            response = self.login()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['detail'].code, 'password_hashing_busy')
+
+
+@mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {'signup': '2/hour', 'login': '3/min', 'login_email': '2/min'})
+class AuthThrottleTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def login(self, email, address):
+        return self.client.post(
+            '/api/auth/login/', {'email': email, 'password': 'wrong password'},
+            format='json', REMOTE_ADDR=address,
+        ).status_code
+
+    def test_login_is_throttled_per_address(self):
+        codes = [self.login(f'user{i}@example.com', '10.0.0.1') for i in range(4)]
+        self.assertEqual(codes, [400, 400, 400, 429])
+        self.assertEqual(self.login('other@example.com', '10.0.0.2'), 400)
+
+    def test_login_is_throttled_per_account(self):
+        codes = [self.login('Owner@Example.com ', f'10.0.0.{i}') for i in range(3)]
+        self.assertEqual(codes, [400, 400, 429])
+        self.assertEqual(self.login('other@example.com', '10.0.0.9'), 400)
+
+    def test_signup_is_throttled_per_address(self):
+        codes = [
+            self.client.post('/api/auth/signup/', {}, format='json', REMOTE_ADDR='10.0.0.1').status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(codes, [400, 400, 429])
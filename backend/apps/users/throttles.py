@@ -0,0 +1,26 @@
+"""
+Throttles for the unauthenticated auth endpoints. Counters live in the
+default cache, so use a shared cache backend to throttle across processes.
+"""
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle
+
+
+class SignupRateThrottle(AnonRateThrottle):
+    """Per client IP"""
+    scope = 'signup'
+
+
+class LoginRateThrottle(AnonRateThrottle):
+    """Per client IP"""
+    scope = 'login'
+
+
+class LoginEmailRateThrottle(SimpleRateThrottle):
+    """Per target account, however many addresses the attempts come from"""
+    scope = 'login_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not email:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': str(email).strip().lower()}
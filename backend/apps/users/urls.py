@@ -5,5 +5,6 @@ urlpatterns = [
     path('signup/', views.signup, name='signup'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
+    path('token/rotate/', views.rotate_token_view, name='rotate_token'),
     path('user/', views.user_info, name='user_info'),
 ]
\ No newline at end of file
@@ -1,14 +1,17 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import login, logout
+from .authentication import get_fresh_token, invalidate_user, rotate_token
+from .throttles import LoginEmailRateThrottle, LoginRateThrottle, SignupRateThrottle
 from .serializers import UserRegistrationSerializer, UserLoginSerializer, UserSerializer
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([SignupRateThrottle])
 def signup(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
@@ -24,12 +27,13 @@ def signup(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle, LoginEmailRateThrottle])
 def login_view(request):
     serializer = UserLoginSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.validated_data['user']
         login(request, user)
-        token, created = Token.objects.get_or_create(user=user)
+        token = get_fresh_token(user)
         return Response({
             'user': UserSerializer(user).data,
             'token': token.key,
@@ -44,10 +48,18 @@ def logout_view(request):
         request.user.auth_token.delete()
     except:
         pass
+    # Drop cached lookups even if the token was already gone
+    invalidate_user(request.user.pk)
     logout(request)
     return Response({'message': 'Logout successful'}, status=status.HTTP_200_OK)
 
 
+@api_view(['POST'])
+def rotate_token_view(request):
+    token = rotate_token(request.user)
+    return Response({'token': token.key}, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 def user_info(request):
     serializer = UserSerializer(request.user)
@@ -0,0 +1,15 @@
+"""
+ASGI config for toolshare project.
+
+Serve with any ASGI server, e.g. `uvicorn toolshare.asgi:application`.
+The read-heavy endpoints switch to their async views under ASGI.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'toolshare.settings')
+os.environ.setdefault('ASYNC_API_VIEWS', 'True')
+
+application = get_asgi_application()
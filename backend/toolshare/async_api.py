@@ -0,0 +1,86 @@
+"""
+Minimal async counterpart of DRF's @api_view for the read-heavy endpoints.
+
+DRF views are sync-only, so under ASGI these views authenticate with the
+configured DRF authentication classes, run their queries with Django's async
+ORM and render with DRF's JSON renderer. Anything else (writes, uploads) is
+handed to the regular sync view.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .renderers import dumps
+
+
+def render_json(data, status_code=status.HTTP_200_OK):
+    return HttpResponse(
+        dumps(data),
+        status=status_code,
+        content_type='application/json',
+    )
+
+
+def _authenticate(request):
+    # Touching .user runs the authenticators (and the CSRF check for sessions)
+    return request.user
+
+
+def _unauthorized(request, data):
+    response = render_json(data, status.HTTP_401_UNAUTHORIZED)
+    # Same rule as APIView.get_authenticate_header: the first authenticator decides
+    header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+    if header:
+        response['WWW-Authenticate'] = header
+    return response
+
+
+def _error(exc):
+    # Same body and headers as rest_framework.views.exception_handler, so a
+    # ValidationError keeps its {"field": [...]} shape
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    response = render_json(data, exc.status_code)
+    if getattr(exc, 'wait', None):
+        response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+def async_api_view(methods=('GET',), sync_view=None):
+    """
+    Serve `methods` with the decorated coroutine and delegate any other
+    method to `sync_view` (a DRF view) in a worker thread.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                if sync_view is not None:
+                    return await sync_to_async(sync_view)(request, *args, **kwargs)
+                return render_json(
+                    {'detail': f'Method "{request.method}" not allowed.'},
+                    status.HTTP_405_METHOD_NOT_ALLOWED,
+                )
+
+            drf_request = Request(
+                request,
+                authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+            )
+            try:
+                user = await sync_to_async(_authenticate)(drf_request)
+                if not user or not user.is_authenticated:
+                    return _unauthorized(drf_request, {'detail': 'Authentication credentials were not provided.'})
+                return await view(drf_request, *args, **kwargs)
+            except (AuthenticationFailed, NotAuthenticated) as exc:
+                return _unauthorized(drf_request, {'detail': exc.detail})
+            except APIException as exc:
+                return _error(exc)
+
+        # csrf_exempt() only learned to wrap coroutines in Django 5.0
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
@@ -0,0 +1,156 @@
+"""
+Negotiated gzip/brotli compression of API responses.
+
+CompressionMiddleware picks the best coding the client accepts (br when the
+brotli package is installed, else gzip, honouring q-values). It compresses
+text-like responses of at least COMPRESSION_MIN_SIZE bytes and keeps the
+result only if it is smaller.
+
+Streaming responses (the CSV/NDJSON exports) are compressed as they stream,
+sync or async, so memory stays bounded. Some responses are left alone:
+- Server-Sent Events, which must reach the client event by event
+- responses that are already encoded, e.g. precompressed static files
+- partial content
+- FileResponses, which are sent with sendfile
+- paths in COMPRESSION_EXCLUDE_PATHS
+
+The auth endpoints are excluded by default: their bodies carry tokens next to
+client-supplied input, the setup BREACH-style attacks rely on.
+"""
+import gzip
+import zlib
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/x-ndjson', 'application/javascript',
+    'application/xml', 'image/svg+xml',
+)
+NEVER_COMPRESSED_TYPES = ('text/event-stream',)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None; br wins ties since it compresses JSON better"""
+    accepted = accepted_encodings(header)
+    best, best_q = None, 0.0
+    for coding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(encoding, data):
+    if encoding == 'br':
+        return brotli.compress(data, quality=_setting('COMPRESSION_BROTLI_QUALITY', 5))
+    return gzip.compress(data, compresslevel=_setting('COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=_setting('COMPRESSION_BROTLI_QUALITY', 5))
+            self.compress, self.flush = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(
+                _setting('COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+            self.compress, self.flush = compressor.compress, compressor.flush
+
+
+def compress_stream(encoding, chunks):
+    compressor = _StreamCompressor(encoding)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+async def acompress_stream(encoding, chunks):
+    compressor = _StreamCompressor(encoding)
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if not self.compressible(request, response):
+            return response
+        if not response.streaming and len(response.content) < _setting('COMPRESSION_MIN_SIZE', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = acompress_stream(encoding, response.streaming_content)
+            else:
+                response.streaming_content = compress_stream(encoding, response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = compress(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # The bytes differ from the identity representation now
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def compressible(request, response):
+        if response.status_code in (204, 206, 304) or response.has_header('Content-Encoding'):
+            return False
+        if isinstance(response, FileResponse):
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        if request.path.startswith(tuple(_setting('COMPRESSION_EXCLUDE_PATHS', ()))):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type.startswith(NEVER_COMPRESSED_TYPES):
+            return False
+        return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -0,0 +1,189 @@
+"""
+Static and media file serving for deployments without a separate web server
+in front.
+
+Files are returned as FileResponse objects, so WSGI servers that provide
+wsgi.file_wrapper (gunicorn, uWSGI) send them with sendfile() instead of
+copying them through Python. When a proxy that understands X-Accel-Redirect
+(nginx) or X-Sendfile is in front, set MEDIA_SENDFILE_HEADER and the proxy
+sends the file instead. Responses carry ETag/Last-Modified, answer
+conditional GETs with 304, and support single byte ranges.
+"""
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .compression import accepted_encodings
+from .storage import IMMUTABLE_CACHE_CONTROL
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Names ManifestStaticFilesStorage gave a content hash, e.g. app.3f2a9c1b7d4e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+# Precompressed siblings written by CompressedManifestStaticFilesStorage
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+DEFAULT_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(st, encoding=None):
+    """Validator of the file; each precompressed encoding is a different representation"""
+    if encoding:
+        return f'"{st.st_size:x}-{st.st_mtime_ns:x}-{encoding}"'
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404('File not found')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('File not found')
+    return st
+
+
+def _parse_range(header, size):
+    """(start, end) inclusive for a single satisfiable range, None to ignore the header"""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start > end:
+        return False
+    return start, end
+
+
+def _range_content(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _pick_encoding(request, path):
+    """The best accepted encoding with a precompressed sibling; br wins ties"""
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    best, best_q = None, 0.0
+    for encoding, suffix in ENCODINGS:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > best_q and os.path.isfile(path + suffix):
+            best, best_q = (encoding, path + suffix), q
+    return best or (None, path)
+
+
+def _sendfile_response(path, relative_path):
+    header = getattr(settings, 'MEDIA_SENDFILE_HEADER', '')
+    response = HttpResponse()
+    if header.lower() == 'x-accel-redirect':
+        # nginx maps this internal location back onto document_root
+        prefix = getattr(settings, 'MEDIA_SENDFILE_PREFIX', '/protected/')
+        response[header] = prefix + relative_path
+    else:
+        response[header] = path
+    del response['Content-Type']
+    return response
+
+
+def serve_file(request, relative_path, document_root, cache_control=DEFAULT_CACHE_CONTROL, precompressed=False):
+    try:
+        path = safe_join(document_root, relative_path)
+    except SuspiciousFileOperation:
+        raise Http404('File not found')
+    st = _stat(path)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    # Ranges are always served from the identity file
+    if precompressed and not request.META.get('HTTP_RANGE'):
+        encoding, send_path = _pick_encoding(request, path)
+    else:
+        encoding, send_path = None, path
+    etag = file_etag(st, encoding)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(st.st_mtime))
+    if not_modified is not None:
+        if isinstance(not_modified, HttpResponseNotModified):
+            not_modified['Cache-Control'] = cache_control
+            if precompressed:
+                patch_vary_headers(not_modified, ('Accept-Encoding',))
+        return not_modified
+
+    if getattr(settings, 'MEDIA_SENDFILE_HEADER', ''):
+        # The proxy handles ranges and the transfer itself
+        response = _sendfile_response(send_path, relative_path + send_path[len(path):])
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if precompressed:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(st.st_mtime)
+        response['Cache-Control'] = cache_control
+        return response
+
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and request.META.get('HTTP_IF_RANGE'):
+        # Only honour the range if the client's copy is still current
+        if_range = request.META['HTTP_IF_RANGE']
+        if if_range != etag and parse_http_date_safe(if_range) != int(st.st_mtime):
+            range_header = None
+    byte_range = _parse_range(range_header, st.st_size) if range_header else None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{st.st_size}'
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _range_content(path, start, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{st.st_size}'
+        response['Content-Length'] = end - start + 1
+    else:
+        response = FileResponse(open(send_path, 'rb'), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+
+    if precompressed:
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = cache_control
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    return serve_file(request, path, settings.MEDIA_ROOT)
+
+
+@require_safe
+def serve_blob(request, path):
+    """Serve a content-addressed blob; its name changes whenever its bytes do"""
+    return serve_file(request, f'blobs/{path}', settings.MEDIA_ROOT, cache_control=IMMUTABLE_CACHE_CONTROL)
+
+
+@require_safe
+def serve_static(request, path):
+    """Serve collected static files, preferring precompressed .br/.gz siblings"""
+    cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.search(path) else DEFAULT_CACHE_CONTROL
+    return serve_file(request, path, settings.STATIC_ROOT, cache_control=cache_control, precompressed=True)
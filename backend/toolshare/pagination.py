@@ -0,0 +1,197 @@
+"""
+Shared pagination helpers for the tool and request feeds.
+"""
+import base64
+import binascii
+
+from django.core.paginator import InvalidPage, Page
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset pagination on (created_at, id).
+
+    The cursor holds the last row seen, so each page is a range scan on the
+    (created_at, id) indexes instead of COUNT(*) plus OFFSET.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        rows = list(self._page_queryset(queryset, request))
+        return self._set_page(rows)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        rows = [obj async for obj in self._page_queryset(queryset, request)]
+        return self._set_page(rows)
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = self.after(queryset, *position)
+        return queryset.order_by('-created_at', '-pk')[:self.page_size + 1]
+
+    @staticmethod
+    def after(queryset, created_at, pk):
+        return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+    def _set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii')
+            return self.parse_position(raw)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_position(self, raw):
+        timestamp, pk = raw.rsplit('|', 1)
+        created_at = parse_datetime(timestamp)
+        if created_at is None:
+            raise ValueError(timestamp)
+        return created_at, int(pk)
+
+    def format_position(self, obj):
+        if isinstance(obj, dict):
+            # A values() row (see toolshare.sparse)
+            created_at, pk = obj['created_at'], obj['id']
+        else:
+            created_at, pk = obj.created_at, obj.pk
+        return f'{created_at.isoformat()}|{pk}'
+
+    def encode_cursor(self, obj):
+        raw = self.format_position(obj)
+        return base64.urlsafe_b64encode(raw.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class IdKeysetPagination(KeysetPagination):
+    """
+    KeysetPagination on one increasing id column, newest (highest) first.
+    For querysets the database can walk in id order, like search matches
+    joined to their index (see apps.tools.search); the cursor holds the id.
+    """
+
+    def __init__(self, key='pk'):
+        self.key = key
+
+    def _page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(**{f'{self.key}__lt': position})
+        return queryset.order_by(f'-{self.key}')[:self.page_size + 1]
+
+    def parse_position(self, raw):
+        return int(raw)
+
+    def format_position(self, obj):
+        return str(obj['id'] if isinstance(obj, dict) else obj.pk)
+
+
+class GroupedKeysetPagination(KeysetPagination):
+    """
+    KeysetPagination across querysets walked in rank order, e.g. tools
+    grouped by their owner's distance. Each group is paged newest first; the
+    cursor also holds the group's rank, so a page only queries the groups it
+    reaches.
+    """
+
+    def paginate_groups(self, groups, request):
+        """groups: (rank, queryset) pairs, lowest rank first"""
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        ranked = []
+        for rank, queryset in groups:
+            if position is not None:
+                if rank < position[0]:
+                    continue
+                if rank == position[0]:
+                    queryset = self.after(queryset, *position[1:])
+            wanted = self.page_size + 1 - len(ranked)
+            ranked += [(rank, row) for row in queryset.order_by('-created_at', '-pk')[:wanted]]
+            if len(ranked) > self.page_size:
+                break
+        self.ranks = [rank for rank, _ in ranked]
+        return self._set_page([row for _, row in ranked])
+
+    def parse_position(self, raw):
+        rank, rest = raw.split('|', 1)
+        return (int(rank), *super().parse_position(rest))
+
+    def format_position(self, obj):
+        rank = self.ranks[self.page.index(obj)]
+        return f'{rank}|{super().format_position(obj)}'
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """PageNumberPagination that can also page a queryset with the async ORM"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+
+        bottom = (number - 1) * page_size
+        results = [obj async for obj in queryset[bottom:bottom + page_size]]
+        self.page = Page(results, number, paginator)
+        return results
+
+
+def wants_cursor(request):
+    """Clients opt into keyset pagination with ?pagination=cursor or a cursor"""
+    params = request.query_params
+    return params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params
@@ -0,0 +1,343 @@
+"""
+Opt-in per-request profiling (PROFILING_ENABLED).
+
+ProfilingMiddleware measures, for every request:
+- SQL query count and time, recorded by an execute wrapper on each database
+  connection (the hook behind connection.execute_wrapper())
+- time spent building serializer.data, or the output of code that doesn't
+  go through it (toolshare.sparse) and marks itself with serializing()
+- time spent rendering the response
+- total latency
+
+It reports them to the client in a Server-Timing header and aggregates them
+in in-memory histograms per view. GET /metrics exports those histograms in
+the Prometheus text format; histogram_quantile() turns them into
+percentiles. Queries slower than SLOW_QUERY_MS are logged to the
+'toolshare.slow_queries' logger.
+
+Streaming bodies are profiled while they are sent, and their request is
+recorded when the stream ends. Their Server-Timing header only covers the
+work done before the first byte. Server-Sent Events streams never end, so
+they are recorded when the response starts.
+
+The histograms are per process. With several workers, scrape each one, or
+read the Server-Timing headers.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger('toolshare.slow_queries')
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def slow_query_seconds():
+    return getattr(settings, 'SLOW_QUERY_MS', 100) / 1000
+
+
+class RequestProfile:
+    def __init__(self, request):
+        self.request = request
+        self.queries = 0
+        self.db_time = 0.0
+        self.slow_queries = 0
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.render_time = 0.0
+        self.render_started = None
+
+    @property
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match else 'unresolved'
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        profile.queries += 1
+        profile.db_time += elapsed
+        if elapsed >= slow_query_seconds() > 0:
+            profile.slow_queries += 1
+            logger.warning(
+                'Slow query (%.1f ms on %s) in %s: %s',
+                elapsed * 1000, context['connection'].alias, profile.view_name, sql,
+            )
+
+
+def _install(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def instrument_connection(sender, connection, **kwargs):
+    # Connections are per thread (and sync_to_async threads for async views),
+    # so the wrapper lives on every connection and only records while a
+    # profiled request is current in the context
+    _install(connection)
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serializer time of the current request"""
+    profile = _current.get()
+    if profile is None or profile.serializing:
+        yield
+        return
+    profile.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.serializing = False
+        profile.serialize_time += time.perf_counter() - start
+
+
+def _instrument_serializers():
+    """Time the outermost serializer.data of each request"""
+    original = BaseSerializer.data.fget
+    if getattr(original, 'profiled', False):
+        return
+
+    def data(self):
+        with serializing():
+            return original(self)
+
+    data.profiled = True
+    BaseSerializer.data = property(data)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, **extra):
+    pairs = [*zip(names, values), *extra.items()]
+    return '{%s}' % ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} counter'
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f'{self.name}{_labels(self.labelnames, labels)} {value}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    def __init__(self, name, help_text, labelnames, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket..., count in +Inf, sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def expose(self):
+        yield f'# HELP {self.name} {self.help_text}'
+        yield f'# TYPE {self.name} histogram'
+        with self._lock:
+            all_series = sorted((labels, list(series)) for labels, series in self._series.items())
+        for labels, series in all_series:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], series):
+                cumulative += count
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le=bound)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]:.6f}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+REQUESTS = Counter('toolshare_requests_total', 'Requests handled', ('view', 'method', 'status'))
+SLOW_QUERIES = Counter('toolshare_slow_queries_total', 'Queries slower than SLOW_QUERY_MS', ('view',))
+LATENCY = Histogram(
+    'toolshare_request_duration_seconds', 'Total request latency', ('view', 'method'), SECONDS_BUCKETS
+)
+DB_TIME = Histogram('toolshare_request_db_seconds', 'SQL time per request', ('view',), SECONDS_BUCKETS)
+QUERIES = Histogram('toolshare_request_queries', 'SQL queries per request', ('view',), QUERY_BUCKETS)
+SERIALIZE_TIME = Histogram(
+    'toolshare_request_serialize_seconds', 'Serializer time per request', ('view',), SECONDS_BUCKETS
+)
+RENDER_TIME = Histogram(
+    'toolshare_request_render_seconds', 'Response rendering time per request', ('view',), SECONDS_BUCKETS
+)
+METRICS = (REQUESTS, SLOW_QUERIES, LATENCY, DB_TIME, QUERIES, SERIALIZE_TIME, RENDER_TIME)
+
+
+class ProfilingMiddleware:
+    """Put first in MIDDLEWARE so the total covers the whole stack"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        _instrument_serializers()
+        # Connected here, not at import: toolshare.sparse imports this module
+        # whether or not profiling is enabled
+        connection_created.connect(instrument_connection, dispatch_uid='toolshare.profiling')
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(profile, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(profile, response, time.perf_counter() - start)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns
+        profile = _current.get()
+        if profile is not None:
+            profile.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self._rendered(profile))
+        return response
+
+    @staticmethod
+    def _rendered(profile):
+        profile.render_time += time.perf_counter() - profile.render_started
+
+    def finish(self, profile, response, total):
+        """Add Server-Timing and record the request, or wrap a streaming body to record it at the end"""
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={profile.db_time * 1000:.1f};desc="{profile.queries} queries"',
+            f'serialize;dur={profile.serialize_time * 1000:.1f}',
+            f'render;dur={profile.render_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+        if response.streaming and not response.get('Content-Type', '').startswith('text/event-stream'):
+            started = time.perf_counter() - total
+            wrap = self._profile_astream if response.is_async else self._profile_stream
+            response.streaming_content = wrap(
+                profile, response.streaming_content,
+                lambda: self.record(profile, response, time.perf_counter() - started),
+            )
+        else:
+            self.record(profile, response, total)
+        return response
+
+    @staticmethod
+    def _profile_stream(profile, content, record):
+        # Make the profile current again while each chunk is produced, so
+        # the body's queries and serialization count towards the request
+        iterator = iter(content)
+        try:
+            while True:
+                token = _current.set(profile)
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        finally:
+            record()
+
+    @staticmethod
+    async def _profile_astream(profile, content, record):
+        iterator = aiter(content)
+        try:
+            while True:
+                token = _current.set(profile)
+                try:
+                    chunk = await anext(iterator)
+                except StopAsyncIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        finally:
+            record()
+
+    @staticmethod
+    def record(profile, response, total):
+        view = profile.view_name
+        if view == 'metrics':
+            return
+        REQUESTS.inc((view, profile.request.method, str(response.status_code)))
+        if profile.slow_queries:
+            SLOW_QUERIES.inc((view,), profile.slow_queries)
+        LATENCY.observe((view, profile.request.method), total)
+        DB_TIME.observe((view,), profile.db_time)
+        QUERIES.observe((view,), profile.queries)
+        SERIALIZE_TIME.observe((view,), profile.serialize_time)
+        RENDER_TIME.observe((view,), profile.render_time)
+
+
+@require_GET
+def metrics(request):
+    """Prometheus text exposition; requires `Authorization: Bearer <METRICS_TOKEN>` if that is set"""
+    expected = getattr(settings, 'METRICS_TOKEN', '')
+    if expected:
+        header = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(header) != 2 or header[0].lower() != 'bearer' or not constant_time_compare(header[1], expected):
+            return HttpResponse(status=401)
+    lines = [line for metric in METRICS for line in metric.expose()]
+    return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
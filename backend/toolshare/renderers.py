@@ -0,0 +1,79 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+The output matches DRF's JSONRenderer with the default COMPACT_JSON and
+UNICODE_JSON settings. Datetimes, Decimals, lazy strings and other
+non-native values are still encoded by DRF's encoder. Floats are the one
+exception: very large or very small ones may be spelled differently
+(1e16 vs 1e+16).
+
+JSON_BACKEND picks the backend: 'auto' (orjson if importable), 'orjson' or
+'json' (stdlib only). Requests for indented output, and non-UTF-8 request
+bodies, always go through DRF's stdlib code.
+"""
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_backend = getattr(settings, 'JSON_BACKEND', 'auto')
+if _backend == 'orjson' and orjson is None:
+    raise ImportError("JSON_BACKEND = 'orjson' needs the orjson package")
+USE_ORJSON = orjson is not None and _backend != 'json'
+
+# DRF formats datetimes itself (millisecond precision, 'Z' for UTC)
+ORJSON_OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+    if orjson is not None else 0
+)
+_encoder = JSONEncoder()
+
+
+def dumps(data):
+    """Encode like JSONRenderer does by default, returning bytes"""
+    if not USE_ORJSON:
+        return JSONRenderer().render(data)
+    try:
+        ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # e.g. integers beyond 64 bits, which the stdlib handles
+        return JSONRenderer().render(data)
+    # Same as JSONRenderer: escape the two line separators JavaScript chokes on
+    if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            not USE_ORJSON
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or not (api_settings.COMPACT_JSON and api_settings.UNICODE_JSON)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not USE_ORJSON or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
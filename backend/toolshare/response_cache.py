@@ -0,0 +1,166 @@
+"""
+Per-user response caching with ETags for read endpoints.
+
+Each cached view declares the scopes its output depends on. A scope is a
+version stamp kept in the shared cache; on a miss it is derived from the
+scope's rows (latest updated_at plus row count), so every process computes the
+same stamp. Writes bump a scope's stamp to a fresh token (see bump()), which
+changes the ETag and the cache key of every response built from it.
+
+A GET whose If-None-Match matches the current ETag gets a 304 without
+touching the view. Otherwise a cached copy of the data is returned if there
+is one, and only then is the view run. Keys include the user and the full
+URL, so per-user results never leak between users.
+
+Versions are read and cached bodies built from the primary database, even
+under replica_reads: a body built from a lagging replica would be stored under
+the new version and served, and 304'd, until the next write.
+
+Stamps live in CACHES['default']: a local-memory cache is fine for a single
+process, and a shared one (file-based, Redis, ...) keeps several worker
+processes in agreement.
+"""
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .async_api import render_json
+from .db import primary_reads
+
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+def derive_version(queryset):
+    stamp = queryset.aggregate(latest=Max('updated_at'), rows=Count('pk'))
+    latest = stamp['latest'].timestamp() if stamp['latest'] else 0
+    return f"{latest:.6f}-{stamp['rows']}"
+
+
+def get_version(key, queryset):
+    version = cache.get(key)
+    if version is None:
+        version = derive_version(queryset)
+        # add(), not set(): never overwrite a bump that landed meanwhile
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def _bump(keys):
+    token = f'{time.time_ns():x}'
+    cache.set_many({key: token for key in keys}, None)
+
+
+def bump(*keys):
+    """
+    Move the given scopes to a new version now and again on commit, so a
+    response cached from pre-commit rows in between can't outlive the write.
+    """
+    _bump(keys)
+    transaction.on_commit(lambda: _bump(keys))
+
+
+def _etag(request, versions):
+    raw = '|'.join([
+        str(request.user.pk),
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', ''),
+        *versions,
+    ])
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _not_modified(request, etag):
+    """
+    The 304 for a matching If-None-Match, else None. Matching is weak because
+    CompressionMiddleware hands out W/ versions of our ETags; the 304 repeats
+    the validator in the form the client got it, so caches don't see it change.
+    """
+    for candidate in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        if candidate == '*' or candidate.removeprefix('W/') == etag:
+            return _finish(HttpResponseNotModified(), etag if candidate == '*' else candidate)
+    return None
+
+
+def _finish(response, etag):
+    response['ETag'] = etag
+    # Clients may keep it, but must check back; shared caches must not
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Authorization',))
+    return response
+
+
+def cache_response(*scopes):
+    """
+    Cache GET responses of a DRF function view (put it under @api_view) or an
+    async view (under @async_api_view). Each scope is a callable
+    (request, *args, **kwargs) -> (version_key, queryset).
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != 'GET':
+                    return await view(request, *args, **kwargs)
+                with primary_reads():
+                    return await cached_async(request, *args, **kwargs)
+
+            async def cached_async(request, *args, **kwargs):
+                versions = [
+                    await sync_to_async(get_version)(*scope(request, *args, **kwargs)) for scope in scopes
+                ]
+                etag = _etag(request, versions)
+                not_modified = _not_modified(request, etag)
+                if not_modified is not None:
+                    return not_modified
+                key = f'response:json:{etag}'
+                content = await cache.aget(key)
+                if content is None:
+                    response = await view(request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    await cache.aset(key, response.content, RESPONSE_CACHE_TIMEOUT)
+                else:
+                    response = render_json(None)
+                    response.content = content
+                return _finish(response, etag)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            with primary_reads():
+                return cached(request, *args, **kwargs)
+
+        def cached(request, *args, **kwargs):
+            versions = [get_version(*scope(request, *args, **kwargs)) for scope in scopes]
+            etag = _etag(request, versions)
+            not_modified = _not_modified(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+            key = f'response:{etag}'
+            data = cache.get(key)
+            if data is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                cache.set(key, response.data, RESPONSE_CACHE_TIMEOUT)
+            else:
+                response = Response(data)
+            return _finish(response, etag)
+        return wrapper
+    return decorator
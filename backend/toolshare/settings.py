@@ -4,7 +4,7 @@ Django settings for toolshare project.
 
 from pathlib import Path
 import os
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +44,31 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request query/serializer/latency profiling with Server-Timing headers and
+# Prometheus histograms at /metrics (toolshare.profiling)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+# Bearer token /metrics requires; empty leaves it open
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Queries at least this slow are logged to toolshare.slow_queries (0 disables)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=100, cast=int)
+if PROFILING_ENABLED:
+    MIDDLEWARE.insert(0, 'toolshare.profiling.ProfilingMiddleware')
+
+# gzip (or br, with the brotli package) for JSON/CSV/NDJSON responses
+# (toolshare.compression); off when a proxy in front already compresses
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+# Smaller bodies are sent as they are
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+# Responses that return tokens are never compressed
+COMPRESSION_EXCLUDE_PATHS = ['/api/auth/']
+if COMPRESSION_ENABLED:
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index('django.middleware.security.SecurityMiddleware') + 1,
+        'toolshare.compression.CompressionMiddleware',
+    )
+
 ROOT_URLCONF = 'toolshare.urls'
 
 TEMPLATES = [
@@ -63,15 +88,89 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'toolshare.wsgi.application'
+ASGI_APPLICATION = 'toolshare.asgi.application'
 
-# Database
+# Route the read-heavy endpoints to their async views (enabled by toolshare.asgi)
+ASYNC_API_VIEWS = config('ASYNC_API_VIEWS', default=False, cast=bool)
+
+# Database: SQLite by default; set DB_ENGINE (e.g. django.db.backends.postgresql,
+# which needs psycopg) and the DB_* connection settings for a server database.
+DB_ENGINE = config('DB_ENGINE', default='django.db.backends.sqlite3')
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': DB_ENGINE,
+        'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'USER': config('DB_USER', default=''),
+        'PASSWORD': config('DB_PASSWORD', default=''),
+        'HOST': config('DB_HOST', default=''),
+        'PORT': config('DB_PORT', default=''),
+        # Persistent connections, checked before reuse
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'OPTIONS': {},
+    }
+}
+if DB_ENGINE == 'django.db.backends.sqlite3':
+    # Seconds a writer waits for the lock before "database is locked"
+    DATABASES['default']['OPTIONS']['timeout'] = config('SQLITE_TIMEOUT', default=20, cast=int)
+    # A file rather than the shared in-memory default, whose table locks
+    # fail instantly, so tests can race separate connections
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+
+# WAL journal and relaxed fsync for single-node SQLite installs (toolshare.db)
+SQLITE_TUNED_PRAGMAS = config('SQLITE_TUNED_PRAGMAS', default=True, cast=bool)
+
+# Read replicas: hosts that mirror the default database. The read-only views
+# marked with toolshare.db.replica_reads read from them (see ReplicaRouter).
+DB_REPLICA_HOSTS = config('DB_REPLICA_HOSTS', default='', cast=Csv())
+for index, host in enumerate(DB_REPLICA_HOSTS):
+    DATABASES[f'replica{index + 1}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['toolshare.db.ReplicaRouter'] if DB_REPLICA_HOSTS else []
+
+# Cache (point CACHE_BACKEND at Redis/Memcached to share it across workers)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='toolshare'),
     }
 }
 
+# Seconds the site-wide dashboard totals are cached for
+STATS_CACHE_TIMEOUT = config('STATS_CACHE_TIMEOUT', default=30, cast=int)
+
+# Seconds a cached tool list/detail response is kept (toolshare.response_cache).
+# With several worker processes use a shared cache, e.g.
+# CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# CACHE_LOCATION=/var/tmp/toolshare-cache
+RESPONSE_CACHE_TIMEOUT = config('RESPONSE_CACHE_TIMEOUT', default=300, cast=int)
+
+# Password hashing (apps.users.passwords). PASSWORD_HASHER picks the hasher for
+# new hashes: 'scrypt', 'argon2' (needs argon2-cffi) or 'pbkdf2'. Hashes made
+# with another hasher or older cost settings are upgraded on the next login.
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='scrypt')
+_PASSWORD_HASHERS = {
+    'scrypt': 'apps.users.passwords.TunedScryptPasswordHasher',
+    'argon2': 'apps.users.passwords.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+SCRYPT_WORK_FACTOR = config('SCRYPT_WORK_FACTOR', default=2**14, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=65536, cast=int)
+# Processes hashing passwords (0 hashes inline), how many hashes may queue per
+# process, and how long a request waits for a queue slot before a 503
+PASSWORD_HASH_WORKERS = config('PASSWORD_HASH_WORKERS', default=2, cast=int)
+PASSWORD_HASH_QUEUE = config('PASSWORD_HASH_QUEUE', default=4, cast=int)
+PASSWORD_HASH_WAIT = config('PASSWORD_HASH_WAIT', default=5, cast=float)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -105,6 +204,21 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Hashed names plus precompressed .gz/.br copies, written by collectstatic
+    'staticfiles': {'BACKEND': 'toolshare.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve /media/ and collected /static/ from Django (toolshare.media) when no
+# web server in front does it. MEDIA_SENDFILE_HEADER hands the transfer to a
+# proxy instead: 'X-Accel-Redirect' (nginx, internal location
+# MEDIA_SENDFILE_PREFIX) or 'X-Sendfile' (Apache, lighttpd).
+SERVE_MEDIA = config('SERVE_MEDIA', default=True, cast=bool)
+SERVE_STATIC = config('SERVE_STATIC', default=not DEBUG, cast=bool)
+MEDIA_SENDFILE_HEADER = config('MEDIA_SENDFILE_HEADER', default='')
+MEDIA_SENDFILE_PREFIX = config('MEDIA_SENDFILE_PREFIX', default='/protected/')
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -112,18 +226,59 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.CustomUser'
 
 # Django REST Framework
+# Session auth is only needed for the browsable API; it costs a session and
+# user lookup on requests without a token
+API_SESSION_AUTH = config('API_SESSION_AUTH', default=DEBUG, cast=bool)
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
+        'apps.users.authentication.CachingTokenAuthentication',
+        *(['rest_framework.authentication.SessionAuthentication'] if API_SESSION_AUTH else []),
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson when installed (toolshare.renderers); same output as DRF's JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'toolshare.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'toolshare.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # Used by the throttles on signup and login (apps.users.throttles)
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': config('SIGNUP_THROTTLE_RATE', default='10/hour'),
+        'login': config('LOGIN_THROTTLE_RATE', default='30/min'),
+        'login_email': config('LOGIN_EMAIL_THROTTLE_RATE', default='10/min'),
+    },
 }
 
+# Token lookups cached per process (apps.users.authentication)
+TOKEN_CACHE_SIZE = config('TOKEN_CACHE_SIZE', default=1024, cast=int)
+TOKEN_CACHE_TTL = config('TOKEN_CACHE_TTL', default=60, cast=int)
+# Seconds before a token must be replaced (0 = tokens never expire)
+TOKEN_EXPIRY = config('TOKEN_EXPIRY', default=0, cast=int)
+
+# JSON encoder for API responses: 'auto' (orjson if installed), 'orjson' or 'json'
+JSON_BACKEND = config('JSON_BACKEND', default='auto')
+
+# Outgoing mail (overdue reminders); printed to the console unless configured
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='toolshare@localhost')
+
+# Most approve/reject actions accepted by one POST /api/requests/batch/
+REQUEST_BATCH_MAX_ACTIONS = config('REQUEST_BATCH_MAX_ACTIONS', default=1000, cast=int)
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -139,6 +294,9 @@ SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
 X_FRAME_OPTIONS = 'DENY'
 
+# Background threads rendering tool image variants (0 renders inline)
+IMAGE_WORKERS = config('IMAGE_WORKERS', default=2, cast=int)
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
\ No newline at end of file
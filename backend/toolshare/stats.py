@@ -0,0 +1,80 @@
+"""
+Site-wide counters shown on the dashboard.
+
+The totals are the same for every user, so they are computed with one
+aggregate per table and kept in the shared cache for a short TTL. Writes
+that change a total drop the cached copy.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .db import primary_reads
+
+GLOBAL_COUNTS_CACHE_KEY = 'stats:global-counts'
+GLOBAL_COUNTS_TIMEOUT = getattr(settings, 'STATS_CACHE_TIMEOUT', 30)
+
+
+def global_counts():
+    counts = cache.get(GLOBAL_COUNTS_CACHE_KEY)
+    if counts is None:
+        from apps.requests.models import BorrowRequest
+        from apps.tools.models import Tool
+
+        # Shared by every user for the TTL, so never filled from a lagging replica
+        with primary_reads():
+            counts = Tool.objects.aggregate(
+                total_tools=Count('pk'),
+                available_tools=Count('pk', filter=Q(is_available=True)),
+            )
+            counts['total_users'] = get_user_model().objects.count()
+            counts['total_requests'] = BorrowRequest.objects.count()
+        cache.set(GLOBAL_COUNTS_CACHE_KEY, counts, GLOBAL_COUNTS_TIMEOUT)
+    return counts
+
+
+async def aglobal_counts():
+    counts = await cache.aget(GLOBAL_COUNTS_CACHE_KEY)
+    if counts is None:
+        from apps.requests.models import BorrowRequest
+        from apps.tools.models import Tool
+
+        with primary_reads():
+            counts = await Tool.objects.aaggregate(
+                total_tools=Count('pk'),
+                available_tools=Count('pk', filter=Q(is_available=True)),
+            )
+            counts['total_users'] = await get_user_model().objects.acount()
+            counts['total_requests'] = await BorrowRequest.objects.acount()
+        await cache.aset(GLOBAL_COUNTS_CACHE_KEY, counts, GLOBAL_COUNTS_TIMEOUT)
+    return counts
+
+
+def invalidate_global_counts():
+    # Again on commit: a read in between would cache the pre-commit totals
+    cache.delete(GLOBAL_COUNTS_CACHE_KEY)
+    transaction.on_commit(lambda: cache.delete(GLOBAL_COUNTS_CACHE_KEY))
+
+
+@receiver(post_save, sender='tools.Tool')
+@receiver(post_delete, sender='tools.Tool')
+def tool_changed(sender, **kwargs):
+    # Any tool save may flip is_available
+    invalidate_global_counts()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_save, sender='requests.BorrowRequest')
+def row_created(sender, created=False, **kwargs):
+    if created:
+        invalidate_global_counts()
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender='requests.BorrowRequest')
+def row_deleted(sender, **kwargs):
+    invalidate_global_counts()
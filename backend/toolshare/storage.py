@@ -0,0 +1,125 @@
+"""
+Storage backends: content-addressed media and precompressed static files.
+
+Files are stored under blobs/<aa>/<bb>/<sha256><ext>, so identical uploads
+share one file and a name never changes meaning once written. Uploads are
+hashed chunk by chunk while being copied to a temporary file next to their
+final location, so the whole file is never held in memory.
+
+Because the same blob can back several rows, nothing deletes blob files
+directly: references are counted in tools.ImageBlob and unreferenced blobs
+are removed by the collect_media_blobs management command.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written without it
+    brotli = None
+
+BLOB_PREFIX = 'blobs'
+TEMP_PREFIX = '.upload-'
+# Blob names are derived from their content, so they can be cached forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def blob_name(digest, ext=''):
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # The final name comes from the content hash in _save; an existing
+        # file with the same name is the same content, not a collision.
+        return name
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+        directory = self.path(BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks(self.chunk_size):
+                    digest.update(chunk)
+                    temp.write(chunk)
+
+            name = blob_name(digest.hexdigest(), ext)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+                # Tell the collector this blob is in use again
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                # Atomic on the same filesystem: readers never see a partial blob
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
+
+    def iter_blob_files(self):
+        """Yield (name, mtime) for every blob file, skipping rendered variants"""
+        root = self.path(BLOB_PREFIX)
+        for dirpath, dirnames, filenames in os.walk(root):
+            if 'variants' in dirnames:
+                dirnames.remove('variants')
+            for filename in filenames:
+                full_path = os.path.join(dirpath, filename)
+                name = os.path.relpath(full_path, self.location).replace(os.sep, '/')
+                yield name, os.path.getmtime(full_path)
+
+
+tool_image_storage = ContentAddressedStorage()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes .gz (and .br, if the brotli
+    package is installed) next to every compressible file at collectstatic
+    time, for toolshare.media.serve_static to send as-is.
+    """
+    compressible_extensions = ('.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico')
+    min_compress_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in list(self.hashed_files.values()) + list(paths):
+            self.compress(name)
+
+    def compress(self, name):
+        if not name.endswith(self.compressible_extensions):
+            return
+        path = self.path(name)
+        if not os.path.isfile(path):
+            return
+        with open(path, 'rb') as fh:
+            data = fh.read()
+        if len(data) < self.min_compress_size:
+            return
+        encoders = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoders.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+        for suffix, encode in encoders:
+            compressed = encode(data)
+            # Only keep it if it actually saves bytes
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as fh:
+                    fh.write(compressed)
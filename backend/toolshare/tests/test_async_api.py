@@ -0,0 +1,70 @@
+import json
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import NotFound, Throttled, ValidationError
+from rest_framework.test import APIClient
+
+from apps.tools import async_views
+from toolshare.async_api import async_api_view
+
+
+class AsyncErrorResponseTests(TestCase):
+    """Async views answer errors with the same bodies as the sync DRF views"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='owner', email='owner@example.com')
+        cls.token = Token.objects.create(user=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = AsyncRequestFactory()
+
+    def call(self, view, path='/api/tools/'):
+        return async_to_sync(view)(self.factory.get(path, headers={'Authorization': f'Token {self.token.key}'}))
+
+    def body(self, view, path='/api/tools/'):
+        response = self.call(view, path)
+        return response.status_code, json.loads(response.content)
+
+    def sync_call(self, path):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = client.get(path)
+        return response.status_code, response.json()
+
+    def test_validation_error_keeps_field_errors(self):
+        status_code, body = self.body(async_views.tool_list, '/api/tools/?fields=id,bogus')
+        self.assertEqual(status_code, 400)
+        self.assertIn('fields', body)
+        self.assertNotIn('detail', body)
+
+    def test_validation_error_matches_the_sync_view(self):
+        path = '/api/tools/?fields=id,bogus'
+        self.assertEqual(self.body(async_views.tool_list, path), self.sync_call(path))
+
+    def test_other_errors_keep_detail(self):
+        @async_api_view()
+        async def missing(request):
+            raise NotFound()
+
+        @async_api_view()
+        async def invalid_list(request):
+            raise ValidationError(['Nope'])
+
+        self.assertEqual(self.body(missing), (404, {'detail': 'Not found.'}))
+        self.assertEqual(self.body(invalid_list), (400, ['Nope']))
+
+    def test_throttled_sets_retry_after(self):
+        @async_api_view()
+        async def throttled(request):
+            raise Throttled(wait=30)
+
+        response = self.call(throttled)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
@@ -0,0 +1,63 @@
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+from django.test.client import RequestFactory
+
+from toolshare.media import serve_static
+
+
+class PrecompressedStaticTests(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.body = b'console.log("hi");\n' * 50
+        (self.root / 'app.js').write_bytes(self.body)
+        (self.root / 'app.js.gz').write_bytes(gzip.compress(self.body))
+        self.settings = override_settings(STATIC_ROOT=str(self.root))
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+
+    def get(self, accept_encoding=None, **headers):
+        if accept_encoding is not None:
+            headers['HTTP_ACCEPT_ENCODING'] = accept_encoding
+        return serve_static(RequestFactory().get('/static/app.js', **headers), 'app.js')
+
+    def test_encoding_follows_q_values(self):
+        cases = {
+            'gzip': 'gzip',
+            'gzip;q=0.5, identity': 'gzip',
+            'gzip;q=0': None,
+            'GZIP; q=0.0': None,
+            'x-gzip-ish': None,
+            '*': 'gzip',
+            '*;q=0, identity': None,
+            '': None,
+            'br': None,  # no .br sibling
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertEqual(response.get('Content-Encoding'), expected)
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_each_encoding_has_its_own_etag(self):
+        identity, gzipped = self.get(''), self.get('gzip')
+        self.assertNotEqual(identity['ETag'], gzipped['ETag'])
+        self.assertTrue(gzipped['ETag'].endswith('-gzip"'))
+        self.assertEqual(b''.join(gzipped.streaming_content), gzip.compress(self.body))
+
+        # A cached gzip copy revalidates only against the gzip representation
+        self.assertEqual(self.get('gzip', HTTP_IF_NONE_MATCH=gzipped['ETag']).status_code, 304)
+        self.assertEqual(self.get('', HTTP_IF_NONE_MATCH=gzipped['ETag']).status_code, 200)
+        not_modified = self.get('', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn('Accept-Encoding', not_modified['Vary'])
+
+    def test_ranges_use_the_identity_file(self):
+        response = self.get('gzip', HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertIsNone(response.get('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), self.body[:10])
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.test import modify_settings
+from rest_framework.test import APITestCase
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+from toolshare.profiling import QUERIES, SERIALIZE_TIME
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'toolshare.profiling.ProfilingMiddleware'})
+class ProfilingTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        borrower = User.objects.create_user(username='borrower', email='borrower@example.com')
+        for i in range(5):
+            tool = Tool.objects.create(owner=cls.owner, name=f'Drill {i}', category='Power Tools', condition='Good')
+            BorrowRequest.objects.create(tool=tool, borrower=borrower, reason='x', duration=2)
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    @staticmethod
+    def observed(histogram, view):
+        """(count, sum) recorded for view so far"""
+        series = histogram._series.get((view,))
+        return (sum(series[:-1]), series[-1]) if series else (0, 0.0)
+
+    def test_values_serializer_time_is_recorded(self):
+        response = self.client.get('/api/requests/lent/')
+        view = response.resolver_match.view_name
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        before = self.observed(SERIALIZE_TIME, view)
+
+        self.client.get('/api/requests/lent/')
+        count, total = self.observed(SERIALIZE_TIME, view)
+        self.assertEqual(count, before[0] + 1)
+        self.assertGreater(total, before[1])
+
+    def test_streamed_bodies_are_recorded_when_they_end(self):
+        response = self.client.get('/api/requests/lent/', {'export_format': 'ndjson'})
+        view = response.resolver_match.view_name
+        serialize_before = self.observed(SERIALIZE_TIME, view)
+        queries_before = self.observed(QUERIES, view)
+
+        body = b''.join(response.streaming_content)
+        self.assertEqual(len(body.splitlines()), 5)
+        count, total = self.observed(SERIALIZE_TIME, view)
+        self.assertEqual(count, serialize_before[0] + 1)
+        self.assertGreater(total, serialize_before[1])
+        # The query that fed the stream ran after the view returned, and still counts
+        self.assertGreaterEqual(self.observed(QUERIES, view)[1], queries_before[1] + 1)
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
+
+from apps.tools.caching import all_tools
+from apps.tools.models import Tool
+from toolshare.db import ReplicaRouter, replica_reads
+from toolshare.response_cache import cache_response
+
+
+class ConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username='viewer', email='viewer@example.com')
+        owner = User.objects.create_user(username='owner', email='owner@example.com')
+        for i in range(10):
+            Tool.objects.create(owner=owner, name=f'Drill {i}', category='Power Tools', condition='Good')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def test_304_repeats_the_validator_of_the_200(self):
+        for accept_encoding, weak in (('gzip', True), ('identity', False)):
+            with self.subTest(accept_encoding=accept_encoding):
+                response = self.client.get('/api/tools/', HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertEqual(response.status_code, 200)
+                etag = response['ETag']
+                self.assertEqual(etag.startswith('W/'), weak)
+
+                not_modified = self.client.get(
+                    '/api/tools/', HTTP_ACCEPT_ENCODING=accept_encoding, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified['ETag'], etag)
+
+    def test_changed_data_is_sent_again(self):
+        etag = self.client.get('/api/tools/', HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        Tool.objects.filter(name='Drill 0').first().delete()
+        response = self.client.get('/api/tools/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class PrimaryReadTests(APITestCase):
+    def test_cached_views_read_from_the_primary(self):
+        routed = []
+
+        @api_view(['GET'])
+        @replica_reads
+        @cache_response(all_tools)
+        def view(request):
+            routed.append(ReplicaRouter().db_for_read(Tool))
+            return Response({})
+
+        @api_view(['GET'])
+        @replica_reads
+        def uncached(request):
+            routed.append(ReplicaRouter().db_for_read(Tool))
+            return Response({})
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, get_user_model().objects.create_user(username='u', email='u@example.com'))
+        with mock.patch('toolshare.db.replica_aliases', return_value=['replica1']):
+            view(request)
+            uncached(request)
+        self.assertEqual(routed, ['default', 'replica1'])
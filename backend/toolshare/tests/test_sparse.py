@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from rest_framework.test import APITestCase
+
+from apps.requests.models import BorrowRequest
+from apps.tools.models import Tool
+
+
+class SparseFieldsetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.owner = User.objects.create_user(username='owner', email='owner@example.com')
+        borrower = User.objects.create_user(username='borrower', email='borrower@example.com')
+        tool = Tool.objects.create(owner=cls.owner, name='Drill', category='Power Tools', condition='Good')
+        BorrowRequest.objects.create(tool=tool, borrower=borrower, reason='x', duration=2)
+
+    def setUp(self):
+        self.client.force_authenticate(self.owner)
+
+    def results(self, query):
+        response = self.client.get('/api/requests/incoming/' + query)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_selected_fields_and_dotted_paths(self):
+        self.assertEqual(
+            self.results('?fields=status,tool.name'),
+            [{'status': 'pending', 'tool': {'name': 'Drill'}}],
+        )
+
+    def test_empty_fields_is_ignored(self):
+        full = self.results('')
+        for query in ('?fields=', '?fields=,', '?fields=%20'):
+            self.assertEqual(self.results(query), full, query)
+
+    def test_empty_expand_renders_relations_as_ids(self):
+        [row] = self.results('?expand=')
+        self.assertIsInstance(row['tool'], int)
+        self.assertIsInstance(row['borrower'], int)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/requests/incoming/?fields=status,nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
@@ -4,7 +4,7 @@ URL configuration for toolshare project.
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from .media import serve_blob, serve_media, serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -13,7 +13,16 @@ urlpatterns = [
     path('api/requests/', include('apps.requests.urls')),
 ]
 
-# Serve media files during development
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
+# Media and collected static files (see toolshare.media); in DEBUG,
+# runserver's staticfiles handler serves /static/ from the app directories
+if settings.SERVE_MEDIA:
+    media_prefix = settings.MEDIA_URL.lstrip('/')
+    urlpatterns += [
+        path(f'{media_prefix}blobs/<path:path>', serve_blob),
+        path(f'{media_prefix}<path:path>', serve_media),
+    ]
+if settings.PROFILING_ENABLED:
+    from .profiling import metrics
+    urlpatterns.append(path('metrics', metrics, name='metrics'))
+if settings.SERVE_STATIC:
+    urlpatterns.append(path(f'{settings.STATIC_URL.lstrip("/")}<path:path>', serve_static))
\ No newline at end of file
@@ -170,7 +170,7 @@ const Dashboard = () => {
                   <tr key={tool.id} className="hover:bg-gray-50">
                     <td className="px-6 py-4 whitespace-nowrap flex items-center">
                       {tool.image_url && (
-                        <img src={tool.image_url} alt={tool.name} className="h-10 w-10 rounded-lg object-cover mr-3" />
+                        <img src={tool.thumbnail_url || tool.image_url} alt={tool.name} loading="lazy" className="h-10 w-10 rounded-lg object-cover mr-3" />
                       )}
                       <span className="text-sm font-medium text-gray-900">{tool.name}</span>
                     </td>
@@ -12,9 +12,9 @@ const LentTools: React.FC = () => {
   useEffect(() => {
     const fetchLentTools = async () => {
       try {
-        const response = await requestsAPI.getLentTools();
-        const approvedOnly = (response.results || []).filter(r => r.status === 'approved');
-        setRequests(approvedOnly);
+        // Current loans only; the API filters and pages the full history
+        const approved = await requestsAPI.getAllPages(requestsAPI.getLentTools, { status: ['approved'] });
+        setRequests(approved);
       } catch (err) {
         setError('Failed to load lent tools');
       } finally {
@@ -12,8 +12,7 @@ const MyBorrowedTools = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const response = await requestsAPI.getMyBorrowedTools();
-        const approvedTools = (response.results || []).filter(t => t.status === 'approved');
+        const approvedTools = await requestsAPI.getAllPages(requestsAPI.getMyBorrowedTools, { status: ['approved'] });
         setTools(approvedTools);
       } catch (err) {
         setError('Failed to fetch borrowed tools');
@@ -30,13 +30,14 @@ const MyTools = () => {
       setLoading(true);
       const [myTools, borrowedRes, lentRes] = await Promise.all([
         toolsAPI.getMyTools(),
-        requestsAPI.getMyBorrowedTools(),
-        requestsAPI.getLentTools(),
+        // Only the totals are needed
+        requestsAPI.getMyBorrowedTools({ page_size: 1 }),
+        requestsAPI.getLentTools({ page_size: 1 }),
       ]);
 
       setTools(myTools);
-      setBorrowedCount(borrowedRes.results?.length || 0);
-      setLentCount(lentRes.results?.length || 0);
+      setBorrowedCount(borrowedRes.count || 0);
+      setLentCount(lentRes.count || 0);
     } catch (err: any) {
       setError('Failed to load your tools');
       console.error('My tools error:', err);
@@ -154,7 +155,19 @@ const MyTools = () => {
           {tools.map((tool) => (
             <div key={tool.id} className="card hover:shadow-md transition-shadow p-4">
               {tool.image_url ? (
-                <img src={tool.image_url} alt={tool.name} className="w-full h-48 object-cover rounded-lg mb-4" />
+                <picture>
+                  {tool.image_srcset && (
+                    <source type="image/webp" srcSet={tool.image_srcset.webp} sizes="(min-width: 768px) 33vw, 100vw" />
+                  )}
+                  <img
+                    src={tool.image_url}
+                    srcSet={tool.image_srcset?.jpeg}
+                    sizes="(min-width: 768px) 33vw, 100vw"
+                    alt={tool.name}
+                    loading="lazy"
+                    className="w-full h-48 object-cover rounded-lg mb-4"
+                  />
+                </picture>
               ) : (
                 <div className="w-full h-48 bg-gray-200 rounded-lg mb-4 flex items-center justify-center">
                   <Wrench className="h-12 w-12 text-gray-400" />
@@ -56,12 +56,47 @@ export const NotificationProvider: React.FC<NotificationProviderProps> = ({ chil
   };
 
   useEffect(() => {
-    if (user) {
+    if (!user) return;
+
+    let interval: ReturnType<typeof setInterval> | undefined;
+    const startPolling = () => {
+      if (interval) return;
       refreshNotifications();
       // Refresh notifications every 30 seconds
-      const interval = setInterval(refreshNotifications, 30000);
+      interval = setInterval(refreshNotifications, 30000);
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
       return () => clearInterval(interval);
     }
+
+    // Server pushes counts on every change; fall back to polling if the stream fails
+    let source: EventSource | undefined;
+    let cancelled = false;
+    requestsAPI.getNotificationStreamUrl().then((url) => {
+      if (cancelled) return;
+      source = new EventSource(url);
+      source.onmessage = (event) => {
+        const data = JSON.parse(event.data);
+        if (data.notifications) {
+          setNotifications(data.notifications);
+        }
+      };
+      // The stream token has expired by the time EventSource would reconnect
+      source.onerror = () => {
+        source?.close();
+        startPolling();
+      };
+    }).catch(() => {
+      if (!cancelled) startPolling();
+    });
+
+    return () => {
+      cancelled = true;
+      source?.close();
+      if (interval) clearInterval(interval);
+    };
   }, [user]);
 
   const value = {
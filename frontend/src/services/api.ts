@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { AuthResponse, User, Tool, BorrowRequest, ApiResponse, NotificationData, Stats } from '../types';
+import { AuthResponse, User, Tool, BorrowRequest, ApiResponse, LoanHistoryFilters, NotificationData, Stats } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -115,12 +115,31 @@ export const requestsAPI = {
   markNotificationsRead: (): Promise<{ message: string }> =>
     api.post('/requests/notifications/read/').then(res => res.data),
 
-getMyBorrowedTools: (): Promise<ApiResponse<BorrowRequest>> =>
-  api.get('/requests/borrowed/').then(res => res.data),
-
-
-  getLentTools: (): Promise<ApiResponse<BorrowRequest>> =>
-  api.get('/requests/lent/').then(res => res.data),
+  // EventSource can't send headers, so the URL carries a short-lived stream-only token
+  getNotificationStreamUrl: (): Promise<string> =>
+    api.post('/requests/notifications/stream/token/').then(
+      res => `${API_BASE_URL}/requests/notifications/stream/?stream_token=${encodeURIComponent(res.data.token)}`,
+    ),
+
+  // Paginated; repeat status as ?status=a&status=b, which is what the API reads
+  getMyBorrowedTools: (filters: LoanHistoryFilters = {}): Promise<ApiResponse<BorrowRequest>> =>
+    api.get('/requests/borrowed/', { params: filters, paramsSerializer: { indexes: null } }).then(res => res.data),
+
+  getLentTools: (filters: LoanHistoryFilters = {}): Promise<ApiResponse<BorrowRequest>> =>
+    api.get('/requests/lent/', { params: filters, paramsSerializer: { indexes: null } }).then(res => res.data),
+
+  // Follows `next` links; only for filters that match a bounded set, like current loans
+  getAllPages: async (
+    fetchPage: (filters: LoanHistoryFilters) => Promise<ApiResponse<BorrowRequest>>,
+    filters: LoanHistoryFilters = {},
+  ): Promise<BorrowRequest[]> => {
+    const results: BorrowRequest[] = [];
+    for (let page = 1; ; page++) {
+      const response = await fetchPage({ ...filters, page, page_size: 50 });
+      results.push(...(response.results || []));
+      if (!response.next) return results;
+    }
+  },
 };
 
 export default api;
\ No newline at end of file
@@ -13,6 +13,8 @@ export interface Tool {
   name: string;
   image: string | null;
   image_url: string | null;
+  thumbnail_url: string | null;
+  image_srcset: { webp: string; jpeg: string } | null;
   category: string;
   condition: string;
   is_available: boolean;
@@ -50,6 +52,14 @@ export interface ApiResponse<T> {
   data?: T;
 }
 
+export interface LoanHistoryFilters {
+  status?: BorrowRequest['status'][];
+  created_after?: string;
+  created_before?: string;
+  page?: number;
+  page_size?: number;
+}
+
 export interface NotificationData {
   new_approvals: number;
   new_requests: number;